@@ -0,0 +1,38 @@
+"""
+Tiny timing harness shared by the benchmark scripts in this directory.
+
+Each benchmark module may be run from the repository root, eg:
+
+    python -m benchmarks.to_sqla
+"""
+from typing import Callable, Dict, List
+import timeit
+
+
+def timings(fn: Callable[[], object], *, repeat: int=5, number: int=1) -> List[float]:
+    """
+    Time fn, returning the average seconds per call of every repeat.
+    """
+    return [t / number for t in timeit.repeat(fn, repeat=repeat, number=number)]
+
+
+def best_of(fn: Callable[[], object], *, repeat: int=5, number: int=1) -> float:
+    """
+    Time fn, returning the best average seconds per call across repeats.
+    """
+    return min(timings(fn, repeat=repeat, number=number))
+
+
+def report(title: str, results: Dict[str, float], *, baseline: str=None) -> None:
+    """
+    Print a table of timings, optionally relative to a baseline entry.
+    """
+    baseline = baseline or next(iter(results))
+    width = max(map(len, results))
+
+    print(f'\n{title}')
+    print('-' * len(title))
+
+    for name, seconds in results.items():
+        speedup = results[baseline] / seconds if seconds else float('inf')
+        print(f'{name:<{width}}  {seconds * 1000:>10.2f} ms  {speedup:>7.1f}x')
@@ -0,0 +1,99 @@
+"""
+Time BusinessCalendar generation over a century, against the legacy
+chain of DataFrame.assign calls.
+
+    python -m benchmarks.business_calendar
+"""
+import tempfile
+import pathlib
+import time
+
+from pandas.tseries.offsets import MonthBegin, MonthEnd, QuarterBegin
+from pandas.tseries.holiday import get_calendar
+import sqlalchemy as sa
+import pandas as pd
+import numpy as np
+
+from sn.models import BusinessCalendar
+from sn import dattim
+from benchmarks._harness import best_of, report
+
+
+def legacy_generate(start_date: str, end_date: str) -> pd.DataFrame:
+    """
+    The original BusinessCalendar.populate frame, with its imports fixed.
+    """
+    def dt(name, *args, attr=False, **kwargs):
+        def _wrapper(df):
+            r = getattr(df.calendar_date.dt, name)
+            return r if attr else r(*args, **kwargs)
+        return _wrapper
+
+    def holidays(df):
+        cf = get_calendar('USBusinessHolidayCalendar')\
+                .holidays(df.calendar_date.min(), df.calendar_date.max(), return_name=True)\
+                .to_frame()\
+                .reset_index()\
+                .rename(columns={'index': 'calendar_date', 0: 'day_name'})\
+                .drop_duplicates('calendar_date')
+
+        return df.merge(cf, how='left', on='calendar_date')\
+                 .assign(is_us_holiday=lambda df: df.day_name.notna())
+
+    return pd.date_range(start_date, end_date)\
+             .to_frame(index=False, name='calendar_date')\
+             .assign(
+                 day_of_month=dt('day', attr=True),
+                 day_of_year=dt('dayofyear', attr=True),
+                 weekday=dt('day_name'),
+                 weekday_number=dt('weekday', attr=True),
+                 weekday_in_month=lambda df: ((df.day_of_month - 1) // 7) + 1,
+                 week_begin=lambda df: df.calendar_date - (df.weekday_number * np.timedelta64(1, 'D')),
+                 week_end=lambda df: df.week_begin + np.timedelta64(6, 'D'),
+                 week_of_month=lambda df: round(df.day_of_month // 7) + 1,
+                 week_of_year=lambda df: round(df.day_of_year // 7) + 1,
+                 month_begin=lambda df: df.calendar_date - MonthBegin(1),
+                 month_end=lambda df: df.month_begin + MonthEnd(1),
+                 month_of_quarter=lambda df: df.calendar_date.dt.month // df.calendar_date.dt.quarter,
+                 month_of_year=dt('month', attr=True),
+                 month_name=dt('strftime', date_format='%B'),
+                 quarter_begin=lambda df: df.calendar_date + QuarterBegin(0, startingMonth=1),
+                 quarter_end=lambda df: df.quarter_begin + MonthEnd(3),
+                 quarter_of_year=dt('quarter', attr=True),
+                 is_weekday=lambda df: df.weekday_number < 5,
+                 is_weekend=lambda df: ~df.is_weekday
+             )\
+             .pipe(holidays)\
+             .assign(is_business_day=lambda df: ~df.is_us_holiday & df.is_weekday)\
+             .sort_values('calendar_date')
+
+
+def _cold_populate(start, end):
+    dattim._HOLIDAY_CACHE.clear()
+    return BusinessCalendar.populate(start, end)
+
+
+def main(start: str='1950-01-01', end: str='2049-12-31') -> None:
+    results = {
+        'legacy': best_of(lambda: legacy_generate(start, end), repeat=3),
+        'populate (cold cache)': best_of(lambda: _cold_populate(start, end), repeat=3),
+        'populate (warm cache)': best_of(lambda: BusinessCalendar.populate(start, end), repeat=3),
+    }
+    report(f'BusinessCalendar {start} -> {end}', results)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = sa.create_engine(f'sqlite:///{pathlib.Path(tmp) / "calendar.db"}')
+
+        t = time.perf_counter()
+        BusinessCalendar.populate(start, end, engine)
+        print(f'\npopulate into SQLite file:  {time.perf_counter() - t:.2f} s')
+
+        t = time.perf_counter()
+        BusinessCalendar.extend('2050-12-31', engine)
+        print(f'extend by one year:         {time.perf_counter() - t:.3f} s')
+
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
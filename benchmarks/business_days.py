@@ -0,0 +1,47 @@
+"""
+Business day arithmetic on a Series of ticket timestamps: pandas'
+CustomBusinessDay offset against the Series.sn accessor.
+
+    python -m benchmarks.business_days
+"""
+import warnings
+
+from pandas.errors import PerformanceWarning
+from pandas.tseries.offsets import CustomBusinessDay
+import pandas as pd
+
+from sn import dattim
+import sn.dataframe  # noqa: F401, registers the .sn accessor
+from benchmarks._harness import best_of, report
+from benchmarks.holidays import make_timestamps
+
+
+def _pandas_add_business_days(ts: pd.Series, n: int) -> pd.Series:
+    cbd = CustomBusinessDay(n=n, calendar=dattim.USBusinessHolidayCalendar())
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', PerformanceWarning)
+        return ts + cbd
+
+
+def main(rows: int=1_000_000) -> None:
+    small = make_timestamps(10_000)
+
+    report('add_business_days(3) @ 10,000 timestamps', {
+        'CustomBusinessDay': best_of(lambda: _pandas_add_business_days(small, 3), repeat=1),
+        'Series.sn': best_of(lambda: small.sn.add_business_days(3), repeat=3),
+    })
+
+    ts = make_timestamps(rows)
+    later = ts + pd.Timedelta(days=10)
+
+    report(f'Series.sn @ {rows:,} timestamps', {
+        'add_business_days': best_of(lambda: ts.sn.add_business_days(3), repeat=3),
+        'roll_forward': best_of(lambda: ts.sn.roll_forward(), repeat=3),
+        'business_days_until': best_of(lambda: ts.sn.business_days_until(later), repeat=3),
+        'business_hours_until': best_of(lambda: ts.sn.business_hours_until(later), repeat=3),
+    })
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Scaling of SNDF's column-wise methods across 1 to N workers, for each
+backend of the shared column executor.
+
+    python -m benchmarks.column_executor
+    python -m benchmarks.column_executor --rows 2000000 --workers 1 2 4 8 16
+"""
+import argparse
+import os
+
+import sqlalchemy as sa
+import pandas as pd
+import numpy as np
+
+from sn.async_ import shutdown_executors
+from benchmarks._harness import best_of, report
+from benchmarks.to_sqla import make_frame
+
+
+def make_wide_frame(rows: int, *, copies: int=4) -> pd.DataFrame:
+    """
+    Several copies of the to_sqla frame side by side, plus nullable and string columns.
+    """
+    base = make_frame(rows)
+    base['nullable'] = pd.array(np.where(np.arange(rows) % 5 == 0, None, np.arange(rows)), dtype='Int64')
+    base['category'] = pd.Series(np.arange(rows) % 97).astype(str)
+
+    return pd.concat([base.add_suffix(f'_{i}') for i in range(copies)], axis=1)
+
+
+def main(rows: int=500_000, workers: list=None) -> None:
+    df = make_wide_frame(rows)
+    engine = sa.create_engine('sqlite://')
+    workers = workers or sorted({1, *(2 ** i for i in range(1, 8) if 2 ** i <= (os.cpu_count() or 1)), os.cpu_count() or 1})
+
+    methods = {
+        'reflect': lambda **kw: df.sn.reflect('bench', bind=engine, **kw),
+        'index_statistics': lambda **kw: df.sn.index_statistics(**kw),
+        'reduce_mem_usage': lambda **kw: df.sn.reduce_mem_usage(**kw),
+    }
+
+    for name, method in methods.items():
+        results = {'serial': best_of(lambda: method(parallel='serial'), repeat=3)}
+
+        for parallel in ('thread', 'process'):
+            for n in workers:
+                if n == 1:
+                    continue
+
+                method(parallel=parallel, workers=n)  # warm the pool up
+                results[f'{parallel} x{n}'] = best_of(lambda: method(parallel=parallel, workers=n), repeat=3)
+
+        report(f'SNDF.{name} @ {rows:,} rows x {df.shape[1]} columns', results)
+
+    shutdown_executors()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=500_000)
+    parser.add_argument('--workers', type=int, nargs='+')
+    args = parser.parse_args()
+    main(args.rows, args.workers)
@@ -0,0 +1,83 @@
+"""
+Cost of a chain of SNDF.comment calls on a wide frame: the original,
+eagerly-formatted implementation against the level-aware, lazily-formatted,
+cached one.
+
+    python -m benchmarks.comment
+"""
+import logging
+import io
+
+import pandas as pd
+import numpy as np
+
+import sn.dataframe  # noqa: F401, registers the .sn accessor
+from sn.dataframe import _render_summary
+from benchmarks._harness import best_of, report
+
+
+def make_frame(rows: int, columns: int, *, seed: int=0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    data = {f'f{i}': rng.random(rows) for i in range(columns // 2)}
+    data.update({f's{i}': pd.Series(rng.choice(['a', 'b', 'c'], rows), dtype=object) for i in range(columns - columns // 2)})
+    return pd.DataFrame(data)
+
+
+def legacy_comment(df: pd.DataFrame, msg: str, *, log, level: str='info', info: bool=False) -> pd.DataFrame:
+    BRANCH = '├─'
+    CONT   = '│ '
+    FINAL  = '└─'
+
+    try:
+        log = getattr(log, level)
+    except AttributeError:
+        pass
+
+    if info:
+        buffer = io.StringIO()
+        df.info(buf=buffer)
+        lazy = buffer.getvalue()
+        msg += '\n\n{lazy}'
+
+    log(msg.format(**locals()))
+    return df
+
+
+def _chain(df: pd.DataFrame, comment, log, links: int, **kwargs) -> None:
+    for i in range(links):
+        comment(df, f'{{BRANCH}} step {i}', log=log, **kwargs)
+
+
+def _sn_comment(df, msg, **kwargs):
+    return df.sn.comment(msg, **kwargs)
+
+
+def main(rows: int=10_000, columns: int=500, links: int=50) -> None:
+    df = make_frame(rows, columns)
+    log = logging.getLogger('benchmarks.comment')
+    log.addHandler(logging.NullHandler())
+    log.propagate = False
+
+    log.setLevel('INFO')
+    report(f'{links} x comment(level="debug", info=True), DEBUG off, {columns} columns', {
+        'legacy': best_of(lambda: _chain(df, legacy_comment, log, links, level='debug', info=True), repeat=3),
+        'SNDF.comment': best_of(lambda: _chain(df, _sn_comment, log, links, level='debug', info=True), repeat=3),
+    })
+
+    log.setLevel('DEBUG')
+    stream = logging.StreamHandler(io.StringIO())
+    log.addHandler(stream)
+    report(f'{links} x comment(info=True), emitted, same frame', {
+        'legacy': best_of(lambda: _chain(df, legacy_comment, log, links, info=True), repeat=3),
+        'SNDF.comment': best_of(lambda: _chain(df, _sn_comment, log, links, info=True), repeat=3),
+    })
+
+    report(f'rendering one summary, {rows:,} rows x {columns} columns', {
+        'info=True': best_of(lambda: _render_summary(df, True), repeat=3),
+        "info='deep'": best_of(lambda: _render_summary(df, 'deep'), repeat=3),
+        "info='shallow'": best_of(lambda: _render_summary(df, 'shallow'), repeat=3),
+    })
+
+
+if __name__ == '__main__':
+    main()
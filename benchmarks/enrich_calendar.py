@@ -0,0 +1,51 @@
+"""
+Enriching a fact table with date-dimension attributes: a left pd.merge
+against BusinessCalendar.populate's frame, against SNDF.enrich_calendar.
+
+    python -m benchmarks.enrich_calendar
+    python -m benchmarks.enrich_calendar --rows 50000000
+"""
+import argparse
+
+import pandas as pd
+import numpy as np
+
+import sn.dataframe  # noqa: F401, registers the .sn accessor
+from sn.models import BusinessCalendar
+from benchmarks._harness import best_of, report
+
+
+COLUMNS = ['is_business_day', 'week_begin', 'quarter_of_year', 'month_name']
+
+
+def make_facts(rows: int, *, seed: int=0) -> pd.DataFrame:
+    """
+    Ten years of fact dates, at midnight, with a measure.
+    """
+    rng = np.random.default_rng(seed)
+    dates = np.datetime64('2015-01-01', 'D') + rng.integers(0, 3_650, rows)
+
+    return pd.DataFrame({
+        'calendar_date': dates.astype('datetime64[s]'),
+        'amount': rng.random(rows),
+    })
+
+
+def main(rows: int=5_000_000) -> None:
+    facts = make_facts(rows)
+    dimension = BusinessCalendar.populate('2010-01-01', '2029-12-31')[['calendar_date', *COLUMNS]]
+
+    # warm the calendar cache, as a long-running job would have
+    facts.head().sn.enrich_calendar('calendar_date', columns=COLUMNS)
+
+    report(f'{len(COLUMNS)} calendar attributes @ {rows:,} rows', {
+        'pd.merge': best_of(lambda: facts.merge(dimension, on='calendar_date', how='left'), repeat=3),
+        'enrich_calendar': best_of(lambda: facts.sn.enrich_calendar('calendar_date', columns=COLUMNS), repeat=3),
+    })
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    args = parser.parse_args()
+    main(args.rows)
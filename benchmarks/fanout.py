@@ -0,0 +1,67 @@
+"""
+Throughput of sn.async_.amap at different concurrency limits, over simulated
+I/O on the loop and blocking calls on the shared thread pool. Loop lag, as
+seen by LoopSmokeTester, is printed alongside.
+
+    python -m benchmarks.fanout
+"""
+import asyncio
+import time
+
+from sn.async_ import LoopSmokeTester, amap, run_blocking
+from benchmarks._harness import best_of, report
+
+
+async def _io(item: int) -> int:
+    await asyncio.sleep(0.01)
+    return item
+
+
+async def _blocking(item: int) -> int:
+    return await run_blocking(time.sleep, 0.002)
+
+
+def _gather(calls: int) -> None:
+    async def main():
+        await asyncio.gather(*(_io(i) for i in range(calls)))
+
+    asyncio.run(main())
+
+
+def _amap(fn, calls: int, limit: int, lags: dict=None) -> None:
+    async def main():
+        snapshots = []
+
+        async with LoopSmokeTester(handler=snapshots.append, interval=60, sample_interval=0.005) as tester:
+            async for _ in amap(fn, range(calls), limit=limit):
+                pass
+
+            if lags is not None:
+                lags[limit] = tester.lag.summary()
+
+    asyncio.run(main())
+
+
+def main(calls: int=2_000) -> None:
+    limits = (8, 64, 512)
+    lags = {}
+
+    report(f'{calls:,} x 10ms sleeps on the loop', {
+        'unbounded gather': best_of(lambda: _gather(calls), repeat=3),
+        **{f'amap limit={n}': best_of(lambda: _amap(_io, calls, n, lags), repeat=3) for n in limits},
+    }, baseline='amap limit=8')
+
+    for limit, lag in lags.items():
+        print(f"  limit={limit:<4} lag p99 {lag['p99'] * 1000:6.2f} ms  max {lag['max'] * 1000:6.2f} ms")
+
+    lags.clear()
+    report(f'{calls // 4:,} x 2ms blocking calls via run_blocking', {
+        f'amap limit={n}': best_of(lambda: _amap(_blocking, calls // 4, n, lags), repeat=3) for n in (1, 4, 16)
+    })
+
+    for limit, lag in lags.items():
+        print(f"  limit={limit:<4} lag p99 {lag['p99'] * 1000:6.2f} ms  max {lag['max'] * 1000:6.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Holiday lookups over ticket timestamps: pandas' AbstractHolidayCalendar
+against sn.dattim's cached, vectorized, HolidayIndex.
+
+    python -m benchmarks.holidays
+"""
+from pandas.tseries.offsets import CustomBusinessDay
+import pandas as pd
+import numpy as np
+
+from sn import dattim
+from benchmarks._harness import best_of, report
+
+
+def make_timestamps(rows: int, *, seed: int=0) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    seconds = rng.integers(0, 10 * 365 * 86_400, rows)
+    return pd.Series(pd.Timestamp('2015-01-01') + pd.to_timedelta(seconds, unit='s'))
+
+
+def _pandas_is_holiday(ts: pd.Series) -> np.ndarray:
+    cal = dattim.USBusinessHolidayCalendar()
+    return ts.dt.normalize().isin(cal.holidays(ts.min(), ts.max())).to_numpy()
+
+
+def _pandas_next_business_day(ts: pd.Series) -> pd.Series:
+    cbd = CustomBusinessDay(calendar=dattim.USBusinessHolidayCalendar())
+    return ts.dt.normalize() + cbd
+
+
+def main(rows: int=1_000_000) -> None:
+    ts = make_timestamps(rows)
+    values = ts.to_numpy()
+
+    report(f'is_holiday @ {rows:,} timestamps', {
+        'pandas calendar': best_of(lambda: _pandas_is_holiday(ts), repeat=3),
+        'sn.dattim': best_of(lambda: dattim.is_holiday(values), repeat=3),
+    })
+
+    small = ts.iloc[:10_000]
+    report('next_business_day @ 10,000 timestamps', {
+        'CustomBusinessDay': best_of(lambda: _pandas_next_business_day(small), repeat=1),
+        'sn.dattim': best_of(lambda: dattim.next_business_day(small.to_numpy()), repeat=3),
+    })
+
+    report(f'business_days_between @ {rows:,} timestamps', {
+        'sn.dattim': best_of(lambda: dattim.business_days_between(values, values + np.timedelta64(30, 'D')), repeat=3),
+    })
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Compare SNDF.load's insert methods to the documented reflect + insert path,
+against a local SQLite file.
+
+    python -m benchmarks.load
+"""
+import tempfile
+import pathlib
+
+import sqlalchemy as sa
+import pandas as pd
+import numpy as np
+
+import sn.dataframe
+from benchmarks._harness import best_of
+
+
+def make_frame(rows: int, *, seed: int=0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+
+    return pd.DataFrame({
+        'id': np.arange(rows),
+        'amount': rng.random(rows) * 1000,
+        'flag': rng.integers(0, 2, rows).astype(bool),
+        'label': pd.Series(rng.integers(0, 1000, rows).astype(str), dtype=object),
+        'created': pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 10**8, rows), unit='s'),
+    })
+
+
+def _reflect_and_insert(df: pd.DataFrame, engine: sa.engine.Engine) -> None:
+    model = df.sn.reflect('bench', bind=engine)
+    model.create(engine)
+
+    with engine.begin() as conn:
+        conn.execute(model.insert(), df.to_dict(orient='records'))
+
+
+def main(rows: int=200_000, chunksize: int=20_000) -> None:
+    df = make_frame(rows)
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def _run(fn):
+            db = pathlib.Path(tmp) / 'bench.db'
+            db.unlink(missing_ok=True)
+            engine = sa.create_engine(f'sqlite:///{db}')
+            try:
+                fn(engine)
+            finally:
+                engine.dispose()
+
+        results['reflect + to_dict'] = best_of(lambda: _run(lambda e: _reflect_and_insert(df, e)), repeat=3)
+
+        for method in ['executemany', 'multirow']:
+            results[f'load({method})'] = best_of(
+                lambda: _run(lambda e: df.sn.load('bench', bind=e, chunksize=chunksize, method=method)),
+                repeat=3
+            )
+
+    title = f'load into SQLite file @ {rows:,} rows'
+    print(f'\n{title}\n{"-" * len(title)}')
+
+    for name, seconds in results.items():
+        print(f'{name:<22} {seconds:>8.2f} s  {rows / seconds:>12,.0f} rows/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Per-call latency of logging.info through sn.log.basic_setup, with the
+synchronous StreamHandler and with the asynchronous queue pipeline. The
+stream is a real file on disk, and then the same file behind a stream whose
+flush costs 200us, a stand-in for a terminal or network share.
+
+    python -m benchmarks.log_pipeline
+"""
+import contextlib
+import tempfile
+import logging
+import time
+import sys
+
+import numpy as np
+
+from sn import log as sn_log
+
+
+class _SlowStream:
+    def __init__(self, stream, delay: float):
+        self.stream = stream
+        self.delay = delay
+
+    def write(self, text: str) -> None:
+        self.stream.write(text)
+
+    def flush(self) -> None:
+        time.sleep(self.delay)
+        self.stream.flush()
+
+
+@contextlib.contextmanager
+def _configured(*, flush_delay: float=0, **kwargs):
+    with tempfile.TemporaryFile('w') as stream:
+        stderr, sys.stderr = sys.stderr, _SlowStream(stream, flush_delay) if flush_delay else stream
+
+        try:
+            yield sn_log.basic_setup('benchmark', **kwargs)
+        finally:
+            sn_log._stop_listeners()
+            logging.root.handlers.clear()
+            sys.stderr = stderr
+
+
+def _latencies(calls: int, flush_delay: float, **kwargs) -> np.ndarray:
+    timings = np.empty(calls)
+
+    with _configured(flush_delay=flush_delay, **kwargs) as log:
+        for i in range(calls):
+            t0 = time.perf_counter()
+            log.info('processed chunk %s of %s', i, calls)
+            timings[i] = time.perf_counter() - t0
+
+    return timings
+
+
+def main(calls: int=20_000) -> None:
+    modes = {
+        'sync StreamHandler': {},
+        'async_, drop': {'async_': True, 'policy': 'drop', 'queue_size': calls},
+        'async_, block': {'async_': True, 'policy': 'block'},
+    }
+
+    for flush_delay in (0, 0.0002):
+        title = f'per-call latency of log.info, {calls:,} calls, flush costs {flush_delay * 1e6:.0f}us'
+        print(f'\n{title}\n{"-" * len(title)}')
+
+        for name, kwargs in modes.items():
+            timings = _latencies(calls, flush_delay, **kwargs) * 1e6
+            p50, p99 = np.percentile(timings, [50, 99])
+            print(f'{name:<20}  mean {timings.mean():7.2f} us  p50 {p50:6.2f} us  p99 {p99:7.2f} us')
+
+if __name__ == '__main__':
+    main()
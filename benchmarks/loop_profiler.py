@@ -0,0 +1,46 @@
+"""
+Overhead of LoopSmokeTester on a busy event loop: many short-lived tasks,
+each yielding to the loop a few times.
+
+    python -m benchmarks.loop_profiler
+"""
+import asyncio
+
+from sn.async_ import LoopSmokeTester
+from benchmarks._harness import best_of, report
+
+
+async def _worker(hops: int) -> None:
+    for _ in range(hops):
+        await asyncio.sleep(0)
+
+
+async def _workload(tasks: int, hops: int) -> None:
+    await asyncio.gather(*(_worker(hops) for _ in range(tasks)))
+
+
+def _run(tasks: int, hops: int, **profiler) -> list:
+    snapshots = []
+
+    async def profiled():
+        async with LoopSmokeTester(handler=snapshots.append, **profiler):
+            await _workload(tasks, hops)
+
+    asyncio.run(profiled() if profiler else _workload(tasks, hops))
+    return snapshots
+
+
+def main(tasks: int=20_000, hops: int=10) -> None:
+    report(f'{tasks:,} tasks x {hops} hops', {
+        'bare loop': best_of(lambda: _run(tasks, hops), repeat=3),
+        'LoopSmokeTester': best_of(lambda: _run(tasks, hops, interval=0.25), repeat=3),
+        '+ slow callbacks': best_of(lambda: _run(tasks, hops, interval=0.25, slow_callback_duration=0.05), repeat=1),
+    })
+
+    snapshots = _run(tasks, hops, interval=0.25)
+    fractions = ', '.join(f"{s['overhead']['fraction']:.2%}" for s in snapshots)
+    print(f'\nself-measured overhead per snapshot: {fractions}')
+
+
+if __name__ == '__main__':
+    main()
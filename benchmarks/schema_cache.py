@@ -0,0 +1,58 @@
+"""
+Reflecting the schema of a recurring daily load: SNDF.reflect inferring every
+column, against a SchemaCache hit from disk (a new process) and from memory.
+
+    python -m benchmarks.schema_cache
+"""
+import tempfile
+
+import sqlalchemy as sa
+import pandas as pd
+import numpy as np
+
+import sn.dataframe  # noqa: F401, registers the .sn accessor
+from sn.database import SchemaCache, show_create_statements
+from benchmarks._harness import best_of, report
+
+
+def make_frame(rows: int, columns: int, *, seed: int=0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    data = {}
+
+    for i in range(columns):
+        if i % 3 == 0:
+            data[f'c{i}'] = pd.Series(rng.integers(0, 1_000, rows).astype(str), dtype=object)
+        elif i % 3 == 1:
+            data[f'c{i}'] = pd.Series(rng.integers(0, 1_000, rows), dtype=object)
+        else:
+            data[f'c{i}'] = rng.random(rows)
+
+    return pd.DataFrame(data)
+
+
+def main(rows: int=100_000, columns: int=60) -> None:
+    df = make_frame(rows, columns)
+    engine = sa.create_engine('sqlite://')
+    reflect = lambda cache: df.sn.reflect('daily', bind=engine, cache=cache)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        reflect(SchemaCache(tmp))
+
+        warm = SchemaCache(tmp)
+        reflect(warm)
+
+        report(f'reflect {rows:,} rows x {columns} columns', {
+            'no cache': best_of(lambda: reflect(None), repeat=3),
+            'SchemaCache, disk': best_of(lambda: reflect(SchemaCache(tmp)), repeat=3),
+            'SchemaCache, memory': best_of(lambda: reflect(warm), repeat=3),
+        })
+
+        model = reflect(warm)
+        report('show_create_statements', {
+            'compile': best_of(lambda: show_create_statements(model, log=lambda stmt: None), repeat=3),
+            'SchemaCache': best_of(lambda: show_create_statements(model, log=lambda stmt: None, cache=warm), repeat=3),
+        })
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Rows/sec of sn.io.spss_convert against the legacy row-by-row CSV conversion.
+
+No SPSS files are required - SyntheticSav stands in for savReaderWriter's
+SavReader, generating cases on the fly.
+
+    python -m benchmarks.spss
+"""
+import collections
+import tempfile
+import pathlib
+import time
+import csv
+
+import numpy as np
+
+from sn.io import spss_convert, spss_value_encoder
+
+
+_Shape = collections.namedtuple('_Shape', ['nrows', 'ncols'])
+
+
+class SyntheticSav:
+    """
+    A stand-in for savReaderWriter.SavReader, yielding generated cases.
+
+    Numeric variables contain floats with ~5% system-missing values (None),
+    string variables contain CP1252-encoded bytes, as SavReader returns them.
+
+    Usage
+    -----
+    reader = SyntheticSav.factory(rows=100_000)
+    spss_convert('fake.sav', reader=reader)
+    """
+    def __init__(self, fp=None, *, rows: int=100_000, numerics: int=20, strings: int=5, seed: int=0):
+        self.fp = fp
+        self.rows = rows
+        self.seed = seed
+        self.varNames = [f'num_{i}'.encode() for i in range(numerics)] \
+                      + [f'str_{i}'.encode() for i in range(strings)]
+        self.varTypes = {name: 0 if name.startswith(b'num') else 16 for name in self.varNames}
+        self.header = list(self.varNames)
+        self.shape = _Shape(rows, len(self.varNames))
+
+    @classmethod
+    def factory(cls, **kwargs):
+        return lambda fp: cls(fp, **kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __iter__(self):
+        rng = np.random.default_rng(self.seed)
+        words = [w.encode('CP1252') for w in ('café', 'naïve', 'résumé', 'plain', 'Größe')]
+        is_string = [self.varTypes[name] > 0 for name in self.varNames]
+
+        for start in range(0, self.rows, 10_000):
+            n = min(10_000, self.rows - start)
+            numbers = rng.random((n, len(self.varNames))).round(4).tolist()
+            missing = rng.random((n, len(self.varNames))) < 0.05
+            picks = rng.integers(0, len(words), (n, len(self.varNames)))
+
+            for i in range(n):
+                yield [
+                    words[picks[i, j]] if is_string[j] else (None if missing[i, j] else numbers[i][j])
+                    for j in range(len(is_string))
+                ]
+
+
+def write_sav(fp: pathlib.Path, *, rows: int=100_000, **kwargs) -> pathlib.Path:
+    """
+    Write a real SAV file with the same contents as SyntheticSav.
+
+    Requires savReaderWriter.
+    """
+    from savReaderWriter import SavWriter
+
+    synthetic = SyntheticSav(rows=rows, **kwargs)
+
+    with SavWriter(str(fp), synthetic.varNames, synthetic.varTypes) as writer:
+        for row in synthetic:
+            writer.writerow(row)
+
+    return fp
+
+
+def legacy_spss_to_csv(reader, fp: pathlib.Path, dest: pathlib.Path) -> None:
+    """
+    The original row-by-row conversion: one spss_value_encoder call per cell.
+    """
+    with reader(fp) as sav:
+        with dest.open('w', newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow([c.decode('CP1252') for c in sav.header])
+
+            for line in sav:
+                writer.writerow(list(map(spss_value_encoder, line)))
+
+
+def main(rows: int=200_000) -> None:
+    reader = SyntheticSav.factory(rows=rows)
+
+    # generating cases costs time too, measure it so it may be discounted
+    start = time.perf_counter()
+    for _ in reader(None):
+        pass
+    generate = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fp = pathlib.Path(tmp) / 'synthetic.sav'
+        runs = {
+            'legacy csv': lambda: legacy_spss_to_csv(reader, fp, fp.with_suffix('.legacy.csv')),
+            'csv': lambda: spss_convert(fp, to='csv', threads=False, reader=reader),
+            'csv, threaded': lambda: spss_convert(fp, to='csv', reader=reader),
+            'parquet': lambda: spss_convert(fp, to='parquet', threads=False, reader=reader),
+            'parquet, threaded': lambda: spss_convert(fp, to='parquet', reader=reader),
+        }
+
+        title = f'SPSS conversion @ {rows:,} rows (generating rows alone: {generate:.2f}s)'
+        print(f'\n{title}\n{"-" * len(title)}')
+
+        for name, fn in runs.items():
+            start = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - start
+            print(f'{name:<18} {elapsed:>8.2f} s  {rows / elapsed:>12,.0f} rows/s')
+
+
+if __name__ == '__main__':
+    main()
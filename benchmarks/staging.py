@@ -0,0 +1,73 @@
+"""
+Staging an intermediate frame between ETL steps: a CSV round trip against
+sn's Arrow IPC save and memory-mapped load. Resident memory added by each
+load is printed alongside.
+
+    python -m benchmarks.staging
+"""
+import tempfile
+import pathlib
+import os
+
+import pandas as pd
+import numpy as np
+
+from sn.dataframe import reduce_mem_usage
+from sn import io as sn_io
+from benchmarks._harness import best_of, report
+
+
+def make_frame(rows: int, *, seed: int=0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'id': np.arange(rows),
+        'store': rng.integers(0, 500, rows),
+        'amount': rng.random(rows) * 100,
+        'quantity': rng.integers(1, 20, rows),
+        'state': rng.choice(['CA', 'NY', 'TX', 'WA', 'FL'], rows),
+        'sku': [f'SKU-{i:07d}' for i in rng.integers(0, 20_000, rows)],
+        'sold_on': pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 1_000, rows), unit='D'),
+    })
+
+
+def _rss_mb() -> float:
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+
+
+def _rss_added(fn) -> float:
+    before = _rss_mb()
+    result = fn()
+    added = _rss_mb() - before
+    # held until measured, so its memory is counted
+    del result
+    return added
+
+
+def main(rows: int=2_000_000) -> None:
+    df = reduce_mem_usage(make_frame(rows))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv, arrow = pathlib.Path(tmp) / 'stage.csv', pathlib.Path(tmp) / 'stage.arrow'
+
+        report(f'save {rows:,} rows', {
+            'to_csv': best_of(lambda: df.to_csv(csv, index=False), repeat=1),
+            'df.sn.save': best_of(lambda: df.sn.save(arrow), repeat=3),
+        })
+
+        report(f'load {rows:,} rows', {
+            'read_csv': best_of(lambda: pd.read_csv(csv), repeat=1),
+            'sn.io.load, read': best_of(lambda: sn_io.load(arrow, mmap=False), repeat=3),
+            'sn.io.load, mmap': best_of(lambda: sn_io.load(arrow), repeat=3),
+            'mmap, 2 columns': best_of(lambda: sn_io.load(arrow, columns=['id', 'amount']), repeat=3),
+            'mmap, 10% of rows': best_of(lambda: sn_io.load(arrow, rows=slice(0, rows // 10)), repeat=3),
+        })
+
+        print(f'\nfile sizes: csv {csv.stat().st_size / 1024 ** 2:,.0f} MB, arrow {arrow.stat().st_size / 1024 ** 2:,.0f} MB')
+        print(f'resident memory added, read_csv: {_rss_added(lambda: pd.read_csv(csv)):,.0f} MB')
+        print(f'resident memory added, sn.io.load(mmap=True): {_rss_added(lambda: sn_io.load(arrow)):,.0f} MB')
+
+
+if __name__ == '__main__':
+    import sn.dataframe  # noqa: F401, registers the .sn accessor
+    main()
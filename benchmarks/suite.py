@@ -0,0 +1,345 @@
+"""
+Track the hot paths of sn across commits.
+
+Every benchmark runs against synthetic data at several scales, and the
+timings are written to a JSON file named after the current commit, so that
+two runs may be compared later on - for instance before and after pinning a
+new pandas or SQLAlchemy.
+
+    python -m benchmarks.suite run
+    python -m benchmarks.suite run --scale small medium large --only reflect to_sqla
+    python -m benchmarks.suite compare benchmarks/results/1a2b3c4.json benchmarks/results/5d6e7f8.json
+"""
+from typing import Callable, Dict
+import importlib.metadata
+import collections
+import statistics
+import subprocess
+import argparse
+import platform
+import datetime
+import asyncio
+import pathlib
+import pickle
+import json
+import sys
+import os
+import re
+
+import sqlalchemy as sa
+import numpy as np
+
+from sn.dataframe import to_sqla, reduce_mem_usage
+from sn.models import BusinessCalendar
+from sn.log import LazyStr, CachedLazyStr
+from sn.async_ import LoopSmokeTester
+from sn.io import spss_value_encoder
+from sn import dattim
+from benchmarks._harness import timings
+from benchmarks.to_sqla import make_frame
+from benchmarks.enrich_calendar import make_facts, COLUMNS as CALENDAR_COLUMNS
+from benchmarks.loop_profiler import _workload
+
+
+SCALES = ('small', 'medium', 'large')
+REPEAT = {'small': 5, 'medium': 3, 'large': 1}
+RESULTS = pathlib.Path(__file__).parent / 'results'
+PACKAGES = ('pandas', 'numpy', 'SQLAlchemy', 'pyarrow')
+
+_Benchmark = collections.namedtuple('_Benchmark', ['name', 'setup', 'sizes', 'unit'])
+BENCHMARKS: Dict[str, _Benchmark] = {}
+
+
+def benchmark(name: str, *, sizes: tuple, unit: str='rows') -> Callable:
+    """
+    Register a benchmark.
+
+    The decorated function receives the size of a scale, builds its data, and
+    returns the zero-argument callable to be timed - so that generating data
+    is never part of the measurement.
+
+    Parameters
+    ----------
+    name : str
+        identifies the benchmark across result files
+
+    sizes : tuple
+        the size of each of SCALES, in units
+
+    unit : str = [default: 'rows']
+        what the size counts
+    """
+    def decorator(setup: Callable[[int], Callable[[], object]]) -> Callable:
+        BENCHMARKS[name] = _Benchmark(name, setup, dict(zip(SCALES, sizes)), unit)
+        return setup
+
+    return decorator
+
+
+# ---------------------------------------------------------------------------
+# sn.dataframe
+
+
+@benchmark('to_sqla', sizes=(10_000, 100_000, 1_000_000))
+def _to_sqla(rows: int) -> Callable:
+    df = make_frame(rows)
+    return lambda: [to_sqla(df[name]) for name in df.columns]
+
+
+@benchmark('SNDF.reflect', sizes=(10_000, 100_000, 1_000_000))
+def _reflect(rows: int) -> Callable:
+    df = make_frame(rows)
+    engine = sa.create_engine('sqlite://')
+    return lambda: df.sn.reflect('bench', bind=engine)
+
+
+@benchmark('SNDF.index_statistics', sizes=(10_000, 100_000, 1_000_000))
+def _index_statistics(rows: int) -> Callable:
+    df = make_frame(rows)
+    return lambda: df.sn.index_statistics()
+
+
+@benchmark('Profile.update', sizes=(10_000, 100_000, 1_000_000))
+def _profile_update(rows: int) -> Callable:
+    # a 1% append to a profile of the whole table
+    df = make_frame(rows)
+    delta = make_frame(max(rows // 100, 1))
+    saved = pickle.dumps(df.sn.profile())
+    return lambda: pickle.loads(saved).update(delta)
+
+
+@benchmark('reduce_mem_usage', sizes=(10_000, 100_000, 1_000_000))
+def _reduce_mem_usage(rows: int) -> Callable:
+    df = make_frame(rows)
+    return lambda: reduce_mem_usage(df)
+
+
+# ---------------------------------------------------------------------------
+# sn.models, sn.dattim
+
+
+@benchmark('BusinessCalendar.populate', sizes=(3_650, 36_500, 73_000), unit='days')
+def _populate(days: int) -> Callable:
+    start = np.datetime64('1900-01-01')
+    end = str(start + np.timedelta64(days - 1, 'D'))
+
+    def populate():
+        engine = sa.create_engine('sqlite://')
+        BusinessCalendar.populate(str(start), end, engine)
+        engine.dispose()
+
+    return populate
+
+
+@benchmark('SNDF.enrich_calendar', sizes=(100_000, 1_000_000, 10_000_000))
+def _enrich_calendar(rows: int) -> Callable:
+    facts = make_facts(rows)
+    return lambda: facts.sn.enrich_calendar('calendar_date', columns=CALENDAR_COLUMNS)
+
+
+@benchmark('holiday calendar', sizes=(10, 50, 200), unit='years')
+def _holidays(years: int) -> Callable:
+    def generate():
+        # a cold cache, otherwise every repeat after the first is a lookup
+        dattim._HOLIDAY_CACHE.clear()
+        dattim.holiday_index.cache_clear()
+        dattim.holiday_index('USBusinessHolidayCalendar', 1950, 1950 + years - 1)
+
+    return generate
+
+
+# ---------------------------------------------------------------------------
+# sn.io, sn.log
+
+
+@benchmark('spss_value_encoder', sizes=(100_000, 1_000_000, 10_000_000), unit='values')
+def _spss_value_encoder(values: int) -> Callable:
+    rng = np.random.default_rng(0)
+    pool = [None, 1.5, 2.0, 'café'.encode('CP1252'), 'plain'.encode('CP1252')]
+    cells = [pool[i] for i in rng.integers(0, len(pool), values)]
+    return lambda: list(map(spss_value_encoder, cells))
+
+
+@benchmark('LazyStr', sizes=(10_000, 100_000, 1_000_000), unit='messages')
+def _lazy_str(messages: int) -> Callable:
+    return lambda: [str(LazyStr(format, i, ',')) for i in range(messages)]
+
+
+@benchmark('CachedLazyStr', sizes=(10_000, 100_000, 1_000_000), unit='messages')
+def _cached_lazy_str(messages: int) -> Callable:
+    def render():
+        for i in range(messages):
+            message = CachedLazyStr(format, i, ',')
+            # a second handler renders the same record
+            str(message), str(message)
+
+    return render
+
+
+# ---------------------------------------------------------------------------
+# sn.async_
+
+
+@benchmark('event loop', sizes=(2_000, 20_000, 100_000), unit='tasks')
+def _loop(tasks: int) -> Callable:
+    return lambda: asyncio.run(_workload(tasks, 10))
+
+
+@benchmark('LoopSmokeTester', sizes=(2_000, 20_000, 100_000), unit='tasks')
+def _loop_smoke_tester(tasks: int) -> Callable:
+    async def profiled():
+        async with LoopSmokeTester(handler=lambda snapshot: None, interval=0.25):
+            await _workload(tasks, 10)
+
+    return lambda: asyncio.run(profiled())
+
+
+# ---------------------------------------------------------------------------
+
+
+def _git(*args: str) -> str:
+    try:
+        return subprocess.run(['git', *args], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def _environment() -> dict:
+    packages = {}
+
+    for name in PACKAGES:
+        try:
+            packages[name] = importlib.metadata.version(name)
+        except importlib.metadata.PackageNotFoundError:
+            packages[name] = None
+
+    return {
+        'commit': _git('rev-parse', '--short', 'HEAD') or 'unknown',
+        'dirty': bool(_git('status', '--porcelain', '--untracked-files=no')),
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'packages': packages,
+    }
+
+
+def run(*, scales: tuple=('small', 'medium'), only: list=None, repeat: int=None) -> dict:
+    """
+    Run the registered benchmarks.
+
+    Parameters
+    ----------
+    scales : tuple = [default: ('small', 'medium')]
+        which of SCALES to run
+
+    only : list = [default: None]
+        regular expressions, run only the benchmarks whose name matches one
+
+    repeat : int = [default: None]
+        times to repeat each measurement, defaults to REPEAT of the scale
+
+    Returns
+    -------
+    results : dict
+        the environment, and the timings of each benchmark per scale
+    """
+    document = {**_environment(), 'results': {}}
+
+    for name, bench in BENCHMARKS.items():
+        if only and not any(re.search(pattern, name, re.IGNORECASE) for pattern in only):
+            continue
+
+        for scale in scales:
+            size = bench.sizes[scale]
+            samples = timings(bench.setup(size), repeat=repeat or REPEAT[scale])
+
+            document['results'].setdefault(name, {})[scale] = {
+                'size': size,
+                'unit': bench.unit,
+                'best': min(samples),
+                'median': statistics.median(samples),
+                'timings': samples,
+            }
+
+            print(f'{name:<28} {scale:<7} {size:>12,} {bench.unit:<8} {min(samples) * 1000:>12.2f} ms', flush=True)
+
+    return document
+
+
+def compare(old: dict, new: dict, *, threshold: float=1.10) -> list:
+    """
+    Print the change in best timings between two result files.
+
+    Parameters
+    ----------
+    old, new : dict
+        documents written by run
+
+    threshold : float = [default: 1.10]
+        ratio of new to old above which a timing counts as a regression
+
+    Returns
+    -------
+    regressions : list
+        (name, scale) of every regression
+    """
+    regressions = []
+
+    print(f'{old["commit"]} --> {new["commit"]}')
+
+    for name, scales in new['results'].items():
+        for scale, result in scales.items():
+            before = old['results'].get(name, {}).get(scale)
+
+            if before is None or before['size'] != result['size']:
+                continue
+
+            ratio = result['best'] / before['best']
+            flag = ''
+
+            if ratio > threshold:
+                flag = 'REGRESSION'
+                regressions.append((name, scale))
+            elif ratio < 1 / threshold:
+                flag = 'improved'
+
+            print(
+                f'{name:<28} {scale:<7} {before["best"] * 1000:>10.2f} ms '
+                f'--> {result["best"] * 1000:>10.2f} ms  {ratio:>6.2f}x  {flag}'
+            )
+
+    return regressions
+
+
+def main(argv: list=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.suite', description=__doc__.split('\n\n')[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_ = commands.add_parser('run', help='run the benchmarks, and save their timings as JSON')
+    run_.add_argument('--scale', nargs='+', choices=SCALES, default=['small', 'medium'])
+    run_.add_argument('--only', nargs='+', metavar='PATTERN', help='run only matching benchmarks')
+    run_.add_argument('--repeat', type=int, help='override the repeats of every scale')
+    run_.add_argument('--output', type=pathlib.Path, help='defaults to benchmarks/results/<commit>.json')
+
+    compare_ = commands.add_parser('compare', help='compare two result files')
+    compare_.add_argument('old', type=pathlib.Path)
+    compare_.add_argument('new', type=pathlib.Path)
+    compare_.add_argument('--threshold', type=float, default=1.10)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'compare':
+        old, new = (json.loads(fp.read_text()) for fp in (args.old, args.new))
+        return 1 if compare(old, new, threshold=args.threshold) else 0
+
+    document = run(scales=tuple(args.scale), only=args.only, repeat=args.repeat)
+    output = args.output or RESULTS / f'{document["commit"]}{"-dirty" if document["dirty"] else ""}.json'
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(document, indent=2))
+    print(f'\nwrote {output}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
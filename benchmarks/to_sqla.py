@@ -0,0 +1,59 @@
+"""
+Compare the fast-path type inference of sn.dataframe.to_sqla to a full scan.
+
+    python -m benchmarks.to_sqla
+"""
+import datetime
+
+import sqlalchemy as sa
+import pandas as pd
+import numpy as np
+
+from sn.dataframe import to_sqla
+from benchmarks._harness import best_of, report
+
+
+def make_frame(rows: int, *, seed: int=0) -> pd.DataFrame:
+    """
+    A frame with one column of every flavour to_sqla must distinguish.
+    """
+    rng = np.random.default_rng(seed)
+    ints = rng.integers(0, 1_000_000, size=rows)
+    dates = pd.Timestamp('2000-01-01') + pd.to_timedelta(ints % 10_000, unit='D')
+
+    return pd.DataFrame({
+        'int': ints,
+        'float': rng.random(rows),
+        'bool': ints % 2 == 0,
+        'date': dates,
+        'datetime': dates + pd.to_timedelta(ints % 86_400, unit='s'),
+        'text': pd.Series(ints.astype(str), dtype=object),
+        'object_int': pd.Series(ints, dtype=object).where(ints % 7 != 0, None),
+        'object_date': pd.Series([datetime.date(2020, 1, 1)] * rows, dtype=object),
+    })
+
+
+def main(rows: int=1_000_000) -> None:
+    df = make_frame(rows)
+    engine = sa.create_engine('sqlite://')
+
+    for name in df.columns:
+        column = df[name]
+        results = {
+            'full scan': best_of(lambda: to_sqla(column, full_scan=True), repeat=3),
+            'fast path': best_of(lambda: to_sqla(column), repeat=3),
+        }
+        report(f'to_sqla({name}) @ {rows:,} rows', results)
+
+    reflect = {
+        'full scan': best_of(
+            lambda: [to_sqla(df[c], full_scan=True) for c in df.columns],
+            repeat=3
+        ),
+        'fast path': best_of(lambda: df.sn.reflect('bench', bind=engine), repeat=3),
+    }
+    report(f'SNDF.reflect @ {rows:,} rows x {df.shape[1]} columns', reflect)
+
+
+if __name__ == '__main__':
+    main()
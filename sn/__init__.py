@@ -0,0 +1,53 @@
+"""
+Scripts for work, life, etc.
+
+Submodules are imported on first use, eg. `sn.dataframe`, so that importing
+sn or one of its light submodules - sn.log, sn.dattim.nearest_future - does
+not pull in pandas, NumPy or SQLAlchemy.
+
+The `.sn` DataFrame and Series accessors are registered as soon as pandas is
+imported, by whichever code imports it first.
+"""
+import importlib
+
+from ._lazy import on_import
+
+
+_SUBMODULES = ('async_', 'database', 'dataframe', 'dattim', 'io', 'log', 'metrics', 'models', 'sketch')
+
+
+def __getattr__(name: str):
+    if name in _SUBMODULES:
+        return importlib.import_module(f'{__name__}.{name}')
+
+    if name == 'instrument':
+        from .metrics import instrument
+        return instrument
+
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__() -> list:
+    return sorted([*globals(), *_SUBMODULES, 'instrument'])
+
+
+def _accessor(name: str):
+    """
+    Build the accessor for pandas, which imports sn.dataframe on first use.
+    """
+    def accessor(obj):
+        from . import dataframe
+        return getattr(dataframe, name)(obj)
+
+    accessor.__name__ = accessor.__qualname__ = name
+    return accessor
+
+
+def _register_accessors(pandas) -> None:
+    from pandas.api.extensions import register_dataframe_accessor, register_series_accessor
+
+    register_dataframe_accessor('sn')(_accessor('SNDF'))
+    register_series_accessor('sn')(_accessor('SNSeries'))
+
+
+on_import('pandas', _register_accessors)
@@ -0,0 +1,43 @@
+"""
+Holiday calendars of sn.dattim.
+
+They live apart from sn.dattim since defining them imports pandas, access them
+as sn.dattim.USBusinessHolidayCalendar and sn.dattim.USHolidayCalendar.
+"""
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar, Holiday, nearest_workday,
+    USMartinLutherKingJr, USPresidentsDay, USMemorialDay, USLaborDay,
+    USColumbusDay, USThanksgivingDay
+)
+
+
+class USBusinessHolidayCalendar(AbstractHolidayCalendar):
+    """
+    A US Holiday calendar with adjustments for Corporate-Honored Holidays.
+    """
+    rules = [
+        Holiday('New Years Day', month=1, day=1),
+        Holiday('New Years Day Observed', month=1, day=1, observance=nearest_workday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        USMemorialDay,
+        Holiday('July 4th', month=7, day=4),
+        Holiday('July 4th Observed', month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USColumbusDay,
+        Holiday('Veterans Day', month=11, day=11),
+        Holiday('Veterans Day Observed', month=11, day=11, observance=nearest_workday),
+        USThanksgivingDay,
+        Holiday('Christmas', month=12, day=25),
+        Holiday('Christmas Observed', month=12, day=25, observance=nearest_workday),
+    ]
+
+
+class USHolidayCalendar(AbstractHolidayCalendar):
+    """
+    A US Holiday calendar to denote special days that don't affect working days.
+    """
+    rules = [
+#         Holiday('Superbowl Sunday', month=2, day=1, observance=nearest_future('sunday')),
+        Holiday('New Years Eve', month=12, day=31)
+    ]
@@ -0,0 +1,121 @@
+"""
+Defer importing heavy dependencies until they are first used.
+
+pandas, NumPy and SQLAlchemy take hundreds of milliseconds to import, which
+short-lived jobs that only want sn.log or sn.dattim.nearest_future should not
+pay for.
+"""
+from collections.abc import Callable
+import importlib.util
+import importlib
+import threading
+import sys
+
+
+class LazyModule:
+    """
+    Stand-in for a module, which imports it on first attribute access.
+
+    The first access also rebinds the stand-in's name, in the namespace which
+    holds it, to the real module. From then on lookups go straight to the
+    module and cost nothing extra.
+
+    Usage
+    -----
+    np = LazyModule('numpy', globals(), 'np')
+
+    Parameters
+    ----------
+    name : str
+        fully qualified name of the module to import
+
+    namespace : dict
+        globals() of the module holding the stand-in
+
+    alias : str
+        name the stand-in is bound to in namespace
+    """
+    __slots__ = ('_name', '_namespace', '_alias')
+
+    def __init__(self, name: str, namespace: dict, alias: str):
+        self._name = name
+        self._namespace = namespace
+        self._alias = alias
+
+    def __getattr__(self, attr: str):
+        module = importlib.import_module(self._name)
+
+        if self._namespace.get(self._alias) is self:
+            self._namespace[self._alias] = module
+
+        return getattr(module, attr)
+
+    def __repr__(self) -> str:
+        return f'<lazy module {self._name!r}>'
+
+
+class _ImportHook:
+    """
+    Run callbacks right after a top-level module has finished importing.
+
+    A meta path finder, see importlib.abc.MetaPathFinder - which is not
+    subclassed here as importing importlib.abc is slow.
+    """
+    def __init__(self):
+        self.callbacks = {}
+        self.lock = threading.Lock()
+
+    def find_spec(self, fullname: str, path, target=None):
+        if fullname not in self.callbacks:
+            return None
+
+        with self.lock:
+            callbacks = self.callbacks.pop(fullname, [])
+
+            if not self.callbacks and self in sys.meta_path:
+                sys.meta_path.remove(self)
+
+        # let the remaining finders locate the module, only its loader is wrapped
+        spec = importlib.util.find_spec(fullname)
+
+        if spec is None or spec.loader is None or not callbacks:
+            return spec
+
+        exec_module = spec.loader.exec_module
+
+        def exec_and_notify(module):
+            exec_module(module)
+
+            for callback in callbacks:
+                callback(module)
+
+        spec.loader.exec_module = exec_and_notify
+        return spec
+
+
+_HOOK = _ImportHook()
+
+
+def on_import(name: str, callback: Callable) -> None:
+    """
+    Call callback(module) once a top-level module is imported.
+
+    If the module has been imported already, callback is called immediately.
+
+    Parameters
+    ----------
+    name : str
+        name of a top-level module, eg. 'pandas'
+
+    callback : callable
+        function to call with the module
+    """
+    if name in sys.modules:
+        callback(sys.modules[name])
+        return
+
+    with _HOOK.lock:
+        _HOOK.callbacks.setdefault(name, []).append(callback)
+
+        if _HOOK not in sys.meta_path:
+            sys.meta_path.insert(0, _HOOK)
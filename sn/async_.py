@@ -1,68 +1,710 @@
+from __future__ import annotations
+
+from typing import Callable, Union, Iterable, AsyncIterable, AsyncIterator, Awaitable
+import concurrent.futures as cf
+import functools as ft
+import threading
+import weakref
+import atexit
+import collections
+import traceback
 import datetime
+import io
 import asyncio
 import logging
+import inspect
 import json
+import time
+
+from ._lazy import LazyModule
+from .metrics import instrument
+from .log import CachedLazyStr
+
+np = LazyModule('numpy', globals(), 'np')
 
 
 log = logging.getLogger(__name__)
 
 
+class _RingBuffer:
+    """
+    Fixed-size buffer of the most recent float observations.
+
+    Attributes
+    ----------
+    data : np.ndarray
+        storage, only the first min(count, size) entries are meaningful
+
+    count : int
+        total number of observations ever appended
+    """
+    __slots__ = ('data', 'count')
+
+    def __init__(self, size: int):
+        self.data = np.zeros(size, dtype=np.float64)
+        self.count = 0
+
+    def __len__(self) -> int:
+        return min(self.count, len(self.data))
+
+    def append(self, value: float) -> None:
+        self.data[self.count % len(self.data)] = value
+        self.count += 1
+
+    def values(self) -> np.ndarray:
+        return self.data[:len(self)]
+
+    def summary(self, percentiles=(50, 90, 99)) -> dict:
+        """
+        Percentiles, mean, and max of the buffered observations.
+        """
+        values = self.values()
+
+        if not len(values):
+            return {'samples': 0, **{f'p{p}': None for p in percentiles}, 'mean': None, 'max': None}
+
+        points = np.percentile(values, percentiles)
+        return {
+            'samples': len(values),
+            **{f'p{p}': float(v) for p, v in zip(percentiles, points)},
+            'mean': float(values.mean()),
+            'max': float(values.max()),
+        }
+
+
+class _SlowCallbackFilter(logging.Filter):
+    """
+    Intercept asyncio's debug-mode "Executing <handle> took N seconds" records.
+
+    The record is emitted synchronously from within the loop's _run_once,
+    while loop._current_handle still refers to the offending callback, so its
+    scheduling stack and (for Tasks) its coroutine stack can be captured.
+    """
+    def __init__(self, tester: 'LoopSmokeTester'):
+        super().__init__()
+        self.tester = tester
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        # asyncio may log exceptions, or other objects, rather than format strings
+        if isinstance(record.msg, str) and record.msg.startswith('Executing') and len(record.args or ()) == 2:
+            try:
+                running = asyncio.get_running_loop()
+            except RuntimeError:
+                running = None
+
+            if running is self.tester.loop:
+                self.tester._record_slow_callback(*record.args)
+
+        return True
+
+
 class LoopSmokeTester:
     """
     Measure performance of an event loop.
+
+    The profiler piggy-backs on the loop it is monitoring, using only timer
+    callbacks and hooks, so no extra tasks or threads are involved.
+
+        - lag : a timer is scheduled every `sample_interval` seconds, and the
+          delay between when it was due and when it actually ran is recorded
+          into a fixed-size ring buffer
+        - tasks : a task factory counts task creation and completion as it
+          happens, rather than scanning asyncio.all_tasks
+        - slow callbacks : optionally, the loop is put in debug mode and every
+          callback taking longer than `slow_callback_duration` is captured
+          along with its stack
+        - fanout : calls in flight through amap, TokenBucket, and run_blocking
+          are reported alongside, so lag can be attributed to them
+
+    Every `interval` seconds, a snapshot of the above is passed to `handler`.
+    The time spent in the profiler's own callbacks is measured and reported;
+    if it exceeds `max_overhead` of wall time, lag sampling backs off.
+
+    Debug mode has a real cost of its own which cannot be measured from here;
+    asyncio records a traceback for every scheduled callback, which slows a
+    busy loop by an order of magnitude. Slow callback detection is therefore
+    off by default, and best reserved for diagnosing a known problem.
+
+    Usage
+    -----
+    async with LoopSmokeTester(handler=print):
+        await main()
+
+    # or, for the lifetime of the loop
+    asyncio.create_task(LoopSmokeTester().monitor())
+
     Attributes
     ----------
     loop : asyncio.AbstractEventLoop
         event loop to keep track of
+
+    handler : callable
+        receives each snapshot as a JSON-serializable dict, may be a coroutine
+        function
+
+    interval : float
+        seconds between snapshots
+
+    sample_interval : float
+        seconds between lag samples
+
+    lag : _RingBuffer
+        the most recent lag samples, in seconds
     """
-    def __init__(self, loop: asyncio.AbstractEventLoop = None):
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop=None,
+        *,
+        handler: Callable[[dict], object]=None,
+        interval: float=1.0,
+        sample_interval: float=0.05,
+        buffer_size: int=1200,
+        slow_callback_duration: float=None,
+        max_slow_callbacks: int=100,
+        max_overhead: float=0.01
+    ):
         self.loop = loop or asyncio.get_event_loop()
+        self.handler = handler or self._log_snapshot
+        self.interval = interval
+        self.sample_interval = sample_interval
+        self.lag = _RingBuffer(buffer_size)
+        self.slow_callback_duration = slow_callback_duration
+        self.slow_callbacks = collections.deque(maxlen=max_slow_callbacks)
+        self.max_overhead = max_overhead
+
+        self.tasks_created = 0
+        self.tasks_completed = 0
+
+        self._base_sample_interval = sample_interval
+        self._self_time = 0.0
+        self._window = None
+        self._handles = {}
+        self._previous = None
+        self._filter = None
+        self._stopped = None
+
+    @staticmethod
+    def _log_snapshot(data: dict) -> None:
+        log.info('LOOP INFO:\n%s', CachedLazyStr(json.dumps, data, indent=4))
+
+    @property
+    def running(self) -> bool:
+        return self._stopped is not None
+
+    def start(self) -> 'LoopSmokeTester':
+        """
+        Install the profiler's hooks on the loop.
+
+        Tasks which already exist are counted once, here; from then on the
+        task factory keeps count.
+        """
+        if self.running:
+            return self
 
-    async def monitor(self, handler=None):
+        t0 = time.perf_counter()
+
+        for task in asyncio.all_tasks(loop=self.loop):
+            self.tasks_created += 1
+            task.add_done_callback(self._on_task_done)
+
+        self._previous = {
+            'task_factory': self.loop.get_task_factory(),
+            'debug': self.loop.get_debug(),
+            'slow_callback_duration': self.loop.slow_callback_duration,
+        }
+        self.loop.set_task_factory(self._task_factory)
+
+        if self.slow_callback_duration is not None:
+            self.loop.slow_callback_duration = self.slow_callback_duration
+            self.loop.set_debug(True)
+            self._filter = _SlowCallbackFilter(self)
+            logging.getLogger('asyncio').addFilter(self._filter)
+
+        now = self.loop.time()
+        self._stopped = self.loop.create_future()
+        self._window = (now, time.perf_counter(), self.tasks_created)
+        self._handles['sample'] = self.loop.call_at(now + self.sample_interval, self._sample, now + self.sample_interval)
+        self._handles['snapshot'] = self.loop.call_later(self.interval, self._emit)
+        self._self_time += time.perf_counter() - t0
+        return self
+
+    def stop(self) -> dict:
+        """
+        Remove the profiler's hooks, restoring the loop's prior settings.
+
+        Returns
+        -------
+        snapshot : dict
+            the final snapshot, which is also passed to the handler
+        """
+        if not self.running:
+            return None
+
+        for handle in self._handles.values():
+            handle.cancel()
+
+        if self.loop.get_task_factory() == self._task_factory:
+            self.loop.set_task_factory(self._previous['task_factory'])
+
+        if self._filter is not None:
+            logging.getLogger('asyncio').removeFilter(self._filter)
+            self.loop.set_debug(self._previous['debug'])
+            self.loop.slow_callback_duration = self._previous['slow_callback_duration']
+            self._filter = None
+
+        data = self._emit(reschedule=False)
+
+        if not self._stopped.done():
+            self._stopped.set_result(None)
+
+        self._stopped = None
+        return data
+
+    async def __aenter__(self) -> 'LoopSmokeTester':
+        return self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        self.stop()
+
+    async def monitor(self) -> None:
         """
-        TODO: How will our develop utilize this tool? How to start it?
+        Profile the loop until stopped or cancelled.
         """
-        if handler is None:
-            handler = lambda data: log.info(f'LOOP INFO:\n{json.dumps(data, indent=4)}')
+        self.start()
+
+        try:
+            await asyncio.shield(self._stopped)
+        finally:
+            self.stop()
+
+    # hooks, these all run on the monitored loop
+
+    def _task_factory(self, loop, coro, **kwargs) -> asyncio.Task:
+        factory = self._previous['task_factory']
+
+        if factory is None:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+        else:
+            task = factory(loop, coro, **kwargs)
+
+        # only the bookkeeping is overhead, the task would exist regardless
+        t0 = time.perf_counter()
+        self.tasks_created += 1
+        task.add_done_callback(self._on_task_done)
+        self._self_time += time.perf_counter() - t0
+        return task
 
-        while self.loop.is_running():
-            tasks = await self.count_active_tasks()
-            lag = await self.measure_lag()
+    def _on_task_done(self, task: asyncio.Task) -> None:
+        self.tasks_completed += 1
 
-            data = {
-                'local_time': datetime.datetime.now(),
-                'loop_time': self.loop.time(),
-                'number_active_tasks': tasks,
-                'lag': lag
-            }
+    def _sample(self, due: float) -> None:
+        t0 = time.perf_counter()
+        now = self.loop.time()
+        self.lag.append(max(now - due, 0.0))
 
-            handler(data)
-            await asyncio.sleep(1)
+        due = now + self.sample_interval
+        self._handles['sample'] = self.loop.call_at(due, self._sample, due)
+        self._self_time += time.perf_counter() - t0
 
+    def _record_slow_callback(self, callback: str, duration: float) -> None:
+        t0 = time.perf_counter()
+        handle = getattr(self.loop, '_current_handle', None)
+        task = getattr(getattr(handle, '_callback', None), '__self__', None)
+        stack = []
+
+        # where the callback was scheduled from, then where the task is now
+        if handle is not None:
+            stack = traceback.format_list(getattr(handle, '_source_traceback', None) or [])
+
+        if isinstance(task, asyncio.Task):
+            buffer = io.StringIO()
+            task.print_stack(file=buffer)
+            stack.append(buffer.getvalue())
+
+        self.slow_callbacks.append({
+            'local_time': datetime.datetime.now().isoformat(),
+            'callback': callback,
+            'duration': duration,
+            'stack': stack,
+        })
+        self._self_time += time.perf_counter() - t0
+
+    def _emit(self, reschedule: bool=True) -> dict:
+        t0 = time.perf_counter()
+        data = self.snapshot()
+        self._adjust_sampling(data['overhead']['fraction'])
+        self._window = (self.loop.time(), time.perf_counter(), self.tasks_created)
+        self._self_time = 0.0
+
+        try:
+            result = self.handler(data)
+
+            if inspect.isawaitable(result):
+                asyncio.ensure_future(result, loop=self.loop)
+        except Exception:
+            log.exception('LoopSmokeTester handler failed')
+
+        if reschedule:
+            self._handles['snapshot'] = self.loop.call_later(self.interval, self._emit)
+
+        self._self_time += time.perf_counter() - t0
+        return data
+
+    def _adjust_sampling(self, fraction: float) -> None:
+        """
+        Bound the profiler's own overhead by backing off lag sampling.
+        """
+        if fraction > self.max_overhead:
+            self.sample_interval = min(self.sample_interval * 2, self.interval)
+        elif fraction < self.max_overhead / 4:
+            self.sample_interval = max(self.sample_interval / 2, self._base_sample_interval)
+
+    def snapshot(self) -> dict:
+        """
+        Summarize the loop's performance since the last snapshot.
+
+        Returns
+        -------
+        data : dict
+            JSON-serializable loop statistics
+        """
+        loop_time, wall_time, created = self._window or (self.loop.time(), time.perf_counter(), self.tasks_created)
+        elapsed = max(time.perf_counter() - wall_time, 1e-9)
+        slow, self.slow_callbacks = list(self.slow_callbacks), collections.deque(maxlen=self.slow_callbacks.maxlen)
+
+        return {
+            'local_time': datetime.datetime.now().isoformat(),
+            'loop_time': self.loop.time(),
+            'window': self.loop.time() - loop_time,
+            'lag': self.lag.summary(),
+            'tasks': {
+                'active': self.tasks_created - self.tasks_completed,
+                'created': self.tasks_created - created,
+                'created_total': self.tasks_created,
+                'completed_total': self.tasks_completed,
+            },
+            'slow_callbacks': slow,
+            'fanout': dict(_activity(self.loop)),
+            'overhead': {
+                'seconds': self._self_time,
+                'fraction': self._self_time / elapsed,
+                'sample_interval': self.sample_interval,
+            },
+        }
+
+    @instrument(name='LoopSmokeTester.count_active_tasks')
     async def count_active_tasks(self) -> int:
         """
         Total the number of unfinished tasks on the loop.
-        Parameters
-        ----------
-        None
+
+        While the profiler is running this is read from the task factory's
+        counts, otherwise every task on the loop is scanned.
+
         Returns
         -------
         active_tasks : int
         """
+        if self.running:
+            return self.tasks_created - self.tasks_completed
+
         return sum(1 for t in asyncio.all_tasks(loop=self.loop) if not t.done())
 
+    @instrument(name='LoopSmokeTester.measure_lag')
     async def measure_lag(self, interval: float=0.00) -> float:
         """
         Measure the lag time of the loop.
+
         Lag is defined as the difference between the intended and actual amount
         of time spend during this task. If the lag time is too much greater than
         the interval slept, we can say that there might be performance issues
         in the Event Loop.
+
         Parameters
         ----------
-        check_interval : float, default 0.25
-            time in seconds between checks to monitor loop lag
+        interval : float = [default: 0.0]
+            time in seconds to sleep for
         """
         start = self.loop.time()
         await asyncio.sleep(interval)
-        return self.loop.time() - start - interval
\ No newline at end of file
+        return self.loop.time() - start - interval
+
+
+# ---------------------------------------------------------------------------
+# bounded concurrency
+# ---------------------------------------------------------------------------
+
+_ACTIVITY = weakref.WeakKeyDictionary()
+
+
+def _activity(loop: asyncio.AbstractEventLoop) -> collections.Counter:
+    """
+    Fan-out gauges for a loop, read by LoopSmokeTester.
+    """
+    try:
+        return _ACTIVITY[loop]
+    except KeyError:
+        return _ACTIVITY.setdefault(loop, collections.Counter(amap_in_flight=0, blocking_in_flight=0, rate_limited=0))
+
+
+class TokenBucket:
+    """
+    Limit the rate of some operation, while allowing short bursts.
+
+    Tokens accrue at `rate` per second, up to `capacity`. Each acquisition
+    spends tokens, waiting for them to accrue if there are not enough.
+
+    Usage
+    -----
+    bucket = TokenBucket(rate=50)
+
+    async with bucket:
+        await session.get(url)
+
+    Attributes
+    ----------
+    rate : float
+        tokens added per second
+
+    capacity : float
+        most tokens which may be held at once, aka the burst size
+    """
+    def __init__(self, rate: float, *, capacity: float=None):
+        if rate <= 0:
+            raise ValueError(f'rate must be positive, got {rate}')
+
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float=1) -> None:
+        """
+        Spend tokens, waiting until enough are available.
+
+        Parameters
+        ----------
+        tokens : float = [default: 1]
+            cost of the operation, may not exceed capacity
+        """
+        if tokens > self.capacity:
+            raise ValueError(f'cannot acquire {tokens} tokens from a bucket of capacity {self.capacity}')
+
+        self._refill()
+
+        if self._tokens < tokens:
+            gauges = _activity(asyncio.get_running_loop())
+            gauges['rate_limited'] += 1
+
+            try:
+                while self._tokens < tokens:
+                    await asyncio.sleep((tokens - self._tokens) / self.rate)
+                    self._refill()
+            finally:
+                gauges['rate_limited'] -= 1
+
+        self._tokens -= tokens
+
+    async def __aenter__(self) -> 'TokenBucket':
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        pass
+
+
+async def _aiter(iterable: Union[Iterable, AsyncIterable]) -> AsyncIterator:
+    if hasattr(iterable, '__aiter__'):
+        async for item in iterable:
+            yield item
+    else:
+        for item in iterable:
+            yield item
+
+
+async def amap(
+    fn: Callable[..., Awaitable],
+    iterable: Union[Iterable, AsyncIterable],
+    *,
+    limit: int=10,
+    limiter: TokenBucket=None
+) -> AsyncIterator:
+    """
+    Apply a coroutine function to every item, with bounded concurrency.
+
+    At most `limit` calls are in flight at once. The next item is only pulled
+    from `iterable` when a call finishes, so a lazy or unbounded input is
+    consumed no faster than it can be processed. Results are yielded in the
+    order they finish.
+
+    If any call raises, the remaining calls are cancelled and the exception
+    propagates. Closing the generator early also cancels them.
+
+    Usage
+    -----
+    async for rows in amap(fetch_partition, partitions, limit=8):
+        ...
+
+    Parameters
+    ----------
+    fn : coroutine function
+        called with each item
+
+    iterable : iterable or async iterable
+        items to process
+
+    limit : int = [default: 10]
+        most calls to run concurrently
+
+    limiter : TokenBucket = [default: None]
+        rate limit applied as each call starts
+
+    Yields
+    ------
+    result : any
+        return value of fn, as each call finishes
+    """
+    if limit < 1:
+        raise ValueError(f'limit must be at least 1, got {limit}')
+
+    async def call(item):
+        if limiter is not None:
+            await limiter.acquire()
+
+        return await fn(item)
+
+    gauges = _activity(asyncio.get_running_loop())
+    items = _aiter(iterable)
+    pending = set()
+    exhausted = False
+
+    try:
+        while True:
+            while not exhausted and len(pending) < limit:
+                try:
+                    item = await items.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                else:
+                    pending.add(asyncio.ensure_future(call(item)))
+                    gauges['amap_in_flight'] += 1
+
+            if not pending:
+                return
+
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            gauges['amap_in_flight'] -= len(done)
+
+            for future in done:
+                yield future.result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+        gauges['amap_in_flight'] -= len(pending)
+
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        await items.aclose()
+
+
+# ---------------------------------------------------------------------------
+# blocking calls
+# ---------------------------------------------------------------------------
+
+_EXECUTORS = {}
+_EXECUTORS_LOCK = threading.Lock()
+
+
+def get_executor(kind: str='thread', *, workers: int=None) -> cf.Executor:
+    """
+    Retrieve the shared, lazily-created, thread or process pool.
+
+    One pool is kept per kind and size. The pools are shut down when the
+    interpreter exits.
+
+    Parameters
+    ----------
+    kind : str = [default: 'thread']
+        one of 'thread' or 'process'
+
+    workers : int = [default: None]
+        size of the pool, defaults to concurrent.futures' own defaults
+
+    Returns
+    -------
+    executor : concurrent.futures.Executor
+    """
+    pools = {'thread': cf.ThreadPoolExecutor, 'process': cf.ProcessPoolExecutor}
+
+    if kind not in pools:
+        raise ValueError(f'kind must be one of {list(pools)}, got {kind!r}')
+
+    with _EXECUTORS_LOCK:
+        if (kind, workers) not in _EXECUTORS:
+            if not _EXECUTORS:
+                atexit.register(shutdown_executors)
+
+            _EXECUTORS[(kind, workers)] = pools[kind](max_workers=workers)
+
+        return _EXECUTORS[(kind, workers)]
+
+
+def shutdown_executors(*, wait: bool=True) -> None:
+    """
+    Shut down the shared pools created by get_executor.
+    """
+    with _EXECUTORS_LOCK:
+        executors = list(_EXECUTORS.values())
+        _EXECUTORS.clear()
+
+    for executor in executors:
+        executor.shutdown(wait=wait)
+
+
+async def run_blocking(fn: Callable, *args, executor: Union[str, cf.Executor]='thread', **kwargs):
+    """
+    Run a blocking function without blocking the event loop.
+
+    I/O-bound work such as spss_convert or a database load belongs on the
+    thread pool. CPU-bound pandas work which holds the GIL belongs on the
+    process pool, as long as fn, its arguments, and its result can be
+    pickled.
+
+    Usage
+    -----
+    path = await run_blocking(spss_convert, 'survey.sav', to='csv')
+    stats = await run_blocking(SNDF.index_statistics, df.sn, executor='process')
+
+    Parameters
+    ----------
+    fn : callable
+        blocking function to call
+
+    *args, **kwargs
+        any position or keyword arguments to pass to fn
+
+    executor : str or Executor = [default: 'thread']
+        'thread', 'process', or an Executor of your own
+
+    Returns
+    -------
+    result : any
+        return value of fn
+    """
+    if isinstance(executor, str):
+        executor = get_executor(executor)
+
+    loop = asyncio.get_running_loop()
+    gauges = _activity(loop)
+    gauges['blocking_in_flight'] += 1
+
+    try:
+        return await loop.run_in_executor(executor, ft.partial(fn, *args, **kwargs))
+    finally:
+        gauges['blocking_in_flight'] -= 1
@@ -1,21 +1,866 @@
-from typing import Callable
+from __future__ import annotations
 
-from sqlalchemy.ext.declarative import declarative_base
-import sqlalchemy as sa
+from typing import Callable, Union
+import concurrent.futures as cf
+import functools as ft
+import collections
+import contextlib
+import itertools
+import asyncio
+import threading
+import hashlib
+import weakref
+import logging
+import pathlib
+import pickle
+import json
+import time
+import io
+import os
+
+from ._lazy import LazyModule
+
+sa = LazyModule('sqlalchemy', globals(), 'sa')
+pd = LazyModule('pandas', globals(), 'pd')
+
+
+log = logging.getLogger(__name__)
 
     
+@ft.lru_cache(maxsize=None)
+def _dialect(name: str) -> sa.engine.Dialect:
+    """
+    Instantiate a dialect by name, without importing its DBAPI driver.
+    """
+    return sa.dialects.registry.load(name)()
+
+
 def show_create_statements(
     base_model: sa.schema.Table,
     *,
     engine: sa.engine.Engine=None,
-    log: Callable[[str], None]=print
+    log: Callable[[str], None]=print,
+    cache: 'SchemaCache'=None
 ) -> None:
     """
-    TODO
+    Log the CREATE TABLE statement of every table in a model's MetaData.
+
+    Tables are logged in dependency order, so that a table always comes after
+    the tables its foreign keys refer to.
+
+    Parameters
+    ----------
+    base_model : sqlalchemy.Table or declarative model
+        anything with a .metadata
+
+    engine : sqlalchemy.engine.Engine = [default: None]
+        database whose dialect to compile for, defaults to PostgreSQL
+
+    log : callable = [default: print]
+        receives each statement
+
+    cache : SchemaCache = [default: None]
+        reuse previously compiled statements
     """
-    if engine is None:
-        engine = sa.create_engine('postgresql://')
+    dialect = _dialect('postgresql') if engine is None else engine.dialect
+
+    for __table__ in base_model.metadata.sorted_tables:
+        if cache is not None:
+            log(cache.ddl(__table__, dialect))
+        else:
+            log(sa.schema.CreateTable(__table__).compile(dialect=dialect))
+
+
+def _fingerprint(*parts) -> str:
+    return hashlib.sha256(json.dumps(parts, default=repr).encode()).hexdigest()[:32]
+
+
+class SchemaCache:
+    """
+    Persist reflected tables, and their compiled DDL, between runs.
+
+    A DataFrame's schema is keyed by a fingerprint of its column names and
+    dtypes, along with the arguments that shape the table - whether each
+    datetime column is all midnights, which decides DATE over DATETIME - and
+    optionally a hash of its first rows, for object columns whose inferred
+    type depends on the values. DDL is keyed by the table's full definition
+    and the dialect. Entries are kept in `directory`, and the most recently
+    used are also kept in memory. Keys include the version of SQLAlchemy,
+    which pickles the tables.
+
+    Usage
+    -----
+    cache = SchemaCache('~/.cache/sn/schemas')
+    model = df.sn.reflect('daily_sales', bind=engine, cache=cache)
+
+    for stmt in schema_diff(model, engine):
+        print(stmt)
+
+    Parameters
+    ----------
+    directory : str or pathlib.Path = [default: '~/.cache/sn/schemas']
+        where cache entries are stored on disk
+
+    max_memory_entries : int = [default: 1024]
+        most entries kept in memory, least recently used are evicted first
+
+    Attributes
+    ----------
+    directory : pathlib.Path
+        where cache entries are stored on disk
+    """
+    def __init__(self, directory: Union[str, pathlib.Path]='~/.cache/sn/schemas', *, max_memory_entries: int=1024):
+        self.directory = pathlib.Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_memory_entries = max_memory_entries
+        self._memory = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def _recall(self, key):
+        """
+        Look up an in-memory entry, marking it as recently used. Hold the lock.
+        """
+        value = self._memory.get(key)
+
+        if value is not None:
+            self._memory.move_to_end(key)
+
+        return value
+
+    def _remember(self, key, value) -> None:
+        """
+        Store an in-memory entry, evicting the least recently used. Hold the lock.
+        """
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def key(
+        self,
+        df: pd.DataFrame,
+        table_name: str,
+        *,
+        pk: list=None,
+        dtypes: dict=None,
+        sample_rows: int=0
+    ) -> str:
+        """
+        Fingerprint the parts of a DataFrame which decide its reflected schema.
+
+        Parameters
+        ----------
+        sample_rows : int = [default: 0]
+            also hash the values of this many leading rows
+        """
+        from .dataframe import _is_all_midnight
+
+        columns = []
+
+        for i, (name, dtype) in enumerate(df.dtypes.items()):
+            column = [str(name), str(dtype)]
+
+            # DATE or DATETIME depends on the values, see to_sqla
+            if pd.api.types.is_datetime64_dtype(dtype) and name not in (dtypes or {}):
+                column.append(_is_all_midnight(df.iloc[:, i].to_numpy()))
+
+            columns.append(column)
+
+        sample = None
+
+        if sample_rows:
+            hashes = pd.util.hash_pandas_object(df.head(sample_rows), index=False).to_numpy()
+            sample = hashlib.sha256(hashes.tobytes()).hexdigest()
+
+        overrides = sorted((str(k), repr(v)) for k, v in (dtypes or {}).items())
+        return _fingerprint('table', sa.__version__, table_name, columns, sorted(pk or []), overrides, sample)
+
+    def _path(self, key: str, suffix: str) -> pathlib.Path:
+        return self.directory / f'{key}.{suffix}'
+
+    def get(self, key: str) -> Union[sa.Table, None]:
+        """
+        Retrieve a cached table, or None.
+        """
+        with self._lock:
+            table = self._recall(key)
+
+        if table is not None:
+            return table
+
+        try:
+            with self._path(key, 'pkl').open('rb') as f:
+                table = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+
+        with self._lock:
+            self._remember(key, table)
+
+        return table
+
+    def put(self, key: str, table: sa.Table) -> sa.Table:
+        """
+        Store a table, in memory and on disk.
+        """
+        path = self._path(key, 'pkl')
+        tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+
+        with tmp.open('wb') as f:
+            pickle.dump(table, f)
+
+        # atomic, so a concurrent reader never sees a partial file
+        os.replace(tmp, path)
+
+        with self._lock:
+            self._remember(key, table)
+
+        return table
+
+    def ddl(self, table: sa.Table, dialect: sa.engine.Dialect) -> str:
+        """
+        Compile a table's CREATE TABLE statement, or fetch it from the cache.
+        """
+        # the same Table object is looked up without fingerprinting it again
+        fast_key = (id(table), len(table.columns), dialect.name)
+
+        with self._lock:
+            entry = self._recall(fast_key)
+
+            if entry is not None and entry[0]() is table:
+                return entry[1]
+
+        key = _fingerprint('ddl', sa.__version__, repr(table), dialect.name)
+
+        with self._lock:
+            stmt = self._recall(key)
+
+            if stmt is not None:
+                self._remember(fast_key, (weakref.ref(table), stmt))
+                return stmt
+
+        path = self._path(key, 'sql')
+
+        try:
+            stmt = path.read_text()
+        except OSError:
+            stmt = str(sa.schema.CreateTable(table).compile(dialect=dialect))
+            tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+            tmp.write_text(stmt)
+            os.replace(tmp, path)
+
+        with self._lock:
+            self._remember(key, stmt)
+            self._remember(fast_key, (weakref.ref(table), stmt))
+
+        return stmt
+
+    def clear(self) -> None:
+        """
+        Remove every entry, in memory and on disk.
+        """
+        with self._lock:
+            self._memory.clear()
+
+        for path in itertools.chain(self.directory.glob('*.pkl'), self.directory.glob('*.sql')):
+            path.unlink(missing_ok=True)
+
+
+# types which a database reports differently than they were declared
+_EQUIVALENT_TYPES = {
+    'FLOAT': 'DOUBLE PRECISION',
+    'FLOAT(53)': 'DOUBLE PRECISION',
+    'FLOAT(23)': 'REAL',
+    'DOUBLE': 'DOUBLE PRECISION',
+    'DATETIME': 'TIMESTAMP',
+    'TIMESTAMP WITHOUT TIME ZONE': 'TIMESTAMP',
+}
+
+# narrowest to widest, a column may always be altered to a wider type
+_WIDENING = [
+    ['SMALLINT', 'INTEGER', 'BIGINT'],
+    ['REAL', 'DOUBLE PRECISION'],
+    ['DATE', 'TIMESTAMP', 'TIMESTAMP WITH TIME ZONE'],
+]
+
+
+def _compiled_type(sa_type: sa.types.TypeEngine, dialect: sa.engine.Dialect) -> str:
+    compiled = sa_type.compile(dialect=dialect).upper()
+    return _EQUIVALENT_TYPES.get(compiled, compiled)
+
+
+def _needs_alter(live: str, new: str) -> bool:
+    """
+    Determine whether a column of type live can no longer hold values of type new.
+
+    Narrowing is never needed, so never done. TEXT-like columns hold anything.
+    """
+    if live == new or live.startswith(('TEXT', 'VARCHAR', 'CHAR', 'CLOB', 'NVARCHAR')):
+        return False
+
+    for family in _WIDENING:
+        if live in family and new in family:
+            return family.index(new) > family.index(live)
+
+    integers, floats, _ = _WIDENING
+
+    if live in floats and new in integers:
+        return False
+
+    return True
+
+
+def schema_diff(
+    table: sa.Table,
+    bind: sa.engine.Engine,
+    *,
+    drop_columns: bool=False,
+    execute: bool=False
+) -> list:
+    """
+    Generate the DDL which brings a live table in line with a model of it.
+
+    If the table does not exist, this is its CREATE TABLE statement. Otherwise
+    columns missing from the database are added, and columns which can no
+    longer hold the model's type are widened (eg. INTEGER to BIGINT, BIGINT to
+    FLOAT, DATE to TIMESTAMP, anything to TEXT) - a column is never narrowed.
+    Columns only in the database are left alone, unless drop_columns=True.
+    Constraints and NULL-ability are not compared.
+
+    SQLite cannot change a column's type in place, such changes are logged
+    and skipped.
+
+    Parameters
+    ----------
+    table : sqlalchemy.Table
+        the desired schema, eg. from SNDF.reflect
+
+    bind : sqlalchemy.engine.Engine
+        database holding the live table
+
+    drop_columns : bool = [default: False]
+        drop live columns which are not in the model
+
+    execute : bool = [default: False]
+        run the statements, in one transaction
+
+    Returns
+    -------
+    statements : list of str
+    """
+    dialect = bind.dialect
+    inspector = sa.inspect(bind)
+
+    if not inspector.has_table(table.name, schema=table.schema):
+        statements = [str(sa.schema.CreateTable(table).compile(dialect=dialect)).strip()]
+    else:
+        preparer = dialect.identifier_preparer
+        name = preparer.format_table(table)
+        live = {c['name']: c['type'] for c in inspector.get_columns(table.name, schema=table.schema)}
+        statements = []
+
+        for column in table.columns:
+            quoted = preparer.quote(column.name)
+            new_type = column.type.compile(dialect=dialect)
+
+            if column.name not in live:
+                statements.append(f'ALTER TABLE {name} ADD COLUMN {quoted} {new_type}')
+            elif _needs_alter(_compiled_type(live[column.name], dialect), _compiled_type(column.type, dialect)):
+                if dialect.name == 'sqlite':
+                    log.warning(f'SQLite cannot alter {table.name}.{column.name} to {new_type}, the table must be rebuilt')
+                elif dialect.name in ('mysql', 'mariadb'):
+                    statements.append(f'ALTER TABLE {name} MODIFY COLUMN {quoted} {new_type}')
+                elif dialect.name == 'mssql':
+                    statements.append(f'ALTER TABLE {name} ALTER COLUMN {quoted} {new_type}')
+                else:
+                    statements.append(f'ALTER TABLE {name} ALTER COLUMN {quoted} TYPE {new_type}')
+
+        if drop_columns:
+            for column_name in live.keys() - set(table.columns.keys()):
+                statements.append(f'ALTER TABLE {name} DROP COLUMN {preparer.quote(column_name)}')
+
+    if execute and statements:
+        with bind.begin() as connection:
+            for stmt in statements:
+                connection.exec_driver_sql(stmt)
+
+    return statements
+
+
+def _table_ddl(table: sa.Table, dialect: sa.engine.Dialect) -> list:
+    """
+    Compile a table's CREATE TABLE and CREATE INDEX statements for a dialect.
+    """
+    return [
+        str(sa.schema.CreateTable(table).compile(dialect=dialect)).strip(),
+        *(str(sa.schema.CreateIndex(index).compile(dialect=dialect)) for index in table.indexes)
+    ]
+
+
+def _dependencies(tables: list) -> dict:
+    """
+    Map each table to the tables its foreign keys must be created after.
+
+    Constraints marked use_alter=True are created separately, so they do not
+    count. Cycles are refused.
+    """
+    known = set(tables)
+    depends_on = {
+        table: {
+            fk.referred_table for fk in table.foreign_key_constraints
+            if not fk.use_alter and fk.referred_table in known and fk.referred_table is not table
+        }
+        for table in tables
+    }
+
+    # Kahn's algorithm, only to detect a cycle
+    remaining = {table: set(deps) for table, deps in depends_on.items()}
+    ready = [table for table, deps in remaining.items() if not deps]
+
+    while ready:
+        done = ready.pop()
+        remaining.pop(done)
+
+        for table, deps in remaining.items():
+            if done in deps:
+                deps.discard(done)
+                if not deps:
+                    ready.append(table)
+
+    if remaining:
+        names = ', '.join(sorted(t.name for t in remaining))
+        raise ValueError(f'foreign keys form a cycle between {names}, mark one ForeignKey with use_alter=True')
+
+    return depends_on
+
+
+def apply_schema(
+    metadata: sa.MetaData,
+    engine: sa.engine.Engine,
+    *,
+    workers: int=None,
+    checkfirst: bool=True
+) -> pd.DataFrame:
+    """
+    Create every table of a MetaData, concurrently where foreign keys allow.
+
+    Tables are scheduled by their foreign keys: a table is created as soon as
+    every table it refers to exists, on a pool of threads each with its own
+    pooled connection. Foreign keys marked use_alter=True are added once all
+    tables exist.
+
+    With one worker, or an in-memory SQLite database, which is private to the
+    thread that opened it, tables are created serially on the calling thread.
+
+    Usage
+    -----
+    engine = sqlalchemy.create_engine('sqlite:///warehouse.db')
+    timings = apply_schema(sn.models.Base.metadata, engine)
+
+    Parameters
+    ----------
+    metadata : sqlalchemy.MetaData or declarative model
+        the tables to create, anything with a .metadata is accepted too
+
+    engine : sqlalchemy.engine.Engine
+        database to create them in
+
+    workers : int = [default: None]
+        most tables created at once, defaults to the engine's pool size
+
+    checkfirst : bool = [default: True]
+        skip tables which already exist
+
+    Returns
+    -------
+    timings : pd.DataFrame
+        per table, whether it was 'created' or 'skipped', and the seconds spent
+    """
+    metadata = getattr(metadata, 'metadata', metadata)
+    tables = list(metadata.sorted_tables)
+    depends_on = _dependencies(tables)
+    dialect = engine.dialect
+    existing = set(sa.inspect(engine).get_table_names()) if checkfirst else set()
+
+    if dialect.name == 'sqlite' and engine.url.database in (None, '', ':memory:'):
+        workers = 1
+
+    workers = max(min(workers or getattr(engine.pool, 'size', lambda: 5)(), len(tables)), 1)
+    report = {}
+
+    def create(table: sa.Table) -> float:
+        start = time.perf_counter()
+
+        with engine.begin() as connection:
+            for stmt in _table_ddl(table, dialect):
+                connection.exec_driver_sql(stmt)
+
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+
+    if workers == 1:
+        # sorted_tables is already in foreign key order
+        for table in tables:
+            report[table.name] = ('skipped', 0.0) if table.name in existing else ('created', create(table))
+    else:
+        waiting = {table: set(deps) for table, deps in depends_on.items()}
+
+        with cf.ThreadPoolExecutor(max_workers=workers) as pool:
+            running = {}
+
+            def release(done: sa.Table=None) -> None:
+                for table, deps in list(waiting.items()):
+                    deps.discard(done)
+
+                    # a skipped table releases its dependents recursively
+                    if deps or table not in waiting:
+                        continue
+
+                    del waiting[table]
+
+                    if table.name in existing:
+                        report[table.name] = ('skipped', 0.0)
+                        release(table)
+                    else:
+                        running[pool.submit(create, table)] = table
+
+            release()
+
+            while running:
+                done, _ = cf.wait(running, return_when=cf.FIRST_COMPLETED)
+
+                for future in done:
+                    table = running.pop(future)
+                    report[table.name] = ('created', future.result())
+                    release(table)
+
+    deferred = [fk for table in tables for fk in table.foreign_key_constraints if fk.use_alter]
+
+    if deferred and dialect.name != 'sqlite':
+        with engine.begin() as connection:
+            for fk in deferred:
+                if fk.table.name not in existing:
+                    connection.execute(sa.schema.AddConstraint(fk))
+
+    elapsed = time.perf_counter() - start
+    created = sum(status == 'created' for status, _ in report.values())
+    log.info(f'applied schema, created {created} of {len(tables)} tables in {elapsed:.2f}s')
+
+    return pd.DataFrame.from_dict(report, orient='index', columns=['status', 'seconds'])\
+             .reindex([t.name for t in tables])
+
+
+def _null_aware_columns(df: pd.DataFrame) -> list:
+    """
+    Convert each column of a DataFrame to an object array, NULLs as None.
+    """
+    arrays = []
+
+    for i in range(df.shape[1]):
+        column = df.iloc[:, i]
+        values = column.to_numpy(dtype=object, copy=True)
+        values[column.isna().to_numpy()] = None
+        arrays.append(values)
+
+    return arrays
+
+
+def _records(df: pd.DataFrame, keys: list) -> list:
+    """
+    Convert a DataFrame to a list of dictionaries, suitable for executemany.
+    """
+    return [dict(zip(keys, row)) for row in zip(*_null_aware_columns(df))]
+
+
+def _max_bind_parameters(dialect) -> int:
+    """
+    Maximum number of bound parameters in a single statement.
+    """
+    if dialect.name == 'sqlite':
+        import sqlite3
+
+        if sqlite3.sqlite_version_info < (3, 32, 0):
+            return 999
+
+    return 32766
+
+
+def _insert_executemany(conn, table: sa.Table, chunk: pd.DataFrame) -> None:
+    conn.execute(table.insert(), _records(chunk, list(chunk.columns)))
+
+
+def _insert_multirow(conn, table: sa.Table, chunk: pd.DataFrame) -> None:
+    for sql, params in _multirow_statements(conn.dialect, table, chunk):
+        conn.exec_driver_sql(sql, params)
+
+
+def _multirow_statements(dialect, table: sa.Table, chunk: pd.DataFrame) -> list:
+    """
+    Render a chunk as multi-row INSERT statements, with their parameters.
+    """
+    preparer = dialect.identifier_preparer
+
+    try:
+        placeholder = {'qmark': '?', 'format': '%s', 'pyformat': '%s'}[dialect.paramstyle]
+    except KeyError:
+        raise ValueError(f'multirow inserts do not support paramstyle {dialect.paramstyle!r}') from None
+
+    arrays = _null_aware_columns(chunk)
+
+    # apply each column's bind processor once per column, rather than letting
+    # sqlalchemy compile and process a giant VALUES clause per statement
+    for i, name in enumerate(chunk.columns):
+        process = table.c[name].type.dialect_impl(dialect).bind_processor(dialect)
+
+        if process is not None:
+            arrays[i] = [None if v is None else process(v) for v in arrays[i]]
+
+    rows = list(zip(*arrays))
+    rows_per_stmt = max(_max_bind_parameters(dialect) // max(len(arrays), 1), 1)
+    columns = ', '.join(preparer.quote(c) for c in chunk.columns)
+    values = f'({", ".join([placeholder] * len(arrays))})'
+
+    statements = []
+
+    for start in range(0, len(rows), rows_per_stmt):
+        batch = rows[start:start + rows_per_stmt]
+        sql = f'INSERT INTO {preparer.format_table(table)} ({columns}) VALUES {", ".join([values] * len(batch))}'
+        statements.append((sql, tuple(v for row in batch for v in row)))
+
+    return statements
+
+
+def _copy_statement(dialect, table: sa.Table, chunk: pd.DataFrame) -> tuple:
+    """
+    Render a chunk as a COPY FROM STDIN statement, and its CSV payload.
+
+    NULL is written as an unquoted \\N rather than CSV's default of an empty
+    field, so that empty strings load as empty strings. A text value of
+    exactly \\N is therefore loaded as NULL.
+
+    Integer columns which pandas promoted to float, to hold NaN, are written
+    as integers, since '1.0' is not accepted for an integer column.
+    """
+    preparer = dialect.identifier_preparer
+    columns = ', '.join(preparer.quote(c) for c in chunk.columns)
+    sql = f"COPY {preparer.format_table(table)} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+
+    promoted = {
+        name: 'Int64' for name, dtype in chunk.dtypes.items()
+        if isinstance(table.c[name].type, sa.Integer) and pd.api.types.is_float_dtype(dtype)
+    }
+
+    buffer = io.StringIO()
+    chunk.astype(promoted).to_csv(buffer, index=False, header=False, na_rep='\\N')
+    buffer.seek(0)
+    return sql, buffer
+
+
+def _insert_copy(conn, table: sa.Table, chunk: pd.DataFrame) -> None:
+    sql, buffer = _copy_statement(conn.dialect, table, chunk)
+    cursor = conn.connection.cursor()
+
+    try:
+        cursor.copy_expert(sql, buffer)
+    finally:
+        cursor.close()
+
+
+_INSERT_METHODS = {
+    'executemany': _insert_executemany,
+    'multirow': _insert_multirow,
+    'copy': _insert_copy,
+}
+
+
+def _default_insert_method(dialect) -> str:
+    """
+    Choose the fastest bulk path the dialect is known to support.
+    """
+    if dialect.name == 'postgresql' and dialect.driver == 'psycopg2':
+        return 'copy'
+    if dialect.name == 'sqlite':
+        return 'multirow'
+    return 'executemany'
+
+
+def bulk_insert(
+    table: sa.Table,
+    df: pd.DataFrame,
+    *,
+    bind: Union[sa.engine.Engine, sa.engine.Connection],
+    chunksize: int=10_000,
+    method: str=None
+) -> int:
+    """
+    Stream a DataFrame into an existing table, in bounded-memory chunks.
+
+    Only one chunk is ever converted to Python objects at a time. All chunks
+    are written within a single transaction.
+
+    Parameters
+    ----------
+    table : sqlalchemy.Table
+        table to insert into, column names must match the DataFrame's
+
+    df : pandas.DataFrame
+        data to insert
+
+    bind : sqlalchemy.engine.Engine or sqlalchemy.engine.Connection
+        where to send the data, a Connection's ongoing transaction is used
+
+    chunksize : int = [default: 10_000]
+        number of rows converted and sent per round trip
+
+    method : str = [default: None]
+        one of 'executemany', 'multirow' (multi-row VALUES), or 'copy'
+        (PostgreSQL COPY FROM STDIN, psycopg2 only), defaults to the fastest
+        method the dialect supports
+
+    Returns
+    -------
+    rows : int
+        number of rows inserted
+    """
+    if isinstance(bind, sa.engine.Connection):
+        ctx = contextlib.nullcontext(bind)
+    else:
+        ctx = bind.begin()
+
+    with ctx as conn:
+        try:
+            insert = _INSERT_METHODS[method or _default_insert_method(conn.dialect)]
+        except KeyError:
+            raise ValueError(f'unknown insert method: {method!r}') from None
+
+        for start in range(0, len(df), chunksize):
+            insert(conn, table, df.iloc[start:start + chunksize])
+
+    return len(df)
+
+
+def async_engine(url: str, *, pool_size: int=5, **kwargs):
+    """
+    Create an AsyncEngine with a bounded connection pool.
+
+    At most pool_size connections are ever open, callers beyond that wait
+    for one to be returned to the pool instead of opening more.
+
+    Usage
+    -----
+    engine = async_engine('sqlite+aiosqlite:///warehouse.db')
+    await df.sn.aload('TMP_data', bind=engine)
+
+    Parameters
+    ----------
+    url : str
+        database URL with an asyncio driver, eg. sqlite+aiosqlite:// or
+        postgresql+asyncpg://
+
+    pool_size : int = [default: 5]
+        most connections open at once
+
+    **kwargs
+        any other arguments to sqlalchemy.ext.asyncio.create_async_engine
+
+    Returns
+    -------
+    engine : sqlalchemy.ext.asyncio.AsyncEngine
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    return create_async_engine(url, pool_size=pool_size, max_overflow=0, **kwargs)
+
+
+def _prepare_executemany(dialect, table: sa.Table, chunk: pd.DataFrame) -> list:
+    return [(table.insert(), _records(chunk, list(chunk.columns)))]
+
+
+_PREPARE_METHODS = {
+    'executemany': _prepare_executemany,
+    'multirow': _multirow_statements,
+}
+
+
+async def abulk_insert(
+    table: sa.Table,
+    df: pd.DataFrame,
+    *,
+    bind,
+    chunksize: int=10_000,
+    method: str=None
+) -> int:
+    """
+    Stream a DataFrame into an existing table, without blocking the event loop.
+
+    The asynchronous counterpart to bulk_insert. Converting a chunk to Python
+    objects happens on a worker thread, while the previous chunk is in flight
+    to the database - so at most two chunks are ever converted at a time. All
+    chunks are written within a single transaction.
+
+    Parameters
+    ----------
+    table : sqlalchemy.Table
+        table to insert into, column names must match the DataFrame's
+
+    df : pandas.DataFrame
+        data to insert
+
+    bind : AsyncEngine or AsyncConnection
+        where to send the data, a Connection's ongoing transaction is used
+
+    chunksize : int = [default: 10_000]
+        number of rows converted and sent per round trip
+
+    method : str = [default: None]
+        one of 'executemany' or 'multirow' (multi-row VALUES), defaults to the
+        fastest method the dialect supports
+
+    Returns
+    -------
+    rows : int
+        number of rows inserted
+    """
+    from sqlalchemy.ext.asyncio import AsyncConnection
+    from .async_ import run_blocking
+
+    if isinstance(bind, AsyncConnection):
+        ctx = contextlib.nullcontext(bind)
+    else:
+        ctx = bind.begin()
+
+    async with ctx as conn:
+        dialect = conn.dialect
+
+        try:
+            prepare = _PREPARE_METHODS[method or _default_insert_method(dialect)]
+        except KeyError:
+            raise ValueError(f'unknown, or synchronous only, insert method: {method!r}') from None
+
+        starts = iter(range(0, len(df), chunksize))
+
+        def convert(start: int):
+            return asyncio.ensure_future(run_blocking(prepare, dialect, table, df.iloc[start:start + chunksize]))
+
+        start = next(starts, None)
+        pending = None if start is None else convert(start)
+
+        try:
+            while pending is not None:
+                statements = await pending
+                start = next(starts, None)
+                pending = None if start is None else convert(start)
+
+                for stmt, params in statements:
+                    if isinstance(stmt, str):
+                        await conn.exec_driver_sql(stmt, params)
+                    else:
+                        await conn.execute(stmt, params)
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    return len(df)
 
-    for name, __table__ in base_model.metadata.tables.items():
-        stmt = sa.schema.CreateTable(__table__).compile(dialect=engine.dialect)
-        log(stmt)
@@ -1,10 +1,18 @@
-from typing import Union, Callable
+from typing import Union, Callable, Iterable
+import concurrent.futures as cf
+import collections
+import threading
+import weakref
+import functools as ft
+import itertools
+import pickle
 import warnings
 import logging
-import gc
+import pathlib
+import time
+import os
 import io
 
-from pandas.api.extensions import register_dataframe_accessor
 from sqlalchemy.types import (
     BigInteger, Integer, Float, Text, Boolean,
     DateTime, Date, Time, TIMESTAMP
@@ -13,7 +21,12 @@ import sqlalchemy as sa
 import pandas as pd
 import numpy as np
 
-from .log import LazyStr
+from .database import bulk_insert, abulk_insert, SchemaCache
+from .io import save as save_arrow
+from .sketch import HyperLogLog, DuplicateDetector
+from . import dattim
+from .metrics import instrument
+from .log import CachedLazyStr, _levelno
 
 
 _logger = logging.getLogger('sn')
@@ -21,35 +34,137 @@ _logger.setLevel('DEBUG')
 _logger.addHandler(logging.NullHandler())
 
 
-def to_sqla(column: pd.Series) -> sa.Column:
+def _sample_positions(
+    n: int,
+    *,
+    head: int,
+    strata: int,
+    random_state: Union[int, np.random.Generator]=None
+) -> np.ndarray:
     """
-    Infer a pandas Series's sqlalchemy column type.
+    Choose row positions which represent the shape of a long column.
 
-    Further Reading:
-        1) see pandas.io.sql#L944 for dtype --> sql type conversion
+    The first `head` rows are always chosen, the rest of the column is divided
+    into `strata` equal-sized blocks and `head // strata` random positions are
+    drawn from each block. Sorted, unique positions are returned.
     """
-    # remove evidence of NULLs in column
-    # (enforcing NULL constraint should be the responsibility of SQLA)
-    column = column[column.notna()]
+    if n <= head * 2:
+        return np.arange(n)
+
+    rng = np.random.default_rng(random_state)
+    per_stratum = max(head // max(strata, 1), 1)
+    edges = np.linspace(head, n, num=strata + 1, dtype=np.int64)
+
+    picks = [np.arange(head)]
+
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        if hi > lo:
+            picks.append(rng.integers(lo, hi, size=min(per_stratum, hi - lo)))
+
+    return np.unique(np.concatenate(picks))
+
+
+def _is_all_midnight(values: np.ndarray) -> bool:
+    """
+    Determine if every non-null datetime64 value falls exactly on midnight.
+    """
+    unit, count = np.datetime_data(values.dtype)
+    per_day = np.timedelta64(1, 'D') // np.timedelta64(count, unit)
+    on_midnight = values.view('i8') % per_day == 0
+    return bool((on_midnight | np.isnat(values)).all())
+
+
+def _datetime_to_sqla(column: pd.Series, positions: np.ndarray=None) -> sa.types.TypeEngine:
+    """
+    Choose between DATE, DATETIME, and TIMESTAMP for a datetime64 column.
+
+    When `positions` is given, only those rows are checked first - a sample
+    which contains a time component settles the matter without a full scan.
+    """
+    if isinstance(column.dtype, pd.DatetimeTZDtype):
+        return TIMESTAMP(timezone=True)
+
+    values = column.to_numpy()
+
+    if positions is not None and not _is_all_midnight(values[positions]):
+        return DateTime
+
+    if _is_all_midnight(values):
+        return Date
+    return DateTime
+
+
+def _dtype_to_sqla(column: pd.Series) -> Union[sa.types.TypeEngine, None]:
+    """
+    Infer a sqlalchemy column type from the dtype alone, where possible.
+
+    Returns None when the dtype does not decide the type (eg, object columns)
+    and the values themselves must be inspected.
+    """
+    dtype = column.dtype
+    types = pd.api.types
+
+    if isinstance(dtype, pd.CategoricalDtype) or isinstance(dtype, pd.StringDtype):
+        return Text
+
+    if types.is_bool_dtype(dtype):
+        return Boolean
+
+    if str(getattr(dtype, 'pyarrow_dtype', '')).startswith('date'):
+        return Date
+
+    if types.is_timedelta64_dtype(dtype):
+        return BigInteger
 
+    if types.is_complex_dtype(dtype):
+        raise ValueError('complex dtypes not supported')
+
+    if types.is_integer_dtype(dtype):
+        # uint32 overflows a 4-byte signed INTEGER
+        if dtype.itemsize < 4 or (dtype.itemsize == 4 and dtype.kind == 'i'):
+            return Integer
+        return BigInteger
+
+    if types.is_float_dtype(dtype):
+        if dtype.itemsize <= 4:
+            return Float(precision=23)
+        return Float(precision=53)
+
+    return None
+
+
+# infer_dtype results which a sample cannot vouch for on behalf of the column
+_NON_TEXT_KINDS = frozenset([
+    'empty', 'datetime64', 'datetime', 'timedelta64', 'floating', 'integer',
+    'boolean', 'date', 'time', 'complex'
+])
+
+
+def _infer_kind(column: pd.Series) -> str:
+    """
+    Run pandas's value-based type inference, skipping NULLs.
+    """
     # skipna=True is default for .infer_dtype in pd 1.0.0
     with warnings.catch_warnings():
         warnings.filterwarnings('ignore', category=FutureWarning)
+        return pd.api.types.infer_dtype(column, skipna=True)
+
+
+def _to_sqla_full_scan(column: pd.Series) -> sa.types.TypeEngine:
+    """
+    Infer a pandas Series's sqlalchemy column type by inspecting every value.
+    """
+    # remove evidence of NULLs in column
+    # (enforcing NULL constraint should be the responsibility of SQLA)
+    column = column[column.notna()]
 
-        # infer type of column
-        col_type = pd._libs.lib.infer_dtype(column)
+    col_type = _infer_kind(column)
 
     if col_type in ['datetime64', 'datetime']:
-        try:
-            if column.dt.tz is not None:
-                return TIMESTAMP(timezone=True)
-        except AttributeError:
-            if column.tz is not None:
-                return TIMESTAMP(timezone=True)
-
-        if (column.dt.hour == 0).all():
-            return Date
-        return DateTime
+        if not pd.api.types.is_datetime64_any_dtype(column.dtype):
+            column = pd.to_datetime(column)
+
+        return _datetime_to_sqla(column)
 
     translation = {
         'timedelta64': BigInteger,
@@ -85,14 +200,155 @@ def to_sqla(column: pd.Series) -> sa.Column:
     return sa_type
 
 
-@register_dataframe_accessor('sn')
+def to_sqla(
+    column: pd.Series,
+    *,
+    sample: int=1000,
+    strata: int=10,
+    full_scan: bool=False,
+    random_state: Union[int, np.random.Generator]=None
+) -> sa.types.TypeEngine:
+    """
+    Infer a pandas Series's sqlalchemy column type.
+
+    Most dtypes (numeric, boolean, timedelta, categorical, string) decide the
+    sqlalchemy type on their own and no values are looked at. Datetimes only
+    need a vectorized check for a time component.
+
+    Object columns are sampled - the first `sample` rows plus a handful of
+    random rows from each of `strata` blocks of the remainder. If the sample
+    is text-like, the whole column must be text-like as well. Any other result
+    is ambiguous (a single string further down would make it TEXT), so the
+    column is escalated to a full scan.
+
+    Further Reading:
+        1) see pandas.io.sql#L944 for dtype --> sql type conversion
+
+    Parameters
+    ----------
+    column : pd.Series
+        data to infer the type of
+
+    sample : int = [default: 1000]
+        number of head rows to sample, also the approximate number of rows
+        drawn across the random strata
+
+    strata : int = [default: 10]
+        number of blocks the rest of the column is split into for sampling
+
+    full_scan : bool = [default: False]
+        skip all shortcuts and inspect every value
+
+    random_state : int or np.random.Generator = [default: None]
+        seed for the stratified sample
+
+    Returns
+    -------
+    sa_type : sqlalchemy.types.TypeEngine
+    """
+    if full_scan:
+        return _to_sqla_full_scan(column)
+
+    sa_type = _dtype_to_sqla(column)
+
+    if sa_type is not None:
+        return sa_type
+
+    positions = _sample_positions(len(column), head=sample, strata=strata, random_state=random_state)
+
+    if pd.api.types.is_datetime64_any_dtype(column.dtype):
+        return _datetime_to_sqla(column, positions)
+
+    if len(positions) == len(column):
+        return _to_sqla_full_scan(column)
+
+    if _infer_kind(column.iloc[positions]) in _NON_TEXT_KINDS:
+        return _to_sqla_full_scan(column)
+    return Text
+
+
+_SUMMARY_CACHE = collections.OrderedDict()
+_SUMMARY_CACHE_SIZE = 128
+_SUMMARY_LOCK = threading.Lock()
+
+
+def _render_summary(df: pd.DataFrame, info: Union[bool, str]) -> str:
+    """
+    Describe the structure of df.
+
+    'shallow' only inspects the frame's metadata. True and 'deep' defer to
+    df.info, the latter with deep introspection of object memory usage.
+    """
+    if info == 'shallow':
+        dtypes = collections.Counter(map(str, df.dtypes))
+        memory = df.index.memory_usage()
+
+        # numpy columns are sized by their dtype alone, without touching data
+        for (_, column), dtype in zip(df.items(), df.dtypes):
+            if isinstance(dtype, np.dtype):
+                memory += dtype.itemsize * len(df)
+            else:
+                memory += column.array.nbytes
+
+        memory /= 1024 ** 2
+
+        return '\n'.join([
+            f'{type(df).__name__}: {df.shape[0]:,} rows x {df.shape[1]:,} columns',
+            'dtypes: ' + ', '.join(f'{dtype}({n})' for dtype, n in sorted(dtypes.items())),
+            f'memory usage: {memory:.1f}+ MB (shallow)',
+        ])
+
+    buffer = io.StringIO()
+    df.info(buf=buffer, memory_usage='deep' if info == 'deep' else True)
+    return buffer.getvalue()
+
+
+def _structural_summary(df: pd.DataFrame, info: Union[bool, str]) -> str:
+    """
+    Describe the structure of df, cached per frame identity.
+
+    A cached summary is reused while the frame is alive and its shape, labels,
+    and dtypes are unchanged. Values mutated in place are not detected, so the
+    non-null counts of info=True may be stale for a frame edited in place.
+    """
+    key = (id(df), info)
+    structure = (df.shape, tuple(df.columns), tuple(df.dtypes))
+
+    with _SUMMARY_LOCK:
+        entry = _SUMMARY_CACHE.get(key)
+
+        if entry is not None and entry[0]() is df and entry[1] == structure:
+            _SUMMARY_CACHE.move_to_end(key)
+            return entry[2]
+
+    text = _render_summary(df, info)
+
+    with _SUMMARY_LOCK:
+        _SUMMARY_CACHE[key] = (weakref.ref(df), structure, text)
+
+        while len(_SUMMARY_CACHE) > _SUMMARY_CACHE_SIZE:
+            _SUMMARY_CACHE.popitem(last=False)
+
+    return text
+
+
+def _format_comment(msg: str, df: pd.DataFrame, info: Union[bool, str]) -> str:
+    text = msg.format(df=df, BRANCH='├─', CONT='│ ', FINAL='└─')
+
+    if info:
+        text += '\n\n' + _structural_summary(df, info)
+
+    return text
+
+
 class SNDF:
     """
     An extension to the pandas DataFrame.
 
     All methods may be accessed via the attribute "sn". Simply all that is
-    necessary to enable this functionality, is to import SNDF into your runtime
-    environment.
+    necessary to enable this functionality, is to import sn into your runtime
+    environment - the accessor is registered once pandas is imported, and this
+    module loaded on its first use.
 
     All of these dataframe methods exist to make common operations that this
     developer has found, easier, simpler, or more informative.
@@ -121,10 +377,122 @@ class SNDF:
         """
         pass
 
-    def is_valid_pk(self, column_name: str) -> pd.DataFrame:
+    @instrument
+    def is_valid_pk(self, column_name: Union[str, list]) -> bool:
+        """
+        Determine whether a column, or columns, uniquely identify every row.
+
+        A primary key may not contain NULLs. Uniqueness is tested on 64-bit
+        row fingerprints rather than the values themselves.
+
+        Parameters
+        ----------
+        column_name : str or list
+            name of the key column, or columns of a composite key
+
+        Returns
+        -------
+        is_valid : bool
+        """
+        names = [column_name] if isinstance(column_name, str) else list(column_name)
+        keys = self._df[names]
+
+        if keys.isna().to_numpy().any():
+            return False
+
+        fingerprints = [_fingerprint(keys.iloc[:, i]) for i in range(len(names))]
+        return _distinct(_combine_fingerprints(fingerprints)) == len(keys)
+
+    @instrument
+    def discover_keys(
+        self,
+        max_width: int=3,
+        *,
+        parallel: str='thread',
+        workers: int=None
+    ) -> list:
+        """
+        Find the minimal candidate keys of the DataFrame, up to max_width columns.
+
+        Every column is hashed once, which also gives its exact cardinality.
+        Columns with NULLs are never part of a key. A combination of columns is
+        only tested when..
+
+            - it does not contain a smaller key (keys are minimal)
+            - the product of its columns' cardinalities reaches the row count
+            - it does not contain a functional dependency A -> B, found while
+              testing pairs (a key with both A and B is a key without B)
+
+        and is tested by combining its columns' hashes into row fingerprints.
+        Candidates of the same width are tested in parallel.
+
+        Usage
+        -----
+        keys = df.sn.discover_keys(max_width=2)
+        model = df.sn.reflect('TMP_data', bind=engine, pk=keys[0])
+
+        Parameters
+        ----------
+        max_width : int = [default: 3]
+            most columns in a composite key
+
+        parallel : str = [default: 'thread']
+            one of 'serial', 'thread', or 'process'
+
+        workers : int = [default: None]
+            size of the worker pool, defaults to the number of CPUs
+
+        Returns
+        -------
+        keys : list of tuple
+            candidate keys, narrowest first, then from lowest to highest
+            total cardinality
+        """
+        keys, _ = _discover_keys(self._df, max_width=max_width, parallel=parallel, workers=workers)
+        return keys
+
+    @instrument
+    def discover_dependencies(self, *, parallel: str='thread', workers: int=None) -> pd.DataFrame:
         """
+        Find the single-column functional dependencies A -> B of the DataFrame.
+
+        A determines B when every value of A always appears with the same value
+        of B. Columns which are keys on their own, determining everything, are
+        left out.
+
+        Parameters
+        ----------
+        parallel : str = [default: 'thread']
+            one of 'serial', 'thread', or 'process'
+
+        workers : int = [default: None]
+            size of the worker pool, defaults to the number of CPUs
+
+        Returns
+        -------
+        dependencies : pd.DataFrame
+            determinant and dependent column names
         """
-        return self._df.shape[0] == len(self._df[column_name].unique())
+        df = self._df
+        fingerprints = {name: _fingerprint(df.iloc[:, i]) for i, name in enumerate(df.columns)}
+        cardinality = {name: _distinct(h) for name, h in fingerprints.items()}
+        names = [name for name in df.columns if cardinality[name] < len(df)]
+        pairs = list(itertools.combinations(names, 2))
+
+        distinct = _map_columns(
+            _combined_distinct, [[fingerprints[name] for name in pair] for pair in pairs],
+            parallel=parallel, workers=workers
+        )
+
+        dependencies = []
+
+        for (a, b), n in zip(pairs, distinct):
+            if n == cardinality[a]:
+                dependencies.append((a, b))
+            if n == cardinality[b]:
+                dependencies.append((b, a))
+
+        return pd.DataFrame(dependencies, columns=['determinant', 'dependent'])
 
     def comment(
         self,
@@ -132,7 +500,7 @@ class SNDF:
         *,
         log: Callable=_logger,
         level: str='info',
-        info: bool=False
+        info: Union[bool, str]=False
     ) -> pd.DataFrame:
         """
         Insert a comment - no transformation happens to df.
@@ -145,6 +513,9 @@ class SNDF:
             CONT   = '│ '
             FINAL  = '└─'
 
+        When log is a Logger, nothing at all is done unless it is enabled for
+        level, and the message is only formatted if a handler emits it.
+
         Usage
         -----
         df.rename(columns={'Test FN': 'test_fn'})\
@@ -152,31 +523,44 @@ class SNDF:
           .sn.comment('beginning of ETL:')\
           .sn.comment('{FINAL} adding new column: x')
           .assign(x=lambda df: df.index ** 2)
+
+        Parameters
+        ----------
+        msg : str
+            message, formatted with the variables above
+
+        log : Logger or callable = [default: logging.getLogger('sn')]
+            where to send the message
+
+        level : str = [default: 'info']
+            log level name, when log is a Logger
+
+        info : bool or str = [default: False]
+            append a summary of the frame's structure, one of..
+
+                True      = df.info()
+                'deep'    = df.info(memory_usage='deep')
+                'shallow' = shape, dtype counts, and shallow memory usage
+
+            summaries are cached per frame, while its structure is unchanged
         """
-        BRANCH = '├─'
-        CONT   = '│ '
-        FINAL  = '└─'
+        if info not in (False, True, 'deep', 'shallow'):
+            raise ValueError(f"info must be one of True, False, 'deep', or 'shallow', got {info!r}")
 
-        try:
-            log = getattr(log, level)
-        except AttributeError:
-            pass
-
-        if info:
-            def _pipeline():
-                """
-                Writes df.info to a string-like.
-                """
-                buffer = io.StringIO()
-                self._df.info(buf=buffer)
-                return buffer.getvalue()
-
-            lazy = LazyStr(_pipeline)
-            msg += '\n\n{lazy}'
-
-        log(msg.format(**locals()))
+        if isinstance(log, (logging.Logger, logging.LoggerAdapter)):
+            levelno = _levelno(level)
+
+            if not log.isEnabledFor(levelno):
+                return self._df
+
+            log.log(levelno, '%s', CachedLazyStr(_format_comment, msg, self._df, info))
+            return self._df
+
+        log = getattr(log, level, log)
+        log(_format_comment(msg, self._df, info))
         return self._df
 
+    @instrument
     def reflect(
         self,
         table_name: str='TMP_dataframe',
@@ -184,19 +568,27 @@ class SNDF:
         bind: sa.engine.Engine,
         pk: Union[str, list]=None,
         dtypes: dict=None,
-        as_sql_stmt: bool=False
+        as_sql_stmt: bool=False,
+        cache: SchemaCache=None,
+        sample_rows: int=0,
+        parallel: str='serial',
+        workers: int=None
     ) -> sa.Table:
         """
         Generate a SQLAlchemy Model based on pandas dtypes.
 
+        With a SchemaCache, a frame whose column names, dtypes, and arguments
+        have been seen before gets its model (or DDL) back without inferring
+        anything. Compare the model to the live table with
+        sn.database.schema_diff.
+
         Usage
         -----
         engine = sqlalchemy.create_engine('sqlite://')
-        df = df.copy()
         model = df.sn.reflect('TMP_data', bind=engine)
 
-        stmt = model.insert().values(df.to_dict(orient='records'))
-        engine.execute(stmt)
+        # to create the table and stream the data into it, see SNDF.load
+        model.create(engine)
 
         Arguments
         ---------
@@ -215,6 +607,18 @@ class SNDF:
         as_sql_stmt : bool = [default: False]
             TODO
 
+        cache : SchemaCache = [default: None]
+            where to look up, and store, the reflected model
+
+        sample_rows : int = [default: 0]
+            also key the cache on the values of this many leading rows
+
+        parallel : str = [default: 'serial']
+            infer column types with one of 'serial', 'thread', or 'process'
+
+        workers : int = [default: None]
+            size of the worker pool, defaults to the number of CPUs
+
         Returns
         -------
         model : sqlalchemy.Table
@@ -226,10 +630,30 @@ class SNDF:
         if isinstance(pk, str):
             pk = [pk]
 
+        if cache is not None:
+            key = cache.key(self._df, table_name, pk=pk, dtypes=dtypes, sample_rows=sample_rows)
+            tbl = cache.get(key)
+
+            if tbl is None:
+                # undecorated, so one call is recorded once by instrument
+                tbl = cache.put(key, SNDF.reflect.__wrapped__(
+                    self, table_name, bind=bind, pk=pk, dtypes=dtypes, parallel=parallel, workers=workers
+                ))
+
+            return cache.ddl(tbl, bind.dialect) if as_sql_stmt else tbl
+
         c_name_and_types = []
+        inferred = [i for i, name in enumerate(self._df.columns) if name not in dtypes]
+        inferred = dict(zip(inferred, _map_columns(
+            to_sqla, [self._df.iloc[:, i] for i in inferred], parallel=parallel, workers=workers
+        )))
 
         for i, name in enumerate(self._df.columns):
-            type = dtypes.get(name, to_sqla(self._df.iloc[:, i]))
+            try:
+                type = dtypes[name]
+            except KeyError:
+                type = inferred[i]
+
             is_pk = name.lower() in map(lambda s: s.lower(), pk)
             c_name_and_types.append((name, type, is_pk))
 
@@ -247,7 +671,205 @@ class SNDF:
             return str(stmt)
         return tbl
 
-    def index_statistics(self) -> pd.DataFrame:
+    @instrument
+    def load(
+        self,
+        table: Union[str, sa.Table],
+        *,
+        bind: sa.engine.Engine,
+        chunksize: int=10_000,
+        method: str=None,
+        pk: Union[str, list]=None,
+        dtypes: dict=None
+    ) -> sa.Table:
+        """
+        Stream the DataFrame into a database table, creating it if missing.
+
+        The table's definition is reflected from the database if it exists,
+        otherwise it is generated via SNDF.reflect and created. Rows are sent in
+        bounded-memory chunks, see sn.database.bulk_insert for the available
+        methods.
+
+        Usage
+        -----
+        engine = sqlalchemy.create_engine('sqlite:///data.db')
+        model = df.sn.load('TMP_data', bind=engine, chunksize=50_000)
+
+        Arguments
+        ---------
+        table : str or sqlalchemy.Table
+            name of the table, or the table itself
+
+        bind : sqlalchemy.engine.Engine
+            database to load into
+
+        chunksize : int = [default: 10_000]
+            number of rows converted and sent per round trip
+
+        method : str = [default: None]
+            one of 'executemany', 'multirow', or 'copy'
+
+        pk : list = [default: []]
+            primary key columns, should the table need to be created
+
+        dtypes : dict = [default: {}]
+            column types, should the table need to be created
+
+        Returns
+        -------
+        model : sqlalchemy.Table
+        """
+        if not isinstance(table, sa.Table):
+            if sa.inspect(bind).has_table(table):
+                table = sa.Table(table, sa.MetaData(), autoload_with=bind)
+            else:
+                table = self.reflect(table, bind=bind, pk=pk, dtypes=dtypes)
+
+        table.create(bind, checkfirst=True)
+
+        start = time.perf_counter()
+        rows = bulk_insert(table, self._df, bind=bind, chunksize=chunksize, method=method)
+        elapsed = time.perf_counter() - start
+
+        _logger.info(
+            'loaded {:,} rows into {} in {:.2f}s ({:,.0f} rows/s)'
+            .format(rows, table.name, elapsed, rows / elapsed if elapsed else float('inf'))
+        )
+        return table
+
+    @instrument
+    async def aload(
+        self,
+        table: Union[str, sa.Table],
+        *,
+        bind,
+        chunksize: int=10_000,
+        method: str=None,
+        pk: Union[str, list]=None,
+        dtypes: dict=None
+    ) -> sa.Table:
+        """
+        Stream the DataFrame into a database table, without blocking the event loop.
+
+        The asynchronous counterpart to SNDF.load, built on SQLAlchemy's
+        AsyncEngine. Type inference and converting chunks happen on a worker
+        thread, see sn.database.abulk_insert. Create the engine with
+        sn.database.async_engine for a bounded connection pool.
+
+        Usage
+        -----
+        engine = sn.database.async_engine('sqlite+aiosqlite:///data.db')
+        model = await df.sn.aload('TMP_data', bind=engine, chunksize=50_000)
+
+        Arguments
+        ---------
+        table : str or sqlalchemy.Table
+            name of the table, or the table itself
+
+        bind : sqlalchemy.ext.asyncio.AsyncEngine
+            database to load into
+
+        chunksize : int = [default: 10_000]
+            number of rows converted and sent per round trip
+
+        method : str = [default: None]
+            one of 'executemany' or 'multirow'
+
+        pk : list = [default: []]
+            primary key columns, should the table need to be created
+
+        dtypes : dict = [default: {}]
+            column types, should the table need to be created
+
+        Returns
+        -------
+        model : sqlalchemy.Table
+        """
+        from .async_ import run_blocking
+
+        if not isinstance(table, sa.Table):
+            async with bind.connect() as conn:
+                exists = await conn.run_sync(lambda c: sa.inspect(c).has_table(table))
+
+                if exists:
+                    table = await conn.run_sync(lambda c: sa.Table(table, sa.MetaData(), autoload_with=c))
+
+            if not exists:
+                table = await run_blocking(self.reflect, table, bind=bind, pk=pk, dtypes=dtypes)
+
+        start = time.perf_counter()
+
+        async with bind.begin() as conn:
+            await conn.run_sync(table.create, checkfirst=True)
+            rows = await abulk_insert(table, self._df, bind=conn, chunksize=chunksize, method=method)
+
+        elapsed = time.perf_counter() - start
+
+        _logger.info(
+            'loaded {:,} rows into {} in {:.2f}s ({:,.0f} rows/s)'
+            .format(rows, table.name, elapsed, rows / elapsed if elapsed else float('inf'))
+        )
+        return table
+
+    @instrument
+    def save(
+        self,
+        path: pathlib.Path,
+        *,
+        compression: str=None,
+        chunksize: int=1_000_000
+    ) -> pathlib.Path:
+        """
+        Stage the DataFrame on disk as an Arrow IPC (Feather v2) file.
+
+        Read it back with sn.io.load, memory-mapped. See sn.io.save for
+        details.
+
+        Usage
+        -----
+        df.sn.reduce_mem_usage().sn.save('stage_1.arrow')
+        df = sn.io.load('stage_1.arrow', columns=['id', 'amount'])
+
+        Returns
+        -------
+        path : pathlib.Path
+        """
+        return save_arrow(self._df, path, compression=compression, chunksize=chunksize)
+
+    @instrument
+    def reduce_mem_usage(
+        self,
+        *,
+        categorical_threshold: float=0.5,
+        min_float: str='float32',
+        parallel: str='serial',
+        workers: int=None
+    ) -> pd.DataFrame:
+        """
+        Downcast columns to their smallest representation.
+
+        See sn.dataframe.reduce_mem_usage for details.
+
+        Returns
+        -------
+        df : pd.DataFrame
+        """
+        return reduce_mem_usage(
+            self._df,
+            categorical_threshold=categorical_threshold,
+            min_float=min_float,
+            parallel=parallel,
+            workers=workers
+        )
+
+    @instrument
+    def index_statistics(
+        self,
+        *,
+        approximate: bool=False,
+        parallel: str='thread',
+        workers: int=None
+    ) -> pd.DataFrame:
         """
         Generate statistics to determine index candidacy.
 
@@ -257,65 +879,1812 @@ class SNDF:
             - High selectivity / Low cardinality
             - Not a high percentage of NULL values
 
+        Each column is hashed exactly once, and columns are spread across a
+        pool of workers.
+
+        Parameters
+        ----------
+        approximate : bool = [default: False]
+            estimate cardinality with a HyperLogLog sketch instead of an exact
+            hash table, fully_unique remains exact - columns estimated to be
+            unique are confirmed by a second, exact, pass
+
+        parallel : str = [default: 'thread']
+            one of 'serial', 'thread', or 'process'
+
+        workers : int = [default: None]
+            size of the worker pool, defaults to the number of CPUs
+
         Returns
         -------
-        sel : pd.Series
+        sel : pd.DataFrame
         """
-        data = []
+        columns = [self._df.iloc[:, i] for i in range(self._df.shape[1])]
+        compute = ft.partial(_column_statistics, approximate=approximate)
+        counts = _map_columns(compute, columns, parallel=parallel, workers=workers)
 
-        for column_name in self._df.columns:
-            s = self._df[column_name]
-            data.append({
-                'null_pct': (1 - sum(s.notna()) / len(s)) * 100,
-                'cardinality': len(s.unique()),
-                'selectivity': len(s.unique()) / len(s) * 100,
-                'fully_unique': len(s.unique()) == len(s)
-            })
+        n = len(self._df)
+        counts = pd.DataFrame(counts, columns=['nulls', 'cardinality', 'unique'], index=self._df.columns)
 
-        return pd.DataFrame(data, index=self._df.columns)
+        return pd.DataFrame({
+            'null_pct': counts.nulls / n * 100,
+            'cardinality': counts.cardinality,
+            'selectivity': counts.cardinality / n * 100,
+            'fully_unique': counts.unique.astype(bool)
+        })
 
+    @instrument
+    def profile(
+        self,
+        *,
+        keys: list=None,
+        max_exact: int=100_000,
+        precision: int=14,
+        parallel: str='thread',
+        workers: int=None
+    ) -> 'Profile':
+        """
+        Profile the DataFrame, for statistics which can be kept up to date.
 
-def reduce_mem_usage(df):
-    """
-    Perform a series of operations to reduce memory usage.
+        The profile answers index_statistics, is_valid_pk and reflect, and may
+        be saved to disk and updated with new rows later - so that a refresh
+        costs time proportional to the new rows, not to the whole dataset.
+        See Profile for the parameters.
 
-    Downscale Numerics
-    Categorize Strings
+        Returns
+        -------
+        profile : Profile
+        """
+        profile = Profile(keys=keys, max_exact=max_exact, precision=precision, parallel=parallel, workers=workers)
+        return profile.update(self._df)
+
+    @instrument
+    def enrich_calendar(
+        self,
+        date_col: str,
+        *,
+        columns: list=None,
+        calendar_name: str='USBusinessHolidayCalendar',
+        prefix: str=''
+    ) -> pd.DataFrame:
+        """
+        Add attributes of the BusinessCalendar for the dates of a column.
+
+        Equivalent to a left merge against BusinessCalendar.populate's frame
+        on calendar_date, without hashing or copying the DataFrame. The
+        calendar is a dense range of dates, so each date is turned into an
+        offset in days from its start, and every attribute is gathered by
+        indexing directly into the calendar's arrays. Calendars are generated
+        over whole decades covering the dates, and cached.
+
+        Times of day are ignored, and timezone-aware dates are taken at their
+        local wall time. Where the date is missing, so are its attributes -
+        integer and boolean attributes then have nullable dtypes.
+
+        Usage
+        -----
+        sales = sales.sn.enrich_calendar('sold_at', columns=['is_business_day', 'week_begin'])
+
+        Parameters
+        ----------
+        date_col : str
+            name of the column of dates, or datetimes
+
+        columns : list = [default: every column of BusinessCalendar]
+            attributes to add, eg. 'is_business_day', 'quarter_of_year'
+
+        calendar_name : str = [default: 'USBusinessHolidayCalendar']
+            name of the holiday calendar which decides is_us_holiday
 
-    TODO convert DateTime to Date if all 0:00 time
-    TODO attach to SNDF
+        prefix : str = [default: '']
+            prepended to the name of every attribute added
+
+        Returns
+        -------
+        df : pd.DataFrame
+        """
+        from .models import BusinessCalendar, _dimension
+
+        available = [c.name for c in BusinessCalendar.__table__.columns if c.name != 'calendar_date']
+        columns = available if columns is None else list(columns)
+        unknown = set(columns).difference(available)
+
+        if unknown:
+            raise ValueError(f'{sorted(unknown)} are not columns of BusinessCalendar, choose from {available}')
+
+        days = SNSeries(self._df[date_col])._naive().astype('datetime64[D]')
+        missing = np.isnat(days)
+        known = days if not missing.any() else days[~missing]
+
+        if known.size:
+            years = np.array([known.min(), known.max()]).astype('datetime64[Y]').astype(np.int64) + 1970
+            first, last = int(years[0]), int(years[1])
+        else:
+            first = last = pd.Timestamp.today().year
+
+        # whole decades, so that similar requests share a calendar in the cache
+        first, last = first // 10 * 10, last // 10 * 10 + 9
+        dimension = _dimension(calendar_name, first, last, nullable=bool(missing.any()))
+
+        offsets = (days - np.datetime64(f'{first}-01-01', 'D')).astype(np.int64)
+        offsets[missing] = -1
+
+        enriched = {
+            f'{prefix}{name}': pd.Series(
+                dimension[name].array.take(offsets, allow_fill=bool(missing.any())),
+                index=self._df.index,
+                copy=False
+            )
+            for name in columns
+        }
+
+        return self._df.assign(**enriched)
+
+
+class SNSeries:
     """
-    start_mem = df.memory_usage().sum() / 1024**2
-    _logger.info('Memory usage of dataframe is {:.2f} MB'.format(start_mem))
+    An extension to the pandas Series.
+
+    All methods may be accessed via the attribute "sn". Similar to SNDF,
+    importing sn is all that is necessary to enable it.
+
+    Business day arithmetic is vectorized over the whole Series, backed by
+    numpy's np.busday_* functions and the cached holiday calendars in
+    sn.dattim. Calendars may be given by their registered name, or as any
+    pandas AbstractHolidayCalendar. Timezone-aware Series are handled in their
+    local wall time.
+
+    Usage
+    -----
+    tickets.opened_at.sn.add_business_days(3)
+    tickets.opened_at.sn.business_hours_until(tickets.closed_at)
+    """
+    def __init__(self, s):
+        self._s = s
+
+    def _naive(self) -> np.ndarray:
+        s = self._s
+
+        if isinstance(s.dtype, pd.DatetimeTZDtype):
+            s = s.dt.tz_localize(None)
+
+        return dattim._as_datetimes(s.to_numpy())
+
+    def _naive_other(self, other) -> np.ndarray:
+        # .array, so a Series is taken by position rather than aligned on its index
+        return SNSeries(pd.Series(getattr(other, 'array', other), index=self._s.index))._naive()
+
+    def _wrap(self, values: np.ndarray) -> pd.Series:
+        s = pd.Series(values, index=self._s.index, name=self._s.name)
+
+        if isinstance(self._s.dtype, pd.DatetimeTZDtype):
+            s = s.dt.tz_localize(self._s.dt.tz, ambiguous='NaT', nonexistent='shift_forward')
+
+        return s
+
+    def is_business_day(self, *, calendar: dattim.Calendar='USBusinessHolidayCalendar') -> pd.Series:
+        """
+        Flag dates which are neither weekends nor holidays.
+        """
+        days = self._naive().astype('datetime64[D]')
+        flags = dattim._covering_index(calendar, days).is_business_day(days)
+        return pd.Series(flags, index=self._s.index, name=self._s.name)
+
+    def add_business_days(self, n: Union[int, Iterable[int]], *, calendar: dattim.Calendar='USBusinessHolidayCalendar') -> pd.Series:
+        """
+        Shift dates by n business days, keeping their time of day.
+
+        A date which is not a business day is first rolled in the direction of
+        travel, in the same manner as pandas's CustomBusinessDay.
+        """
+        return self._wrap(dattim.add_business_days(self._naive(), np.asarray(n), calendar=calendar))
+
+    def sub_business_days(self, n: Union[int, Iterable[int]], *, calendar: dattim.Calendar='USBusinessHolidayCalendar') -> pd.Series:
+        """
+        Shift dates back by n business days, keeping their time of day.
+        """
+        return self.add_business_days(-np.asarray(n), calendar=calendar)
+
+    def roll_forward(self, *, calendar: dattim.Calendar='USBusinessHolidayCalendar') -> pd.Series:
+        """
+        Move dates which are not business days to the next business day.
+        """
+        return self._wrap(dattim.roll_business_day(self._naive(), 'forward', calendar=calendar))
+
+    def roll_backward(self, *, calendar: dattim.Calendar='USBusinessHolidayCalendar') -> pd.Series:
+        """
+        Move dates which are not business days to the previous business day.
+        """
+        return self._wrap(dattim.roll_business_day(self._naive(), 'backward', calendar=calendar))
+
+    def business_days_until(self, other, *, calendar: dattim.Calendar='USBusinessHolidayCalendar') -> pd.Series:
+        """
+        Count the business days in [self, other), element-wise by position.
+
+        Returns
+        -------
+        counts : pd.Series
+            nullable Int64, NA where either date is missing
+        """
+        other = self._naive_other(other) if np.ndim(other) else other
+        counts = dattim.business_days_between(self._naive(), other, calendar=calendar)
+        return pd.Series(counts, index=self._s.index, name=self._s.name).astype('Int64')
+
+    def business_hours_until(
+        self,
+        other,
+        *,
+        opens: str='09:00',
+        closes: str='17:00',
+        calendar: dattim.Calendar='USBusinessHolidayCalendar'
+    ) -> pd.Series:
+        """
+        Measure time elapsed until other, only counting business hours.
+
+        Parameters
+        ----------
+        other : pd.Series, array-like, or scalar
+            end datetimes, element-wise by position
+
+        opens, closes : str = [default: '09:00', '17:00']
+            the window of business hours on each business day
+
+        calendar : str, AbstractHolidayCalendar = [default: 'USBusinessHolidayCalendar']
+            name of a registered pandas holiday calendar, or the calendar itself
+
+        Returns
+        -------
+        elapsed : pd.Series
+            timedelta64[ns], NaT where either datetime is missing
+        """
+        other = self._naive_other(other) if np.ndim(other) else other
+        elapsed = dattim.business_time_between(self._naive(), other, opens=opens, closes=closes, calendar=calendar)
+        return pd.Series(elapsed, index=self._s.index, name=self._s.name)
+
+
+def _fingerprint(column: pd.Series) -> np.ndarray:
+    """
+    Hash every value of a column to a uint64.
+    """
+    return pd.util.hash_pandas_object(column, index=False).to_numpy()
+
+
+def _combine_fingerprints(fingerprints: list) -> np.ndarray:
+    """
+    Combine per-column hashes into one fingerprint per row, order-sensitive.
+    """
+    combined = fingerprints[0].copy()
+
+    for other in fingerprints[1:]:
+        combined *= np.uint64(0x100000001B3)
+        combined ^= other
+
+    return combined
+
+
+def _distinct(fingerprints: np.ndarray) -> int:
+    """
+    Count the distinct fingerprints.
+    """
+    if not len(fingerprints):
+        return 0
+
+    ordered = np.sort(fingerprints)
+    return 1 + int(np.count_nonzero(ordered[1:] != ordered[:-1]))
+
+
+# numpy kinds of fixed width: bool, (unsigned) integer, float, complex, timedelta, datetime
+_SHAREABLE_KINDS = 'biufcmM'
+_MASKED_ARRAYS = (pd.arrays.IntegerArray, pd.arrays.FloatingArray, pd.arrays.BooleanArray)
+
+
+class _SharedColumn:
+    """
+    A column, or array, copied into shared memory for a worker process.
 
-    for col in df.columns:
-        col_type = df[col].dtype
-        gc.collect()
-        if col_type != object:
-            c_min = df[col].min()
-            c_max = df[col].max()
-            if str(col_type)[:3] == 'int':
-                if c_min > np.iinfo(np.int8).min and c_max < np.iinfo(np.int8).max:
-                    df[col] = df[col].astype(np.int8)
-                elif c_min > np.iinfo(np.int16).min and c_max < np.iinfo(np.int16).max:
-                    df[col] = df[col].astype(np.int16)
-                elif c_min > np.iinfo(np.int32).min and c_max < np.iinfo(np.int32).max:
-                    df[col] = df[col].astype(np.int32)
-                elif c_min > np.iinfo(np.int64).min and c_max < np.iinfo(np.int64).max:
-                    df[col] = df[col].astype(np.int64)
+    The worker rebuilds it as a view on the shared block, so the data is
+    copied once, instead of being pickled, sent through a pipe, and
+    unpickled again.
+
+    Attributes
+    ----------
+    shm_name : str
+        name of the multiprocessing.shared_memory block
+
+    layout : list
+        (dtype, shape, offset) of each array in the block - the values, and
+        the mask of a nullable column
+
+    name : hashable
+        name of the Series, None for a bare np.ndarray
+
+    dtype : dtype
+        dtype of the Series, None for a bare np.ndarray
+    """
+    __slots__ = ('shm_name', 'layout', 'name', 'dtype')
+
+    def __init__(self, shm_name: str, layout: list, name, dtype):
+        self.shm_name = shm_name
+        self.layout = layout
+        self.name = name
+        self.dtype = dtype
+
+    @classmethod
+    def share(cls, item) -> Union[tuple, None]:
+        """
+        Copy a Series or np.ndarray into a new shared memory block.
+
+        Returns
+        -------
+        (shm, shared) : (SharedMemory, _SharedColumn) or None
+            None when the item is not of a fixed-width dtype, it is to be
+            pickled instead
+        """
+        from multiprocessing import shared_memory
+
+        if isinstance(item, np.ndarray):
+            name, dtype = None, None
+            arrays = [item] if item.dtype.kind in _SHAREABLE_KINDS else None
+        elif isinstance(item, pd.Series):
+            name, dtype = item.name, item.dtype
+
+            if isinstance(dtype, np.dtype) and dtype.kind in _SHAREABLE_KINDS:
+                arrays = [item.to_numpy()]
+            elif isinstance(item.array, _MASKED_ARRAYS):
+                mask = item.isna().to_numpy()
+                arrays = [item.to_numpy(dtype=dtype.numpy_dtype, na_value=0), mask]
             else:
-                if c_min > np.finfo(np.float16).min and c_max < np.finfo(np.float16).max:
-                    df[col] = df[col].astype(np.float16)
-                elif c_min > np.finfo(np.float32).min and c_max < np.finfo(np.float32).max:
-                    df[col] = df[col].astype(np.float32)
+                arrays = None
+        else:
+            arrays = None
+
+        if arrays is None:
+            return None
+
+        layout, offset = [], 0
+
+        for array in arrays:
+            layout.append((array.dtype, array.shape, offset))
+            # keep every array aligned to 8 bytes
+            offset += -(-array.nbytes // 8) * 8
+
+        shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+
+        for array, (dtype_, shape, start) in zip(arrays, layout):
+            np.ndarray(shape, dtype_, buffer=shm.buf, offset=start)[...] = array
+
+        return shm, cls(shm.name, layout, name, dtype)
+
+    def rebuild(self, buffer) -> Union[pd.Series, np.ndarray]:
+        """
+        View the shared block as the original Series, or np.ndarray.
+        """
+        arrays = [np.ndarray(shape, dtype, buffer=buffer, offset=offset) for dtype, shape, offset in self.layout]
+
+        if self.dtype is None:
+            return arrays[0]
+
+        if len(arrays) == 2:
+            values = self.dtype.construct_array_type()(*arrays, copy=False)
+            return pd.Series(values, name=self.name, copy=False)
+
+        return pd.Series(arrays[0], name=self.name, copy=False)
+
+
+def _apply_shared(fn: Callable, item):
+    """
+    Call fn on an item in a worker process, attaching it if it was shared.
+
+    The result of a shared item is returned pickled, since it may be a view
+    on the shared block - eg. a no-op .astype - which must be serialized
+    before the block is unmapped.
+    """
+    if not isinstance(item, _SharedColumn):
+        return fn(item)
+
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(name=item.shm_name)
+
+    try:
+        return pickle.dumps(fn(item.rebuild(shm.buf)), protocol=pickle.HIGHEST_PROTOCOL)
+    finally:
+        shm.close()
+
+
+def _combined_distinct(fingerprints: list) -> int:
+    """
+    Count the distinct rows of a combination of columns, from their hashes.
+    """
+    return _distinct(_combine_fingerprints(fingerprints))
+
+
+def _map_columns(fn: Callable, items: list, *, parallel: str='thread', workers: int=None) -> list:
+    """
+    Apply fn to every item, serially or across a pool of threads or processes.
+
+    This is the column executor shared by SNDF's column-wise methods. Pools
+    are kept alive between calls, see sn.async_.get_executor.
+
+    Process pools need fn to be picklable. Columns (pd.Series) and arrays
+    of fixed-width dtypes, nullable or not, are sent through shared memory,
+    anything else is pickled. At most two items per worker are in flight,
+    which bounds the extra memory used.
+    """
+    # pools are cached by size, so the pool is fetched at the size asked for
+    # and only the number of items in flight depends on the items
+    in_flight = min(workers or os.cpu_count() or 1, len(items))
+
+    if parallel == 'serial' or in_flight <= 1:
+        return list(map(fn, items))
+
+    if parallel not in ('thread', 'process'):
+        raise ValueError(f'unknown parallel backend: {parallel!r}')
+
+    from .async_ import get_executor
+
+    pool = get_executor(parallel, workers=workers)
+
+    if parallel == 'thread':
+        return list(pool.map(fn, items))
+
+    results = [None] * len(items)
+    pending = {}
+    queued = iter(enumerate(items))
+
+    def submit() -> bool:
+        try:
+            i, item = next(queued)
+        except StopIteration:
+            return False
+
+        shared = _SharedColumn.share(item)
+
+        if shared is None:
+            pending[pool.submit(_apply_shared, fn, item)] = (i, None)
+        else:
+            shm, item = shared
+            pending[pool.submit(_apply_shared, fn, item)] = (i, shm)
+
+        return True
+
+    try:
+        for _ in range(2 * in_flight):
+            if not submit():
+                break
+
+        while pending:
+            done, _ = cf.wait(pending, return_when=cf.FIRST_COMPLETED)
+
+            for future in done:
+                i, shm = pending.pop(future)
+
+                if shm is None:
+                    results[i] = future.result()
                 else:
-                    df[col] = df[col].astype(np.float64)
+                    shm.close()
+                    shm.unlink()
+                    results[i] = pickle.loads(future.result())
+
+                submit()
+    finally:
+        for future, (_, shm) in pending.items():
+            future.cancel()
+
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+
+    return results
+
+
+def _discover_keys(df: pd.DataFrame, *, max_width: int, parallel: str, workers: int) -> tuple:
+    """
+    Search for minimal candidate keys, width by width.
+
+    Returns
+    -------
+    (keys, dependencies) : (list of tuple, set of tuple)
+    """
+    n = len(df)
+    has_nulls = df.isna().any()
+    names = [name for name in df.columns if not has_nulls[name]]
+
+    fingerprints = dict(zip(names, _map_columns(_fingerprint, [df[name] for name in names], parallel=parallel, workers=workers)))
+    cardinality = {name: _distinct(h) for name, h in fingerprints.items()}
+
+    keys = [(name,) for name in names if cardinality[name] == n]
+    names = [name for name in names if cardinality[name] < n]
+    dependencies = set()
+
+    for width in range(2, max_width + 1):
+        candidates = [
+            combo for combo in itertools.combinations(names, width)
+            if np.prod([cardinality[name] for name in combo], dtype=np.float64) >= n
+            and not any(set(key) <= set(combo) for key in keys)
+            and not any(a in combo and b in combo for a, b in dependencies)
+        ]
+
+        distinct = _map_columns(
+            _combined_distinct, [[fingerprints[name] for name in combo] for combo in candidates],
+            parallel=parallel, workers=workers
+        )
+
+        for combo, count in zip(candidates, distinct):
+            if count == n:
+                keys.append(combo)
+            elif width == 2:
+                a, b = combo
+                if count == cardinality[a]:
+                    dependencies.add((a, b))
+                if count == cardinality[b]:
+                    dependencies.add((b, a))
+
+    keys.sort(key=lambda key: (len(key), sum(cardinality[name] for name in key)))
+    return keys, dependencies
+
+
+def _maybe_unique(cardinality, rows: int, error):
+    """
+    Whether an estimated cardinality is within three standard errors of rows.
+
+    Only a candidate for uniqueness, an estimate never proves it.
+    """
+    return cardinality >= rows * (1 - 3 * error)
+
+
+def _column_statistics(column: pd.Series, *, approximate: bool=False) -> tuple:
+    """
+    Count NULLs and distinct values of a column in a single hashing pass.
+
+    NULL counts as a distinct value, as it does in pd.Series.unique(). When
+    approximate, columns whose estimate is close enough to be unique are
+    confirmed exactly, with a DuplicateDetector.
+
+    Returns
+    -------
+    (nulls, cardinality, unique) : (int, int, bool)
+    """
+    is_null = column.isna().to_numpy()
+    nulls = int(is_null.sum())
+
+    if approximate:
+        sketch = HyperLogLog().update(column[~is_null])
+        cardinality = min(int(round(sketch.estimate())), len(column) - nulls) + bool(nulls)
+        unique = nulls <= 1 and _maybe_unique(cardinality, len(column), sketch.error)
+        return nulls, cardinality, unique and not DuplicateDetector().update(column)
+
+    cardinality = len(pd.unique(column))
+    return nulls, cardinality, cardinality == len(column)
+
+
+# most distinct values of a string column tracked across pieces, before it is left uncategorized
+_MAX_DISTINCT = 100_000
+
+
+class _ColumnSummary:
+    """
+    Mergeable statistics about a column, used to plan a downcast.
+
+    Attributes
+    ----------
+    dtype : np.dtype or ExtensionDtype
+        the dtype common to every piece of the column observed
+
+    rows : int
+        number of rows observed
+
+    min, max : scalar
+        range of a numeric column, otherwise None
+
+    distinct : pd.Index
+        unique non-null values of a string column, or None once there are
+        more than _MAX_DISTINCT of them
+
+    all_midnight : bool
+        whether every value of a datetime column falls on midnight
+    """
+    __slots__ = ('dtype', 'rows', 'min', 'max', 'distinct', 'all_midnight')
+
+    def __init__(self, dtype, rows, *, min=None, max=None, distinct=None, all_midnight=None):
+        self.dtype = dtype
+        self.rows = rows
+        self.min = min
+        self.max = max
+        self.distinct = distinct
+        self.all_midnight = all_midnight
+
+    def merge(self, other: '_ColumnSummary', *, max_distinct: int=None) -> '_ColumnSummary':
+        """
+        Combine the statistics of two pieces of the same column.
+
+        Distinct values are kept up to an absolute limit rather than a ratio
+        of the rows so far, as later pieces may repeat them enough to make
+        the column categorical after all.
+        """
+        dtype = _common_dtype(self.dtype, other.dtype)
+        rows = self.rows + other.rows
+
+        if not _is_numeric_dtype(dtype):
+            mins = maxs = []
         else:
-            # TODO take into account cardinality.
-            df[col] = df[col].astype('category')
+            mins = [v for v in (self.min, other.min) if v is not None and not pd.isna(v)]
+            maxs = [v for v in (self.max, other.max) if v is not None and not pd.isna(v)]
 
-    end_mem = df.memory_usage().sum() / 1024**2
-    _logger.info('Memory usage after optimization is: {:.2f} MB'.format(end_mem))
-    _logger.info('Decreased by {:.1f}%'.format(100 * (start_mem - end_mem) / start_mem))
+        if self.distinct is None or other.distinct is None:
+            distinct = None
+        else:
+            distinct = self.distinct.append(other.distinct).unique()
 
-    return df
+            if len(distinct) > (_MAX_DISTINCT if max_distinct is None else max_distinct):
+                distinct = None
+
+        if self.all_midnight is None or other.all_midnight is None:
+            all_midnight = None
+        else:
+            all_midnight = self.all_midnight and other.all_midnight
+
+        return _ColumnSummary(
+            dtype, rows,
+            min=min(mins) if mins else None,
+            max=max(maxs) if maxs else None,
+            distinct=distinct,
+            all_midnight=all_midnight
+        )
+
+
+def _is_numeric_dtype(dtype) -> bool:
+    types = pd.api.types
+    return types.is_numeric_dtype(dtype) and not types.is_bool_dtype(dtype)
+
+
+def _is_string_dtype(dtype) -> bool:
+    return dtype == object or isinstance(dtype, pd.StringDtype)
+
+
+def _common_dtype(a, b):
+    """
+    Find a dtype which is able to hold the values of both a and b.
+    """
+    if a == b:
+        return a
+
+    if _is_numeric_dtype(a) and _is_numeric_dtype(b):
+        common = np.result_type(getattr(a, 'numpy_dtype', a), getattr(b, 'numpy_dtype', b))
+
+        # keep NULL-ability of nullable extension dtypes
+        if isinstance(a, pd.api.extensions.ExtensionDtype) or isinstance(b, pd.api.extensions.ExtensionDtype):
+            return pd.api.types.pandas_dtype(_nullable_name(common))
+        return common
+
+    return np.dtype(object)
+
+
+def _nullable_name(dtype: np.dtype) -> str:
+    """
+    Name of the nullable extension dtype equivalent to a numpy dtype.
+    """
+    return dtype.name.replace('uint', 'UInt').replace('int', 'Int').replace('float', 'Float')
+
+
+def _summarize_column(column: pd.Series) -> tuple:
+    """
+    The distinct values of a string column, or whether a datetime column is
+    all midnights.
+
+    Returns
+    -------
+    (distinct, all_midnight) : (pd.Index, bool)
+        either may be None, when it does not apply to the column
+    """
+    if _is_string_dtype(column.dtype):
+        return pd.Index(pd.unique(column.dropna())), None
+
+    return None, _is_all_midnight(column.to_numpy())
+
+
+def _summarize(df: pd.DataFrame, *, parallel: str='serial', workers: int=None) -> list:
+    """
+    Gather the statistics needed to plan a downcast, one pass per column.
+
+    Numeric ranges are computed for all numeric columns at once, so that
+    reductions happen block-wise rather than column by column. The remaining
+    columns are summarized by the column executor. Summaries are by column
+    position, as labels may repeat.
+    """
+    rows = len(df)
+    dtypes = list(df.dtypes)
+    numeric = [i for i, dtype in enumerate(dtypes) if _is_numeric_dtype(dtype)]
+    others = [
+        i for i, dtype in enumerate(dtypes)
+        if _is_string_dtype(dtype) or pd.api.types.is_datetime64_dtype(dtype)
+    ]
+    summaries = [_ColumnSummary(dtype, rows) for dtype in dtypes]
+
+    if numeric:
+        mins, maxs = df.iloc[:, numeric].min(), df.iloc[:, numeric].max()
+
+        for i, low, high in zip(numeric, mins.to_numpy(), maxs.to_numpy()):
+            summaries[i].min, summaries[i].max = low, high
+
+    columns = _map_columns(_summarize_column, [df.iloc[:, i] for i in others], parallel=parallel, workers=workers)
+
+    for i, (distinct, all_midnight) in zip(others, columns):
+        summaries[i].distinct = distinct
+        summaries[i].all_midnight = all_midnight
+
+    return summaries
+
+
+def _merge_summaries(summaries: list, other: list, *, max_distinct: int=None) -> list:
+    """
+    Combine the summaries of two pieces of the same columns, by position.
+    """
+    if summaries is None:
+        return other
+
+    if len(summaries) != len(other):
+        raise ValueError(f'pieces have {len(summaries)} and {len(other)} columns, they must match')
+
+    return [a.merge(b, max_distinct=max_distinct) for a, b in zip(summaries, other)]
+
+
+def _cast_column(column: pd.Series, *, plan: list) -> pd.Series:
+    # the column is named by its position, see _apply_plan
+    return column.astype(plan[column.name])
+
+
+def _apply_plan(df: pd.DataFrame, plan: list, *, parallel: str='serial', workers: int=None) -> pd.DataFrame:
+    """
+    Cast every column to the dtype planned for its position.
+    """
+    if parallel == 'serial' and df.columns.is_unique:
+        return df.astype(dict(zip(df.columns, plan)))
+
+    columns = [df.iloc[:, i].rename(i) for i in range(df.shape[1])]
+    casts = _map_columns(ft.partial(_cast_column, plan=plan), columns, parallel=parallel, workers=workers)
+
+    if not casts:
+        return df.copy()
+
+    return pd.concat([column.set_axis(df.index) for column in casts], axis=1).set_axis(df.columns, axis=1)
+
+
+def _downcast_plan(
+    summaries: list,
+    *,
+    categorical_threshold: float,
+    min_float: str
+) -> list:
+    """
+    Choose the smallest dtype able to represent each summarized column.
+
+    Returns
+    -------
+    plan : list
+        target dtype of every column, by position
+    """
+    try:
+        import pyarrow
+    except ImportError:
+        date_dtype = None
+    else:
+        date_dtype = pd.ArrowDtype(pyarrow.date32())
+
+    floats = ['float16', 'float32', 'float64']
+    floats = floats[floats.index(np.dtype(min_float).name):]
+    plan = [summary.dtype for summary in summaries]
+
+    for i, summary in enumerate(summaries):
+        dtype = summary.dtype
+
+        # an entirely NULL column has no range, it keeps its dtype
+        if _is_numeric_dtype(dtype) and not _is_missing(summary.min) and not _is_missing(summary.max):
+            kind = getattr(dtype, 'numpy_dtype', dtype).kind
+            nullable = isinstance(dtype, pd.api.extensions.ExtensionDtype)
+
+            if kind in 'iu':
+                info = np.iinfo
+                candidates = [f'{"u" if kind == "u" else ""}int{bits}' for bits in (8, 16, 32, 64)]
+            elif kind == 'f':
+                info = np.finfo
+                candidates = floats
+            else:
+                continue
+
+            for candidate in candidates:
+                limits = info(candidate)
+
+                if limits.min <= summary.min and summary.max <= limits.max:
+                    plan[i] = pd.api.types.pandas_dtype(
+                        _nullable_name(np.dtype(candidate)) if nullable else candidate
+                    )
+                    break
+
+        elif summary.distinct is not None and summary.rows:
+            if len(summary.distinct) / summary.rows < categorical_threshold:
+                plan[i] = pd.CategoricalDtype(summary.distinct)
+
+        elif summary.all_midnight and date_dtype is not None:
+            plan[i] = date_dtype
+
+    return plan
+
+
+def _is_missing(value) -> bool:
+    return value is None or bool(pd.isna(value))
+
+
+def _mem_usage_mb(df: pd.DataFrame) -> float:
+    return df.memory_usage().sum() / 1024**2
+
+
+def reduce_mem_usage(
+    df: pd.DataFrame,
+    *,
+    categorical_threshold: float=0.5,
+    min_float: str='float32',
+    parallel: str='serial',
+    workers: int=None
+) -> pd.DataFrame:
+    """
+    Perform a series of operations to reduce memory usage.
+
+    Downscale Numerics
+        (unsigned) integers, floats, and their nullable extension dtypes are
+        cast to the smallest dtype of the same kind which holds their range
+
+    Categorize Strings
+        string columns with few distinct values relative to their length
+
+    Datetimes to Dates
+        datetime columns with no time component become date32, if pyarrow is
+        available
+
+    Statistics for every column are gathered first, and the resulting plan is
+    applied in a single .astype, so no intermediate copies of the frame are
+    created column by column. With a parallel backend, both the statistics
+    and the casts are spread across the column executor instead.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        data to shrink
+
+    categorical_threshold : float = [default: 0.5]
+        string columns are only categorized when the ratio of distinct values
+        to rows is below this threshold
+
+    min_float : str = [default: 'float32']
+        the smallest float dtype to consider, float16 is supported but loses
+        precision quickly
+
+    parallel : str = [default: 'serial']
+        one of 'serial', 'thread', or 'process'
+
+    workers : int = [default: None]
+        size of the worker pool, defaults to the number of CPUs
+
+    Returns
+    -------
+    df : pd.DataFrame
+        a new, downcast, DataFrame
+    """
+    start_mem = _mem_usage_mb(df)
+    _logger.info('Memory usage of dataframe is {:.2f} MB'.format(start_mem))
+
+    summaries = _summarize(df, parallel=parallel, workers=workers)
+    plan = _downcast_plan(summaries, categorical_threshold=categorical_threshold, min_float=min_float)
+    df = _apply_plan(df, plan, parallel=parallel if df.shape[1] > 1 else 'serial', workers=workers)
+
+    end_mem = _mem_usage_mb(df)
+    _logger.info('Memory usage after optimization is: {:.2f} MB'.format(end_mem))
+    _logger.info('Decreased by {:.1f}%'.format(100 * (start_mem - end_mem) / (start_mem or 1)))
+
+    return df
+
+
+def _interim_plan(plan: list, dtypes: pd.Series) -> list:
+    """
+    Keep the source dtype of a chunk's columns where the plan may yet widen lossily.
+
+    Integers, categories and dates widen back without loss once a later chunk
+    needs it, but a float cast down to float32 has lost its precision for
+    good. Floats are left as they are until the plan is final.
+    """
+    return [
+        source if _is_numeric_dtype(dtype) and getattr(dtype, 'numpy_dtype', dtype).kind == 'f' else dtype
+        for dtype, source in zip(plan, dtypes)
+    ]
+
+
+def reduce_mem_usage_chunked(
+    chunks: Iterable[pd.DataFrame],
+    *,
+    categorical_threshold: float=0.5,
+    min_float: str='float32'
+) -> pd.DataFrame:
+    """
+    Load an iterator of DataFrames, compacting each one as it arrives.
+
+    Each chunk is downcast according to the statistics of every chunk seen so
+    far, save for floats, which a later chunk could widen again only after
+    their precision was lost. Once the iterator is exhausted, the plan is final
+    and every compacted chunk is cast to it - so the result has one consistent
+    set of dtypes, and matches reduce_mem_usage of the concatenated chunks.
+
+    The one exception is a string column with more than 100,000 distinct
+    values, whose values are no longer tracked: it is never categorized, even
+    where the concatenated chunks would be.
+
+    Usage
+    -----
+    chunks = pd.read_csv('big.csv', chunksize=1_000_000)
+    df = reduce_mem_usage_chunked(chunks)
+
+    chunks = pd.read_sql('SELECT * FROM big', engine, chunksize=1_000_000)
+    df = reduce_mem_usage_chunked(chunks)
+
+    Parameters
+    ----------
+    chunks : iterable of pd.DataFrame
+        pieces of the same dataset, eg. from pd.read_csv(chunksize=...)
+
+    categorical_threshold : float = [default: 0.5]
+        see reduce_mem_usage
+
+    min_float : str = [default: 'float32']
+        see reduce_mem_usage
+
+    Returns
+    -------
+    df : pd.DataFrame
+    """
+    options = {'categorical_threshold': categorical_threshold, 'min_float': min_float}
+    summaries = None
+    parts = []
+    start_mem = 0
+
+    for chunk in chunks:
+        start_mem += _mem_usage_mb(chunk)
+        summaries = _merge_summaries(summaries, _summarize(chunk))
+        parts.append(_apply_plan(chunk, _interim_plan(_downcast_plan(summaries, **options), chunk.dtypes)))
+        del chunk
+
+    if summaries is None:
+        return pd.DataFrame()
+
+    plan = _downcast_plan(summaries, **options)
+    df = pd.concat([_apply_plan(part, plan) for part in parts])
+
+    end_mem = _mem_usage_mb(df)
+    _logger.info('Memory usage of {} chunks was {:.2f} MB'.format(len(parts), start_mem))
+    _logger.info('Memory usage after optimization is: {:.2f} MB'.format(end_mem))
+
+    return df
+
+
+# widening order of the sqlalchemy types to_sqla may infer, within a family
+_SQLA_WIDENING = [
+    [(Integer, None), (BigInteger, None)],
+    [(Float, 23), (Float, 53)],
+    [(Date, None), (DateTime, None), (TIMESTAMP, None)],
+]
+
+
+def _sqla_key(sa_type: sa.types.TypeEngine) -> tuple:
+    """
+    Identify a type, or type class, by (class, float precision).
+    """
+    cls = sa_type if isinstance(sa_type, type) else type(sa_type)
+    return cls, getattr(sa_type, 'precision', None) if cls is Float else None
+
+
+def _merge_sqla_types(a: sa.types.TypeEngine, b: sa.types.TypeEngine) -> sa.types.TypeEngine:
+    """
+    Choose a type able to hold the values two pieces of a column were inferred as.
+
+    None stands for a piece with no evidence at all (eg, every value NULL).
+    """
+    if a is None or b is None:
+        return b if a is None else a
+
+    key_a, key_b = _sqla_key(a), _sqla_key(b)
+
+    if key_a == key_b:
+        return a
+
+    for family in _SQLA_WIDENING:
+        if key_a in family and key_b in family:
+            return a if family.index(key_a) > family.index(key_b) else b
+
+    integers, floats = _SQLA_WIDENING[:2]
+
+    if (key_a in integers and key_b in floats) or (key_a in floats and key_b in integers):
+        return Float(precision=53)
+
+    return Text
+
+
+def _reflect_types(
+    types: dict,
+    table_name: str,
+    *,
+    bind: sa.engine.Engine,
+    pk: Union[str, list]=None,
+    as_sql_stmt: bool=False
+) -> sa.Table:
+    """
+    Generate a SQLAlchemy Model from known column types, see SNDF.reflect.
+    """
+    # the columns' types are all known, so reflect an empty frame of them
+    empty = pd.DataFrame(columns=list(types))
+    return empty.sn.reflect(table_name, bind=bind, pk=pk, dtypes=types, as_sql_stmt=as_sql_stmt)
+
+
+class ChunkedFrame:
+    """
+    Operate on a dataset too large for memory, one DataFrame at a time.
+
+    Operations stream over the chunks, holding only the current chunk and a
+    small, mergeable summary of those seen so far - most in a single pass.
+    A ChunkedFrame built from an iterator can only be passed over once. Build
+    it from a callable, which returns a fresh iterator, or with from_csv and
+    from_sql, to run several operations over the same source.
+
+    Usage
+    -----
+    chunks = ChunkedFrame.from_csv('extract.csv', chunksize=1_000_000)
+    chunks.index_statistics()
+    chunks.is_valid_pk(['store_id', 'sold_at'])
+    model = chunks.reflect('extract', bind=engine, pk=['store_id', 'sold_at'])
+
+    Attributes
+    ----------
+    chunks : iterable or callable
+        pieces of the same dataset, or a callable which returns them
+    """
+    def __init__(self, chunks: Union[Iterable[pd.DataFrame], Callable[[], Iterable[pd.DataFrame]]]):
+        self._factory = chunks if callable(chunks) else None
+        self._chunks = None if callable(chunks) else iter(chunks)
+        self._consumed = False
+
+    @classmethod
+    def from_csv(cls, path: pathlib.Path, *, chunksize: int=1_000_000, **kwargs) -> 'ChunkedFrame':
+        """
+        Stream a CSV file, via pd.read_csv.
+
+        Any keyword arguments are passed along to pd.read_csv.
+        """
+        def chunks():
+            with pd.read_csv(path, chunksize=chunksize, **kwargs) as reader:
+                yield from reader
+
+        return cls(chunks)
+
+    @classmethod
+    def from_sql(cls, sql: str, bind: sa.engine.Engine, *, chunksize: int=1_000_000, **kwargs) -> 'ChunkedFrame':
+        """
+        Stream the results of a query, via pd.read_sql.
+
+        Results are fetched with a server-side cursor where the driver has one,
+        rather than buffered on the client. Any keyword arguments are passed
+        along to pd.read_sql.
+        """
+        def chunks():
+            with bind.connect().execution_options(stream_results=True) as connection:
+                yield from pd.read_sql(sql, connection, chunksize=chunksize, **kwargs)
+
+        return cls(chunks)
+
+    def __iter__(self):
+        if self._factory is not None:
+            yield from self._factory()
+            return
+
+        if self._consumed:
+            raise RuntimeError(
+                'chunks have already been consumed, build ChunkedFrame from a callable '
+                'which returns a fresh iterator to pass over them again'
+            )
+
+        self._consumed = True
+        yield from self._chunks
+
+    def index_statistics(self, *, precision: int=14) -> pd.DataFrame:
+        """
+        Generate statistics to determine index candidacy.
+
+        Cardinality is estimated by a HyperLogLog sketch per column, merged
+        across chunks. See SNDF.index_statistics for the meaning of each
+        statistic.
+
+        An estimate never proves a column unique. Columns estimated to be
+        unique are confirmed by a second pass with a DuplicateDetector each,
+        which ends as soon as every one of them has a duplicate. A ChunkedFrame
+        built from an iterator cannot be passed over twice, so fully_unique is
+        NA for those columns instead.
+
+        Parameters
+        ----------
+        precision : int = [default: 14]
+            HyperLogLog precision, see sn.sketch.HyperLogLog
+
+        Returns
+        -------
+        sel : pd.DataFrame
+        """
+        rows, nulls, sketches = 0, None, None
+
+        for chunk in self:
+            if sketches is None:
+                nulls = pd.Series(0, index=chunk.columns)
+                sketches = {name: HyperLogLog(precision) for name in chunk.columns}
+
+            rows += len(chunk)
+            nulls += chunk.isna().sum()
+
+            for i, sketch in enumerate(sketches.values()):
+                column = chunk.iloc[:, i]
+                sketch.update_hashes(_value_fingerprint(column[column.notna()]))
+
+        if sketches is None:
+            return pd.DataFrame(columns=['null_pct', 'cardinality', 'selectivity', 'fully_unique'])
+
+        error = next(iter(sketches.values())).error
+        distinct = pd.Series([round(s.estimate()) for s in sketches.values()], index=nulls.index)
+        cardinality = distinct.clip(upper=rows - nulls) + (nulls > 0)
+        candidates = list(np.flatnonzero((nulls <= 1) & _maybe_unique(cardinality, rows, error)))
+
+        return pd.DataFrame({
+            'null_pct': nulls / rows * 100,
+            'cardinality': cardinality,
+            'selectivity': cardinality / rows * 100,
+            'fully_unique': self._confirm_unique(candidates, columns=len(nulls))
+        })
+
+    def _confirm_unique(self, candidates: list, *, columns: int) -> Union[np.ndarray, pd.arrays.BooleanArray]:
+        """
+        Check exactly whether the columns at each candidate position are unique.
+
+        Returns a nullable boolean array, NA where the chunks may not be passed
+        over again, if any candidate is left unconfirmed.
+        """
+        unique = np.zeros(columns, dtype=bool)
+
+        if not candidates:
+            return unique
+
+        if self._factory is None:
+            unknown = pd.array(unique, dtype='boolean')
+            unknown[candidates] = pd.NA
+            return unknown
+
+        detectors = {i: DuplicateDetector() for i in candidates}
+
+        for chunk in self:
+            for i, detector in list(detectors.items()):
+                # a candidate holds at most one NULL, which cannot repeat
+                column = chunk.iloc[:, i]
+
+                if detector.update_hashes(_value_fingerprint(column[column.notna()])):
+                    del detectors[i]
+
+            if not detectors:
+                break
+
+        unique[list(detectors)] = True
+        return unique
+
+    def is_valid_pk(self, column_name: Union[str, list]) -> bool:
+        """
+        Determine whether a column, or columns, uniquely identify every row.
+
+        Rows are fed to a streaming duplicate detector, and the pass stops as
+        soon as a NULL or a repeated key is found.
+
+        Parameters
+        ----------
+        column_name : str or list
+            name of the key column, or columns of a composite key
+
+        Returns
+        -------
+        is_valid : bool
+        """
+        detector = DuplicateDetector()
+        names = [column_name] if isinstance(column_name, str) else list(column_name)
+
+        for chunk in self:
+            keys = chunk[names]
+
+            if keys.isna().to_numpy().any():
+                return False
+
+            fingerprints = [_value_fingerprint(keys.iloc[:, i]) for i in range(len(names))]
+
+            if detector.update_hashes(_combine_fingerprints(fingerprints)):
+                return False
+
+        return True
+
+    def reflect(
+        self,
+        table_name: str='TMP_dataframe',
+        *,
+        bind: sa.engine.Engine,
+        pk: Union[str, list]=None,
+        dtypes: dict=None,
+        as_sql_stmt: bool=False
+    ) -> sa.Table:
+        """
+        Generate a SQLAlchemy Model from the types inferred for every chunk.
+
+        Each chunk's columns are typed by to_sqla, and the types are widened
+        as chunks disagree: INTEGER to BIGINT, either to FLOAT, DATE to
+        DATETIME, and anything irreconcilable to TEXT. Chunks in which a
+        column is entirely NULL carry no evidence.
+
+        See SNDF.reflect for the parameters.
+
+        Returns
+        -------
+        model : sqlalchemy.Table
+        """
+        dtypes = dtypes or {}
+        evidence = None
+
+        for chunk in self:
+            if evidence is None:
+                evidence = dict.fromkeys(chunk.columns)
+
+            for i, name in enumerate(chunk.columns):
+                column = chunk.iloc[:, i]
+
+                if name in dtypes or not column.notna().any():
+                    continue
+
+                evidence[name] = _merge_sqla_types(evidence[name], to_sqla(column))
+
+        types = {name: Text if sa_type is None else sa_type for name, sa_type in (evidence or {}).items()}
+        types.update(dtypes)
+        return _reflect_types(types, table_name, bind=bind, pk=pk, as_sql_stmt=as_sql_stmt)
+
+    def downcast_plan(self, *, categorical_threshold: float=0.5, min_float: str='float32') -> list:
+        """
+        Choose the smallest dtype for every column, from every chunk.
+
+        See reduce_mem_usage for the parameters.
+
+        Returns
+        -------
+        plan : list
+            target dtype of every column, by position
+        """
+        summaries = None
+
+        for chunk in self:
+            summaries = _merge_summaries(summaries, _summarize(chunk))
+
+        if summaries is None:
+            return []
+
+        return _downcast_plan(summaries, categorical_threshold=categorical_threshold, min_float=min_float)
+
+    def reduce_mem_usage(
+        self,
+        *,
+        categorical_threshold: float=0.5,
+        min_float: str='float32'
+    ) -> 'ChunkedFrame':
+        """
+        Downcast every chunk to one plan, chosen from all of them.
+
+        The plan is settled in a first pass, and applied lazily as the
+        returned ChunkedFrame is iterated - so the source must be re-iterable.
+        To compact a one-shot iterator into a single DataFrame instead, see
+        reduce_mem_usage_chunked.
+
+        Returns
+        -------
+        chunks : ChunkedFrame
+        """
+        if self._factory is None:
+            raise RuntimeError('reduce_mem_usage passes over the chunks twice, build ChunkedFrame from a callable')
+
+        plan = self.downcast_plan(categorical_threshold=categorical_threshold, min_float=min_float)
+        return ChunkedFrame(lambda: (_apply_plan(chunk, plan) for chunk in self))
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Concatenate every chunk into one DataFrame.
+        """
+        return pd.concat(list(self))
+
+
+def _value_fingerprint(values: pd.Series) -> np.ndarray:
+    """
+    Hash every non-null value of a column, alike whatever its numeric dtype.
+
+    Hashes depend on the dtype as well as the value, yet the same column may
+    arrive as int32 in one batch and as float64, promoted to hold NaN, in the
+    next. Integers, and floats holding an integer, are hashed as int64 -
+    other floats as float64.
+    """
+    dtype = values.dtype
+
+    if not _is_numeric_dtype(dtype):
+        return _fingerprint(values)
+
+    array = values.to_numpy(dtype=getattr(dtype, 'numpy_dtype', dtype))
+    kind = array.dtype.kind
+
+    if kind == 'i':
+        return pd.util.hash_array(array.astype(np.int64, copy=False))
+
+    if kind == 'u':
+        integral = array <= np.iinfo(np.int64).max
+    elif kind == 'f':
+        array = array.astype(np.float64, copy=False)
+        # 2 ** 63 is exact as a float, and the first value past int64
+        integral = (np.floor(array) == array) & (array >= -2.0 ** 63) & (array < 2.0 ** 63)
+    else:
+        return _fingerprint(values)
+
+    hashes = pd.util.hash_array(array)
+
+    if integral.any():
+        hashes[integral] = pd.util.hash_array(array[integral].astype(np.int64))
+
+    return hashes
+
+
+class _ColumnProfile:
+    """
+    Mergeable statistics about a column, kept across updates of a Profile.
+
+    Attributes
+    ----------
+    dtype : np.dtype or ExtensionDtype
+        the dtype common to every batch of the column observed
+
+    rows, nulls : int
+        number of rows, and NULLs, observed
+
+    hashes : np.ndarray
+        sorted, unique, uint64 hashes of the non-null values, or None once
+        there are more than the exact budget allows
+
+    sketch : HyperLogLog
+        estimate of the distinct non-null values, once hashes is None
+
+    min, max : scalar
+        range of a numeric or datetime column, otherwise None
+
+    sqla_type : sqlalchemy.types.TypeEngine
+        type inferred by to_sqla, widened across batches, None until a
+        non-null value is observed
+    """
+    __slots__ = ('dtype', 'rows', 'nulls', 'hashes', 'sketch', 'min', 'max', 'sqla_type')
+
+    def __init__(self, dtype, rows=0, nulls=0, *, hashes=None, sketch=None, min=None, max=None, sqla_type=None):
+        self.dtype = dtype
+        self.rows = rows
+        self.nulls = nulls
+        self.hashes = np.array([], dtype=np.uint64) if hashes is None and sketch is None else hashes
+        self.sketch = sketch
+        self.min = min
+        self.max = max
+        self.sqla_type = sqla_type
+
+    @classmethod
+    def of(cls, column: pd.Series, *, max_exact: int, precision: int) -> '_ColumnProfile':
+        """
+        Profile one batch of a column.
+        """
+        is_null = column.isna().to_numpy()
+        values = column[~is_null]
+        profile = cls(column.dtype, len(column), int(is_null.sum()))
+
+        if len(values):
+            hashes = np.unique(_value_fingerprint(values))
+            profile._add_hashes(hashes, max_exact=max_exact, precision=precision)
+            profile.sqla_type = to_sqla(column)
+
+            if _is_numeric_dtype(column.dtype) or pd.api.types.is_datetime64_any_dtype(column.dtype):
+                profile.min, profile.max = values.min(), values.max()
+
+        return profile
+
+    @property
+    def distinct(self) -> int:
+        """
+        Number of distinct non-null values, exact while within budget.
+        """
+        if self.hashes is not None:
+            return len(self.hashes)
+        return min(int(round(self.sketch.estimate())), self.rows - self.nulls)
+
+    @property
+    def error(self) -> float:
+        return 0.0 if self.hashes is not None else self.sketch.error
+
+    def _add_hashes(self, hashes: np.ndarray, *, max_exact: int, precision: int) -> None:
+        """
+        Add sorted, unique, hashes - switching to a sketch past the budget.
+        """
+        if self.hashes is not None:
+            new = np.setdiff1d(hashes, self.hashes, assume_unique=True)
+
+            if len(self.hashes) + len(new) <= max_exact:
+                # a stable sort of two sorted runs is a linear merge
+                self.hashes = np.sort(np.concatenate([self.hashes, new]), kind='stable')
+                return
+
+            self.sketch = HyperLogLog(precision).update_hashes(self.hashes)
+            self.hashes = None
+
+        self.sketch.update_hashes(hashes)
+
+    def merge(self, other: '_ColumnProfile', *, max_exact: int, precision: int) -> '_ColumnProfile':
+        """
+        Combine the statistics of another batch of the same column, in place.
+        """
+        self.dtype = _common_dtype(self.dtype, other.dtype)
+        self.rows += other.rows
+        self.nulls += other.nulls
+        self.sqla_type = _merge_sqla_types(self.sqla_type, other.sqla_type)
+
+        if other.hashes is not None:
+            self._add_hashes(other.hashes, max_exact=max_exact, precision=precision)
+        else:
+            if self.hashes is not None:
+                self.sketch = HyperLogLog(precision).update_hashes(self.hashes)
+                self.hashes = None
+            self.sketch.merge(other.sketch)
+
+        mins = [v for v in (self.min, other.min) if v is not None and not pd.isna(v)]
+        maxs = [v for v in (self.max, other.max) if v is not None and not pd.isna(v)]
+
+        try:
+            self.min, self.max = (min(mins), max(maxs)) if mins else (None, None)
+        except TypeError:
+            # the column changed kind between batches, eg numbers to dates
+            self.min = self.max = None
+
+        return self
+
+
+class Profile:
+    """
+    Statistics of a growing dataset, updated in time proportional to the growth.
+
+    Every column keeps its row and NULL counts, its distinct values - exactly
+    as a set of 64-bit hashes while there are at most max_exact of them, and
+    as a HyperLogLog sketch past that - its min and max, and the SQL type
+    to_sqla infers for it. Keys named up front are tracked exactly, by a
+    DuplicateDetector each. All of it is mergeable, so profiling new rows
+    and merging them in gives the same answers as profiling everything again.
+
+    Columns which appear in a later batch are counted as NULL in the rows
+    seen before them, and missing columns as NULL in the rows they miss.
+
+    Usage
+    -----
+    profile = df.sn.profile(keys=['order_id', ['store_id', 'sold_at']])
+    profile.save('orders.profile')
+
+    # an hour later
+    profile = Profile.load('orders.profile').update(new_rows)
+    profile.index_statistics()
+    profile.is_valid_pk(['store_id', 'sold_at'])
+    profile.save('orders.profile')
+
+    Parameters
+    ----------
+    keys : list = [default: None]
+        column names, or lists of names, to track as primary key candidates
+
+    max_exact : int = [default: 100_000]
+        most distinct values counted exactly per column, each costs 8 bytes
+
+    precision : int = [default: 14]
+        HyperLogLog precision, see sn.sketch.HyperLogLog
+
+    parallel : str = [default: 'thread']
+        one of 'serial', 'thread', or 'process', columns of each batch are
+        profiled by the column executor
+
+    workers : int = [default: None]
+        size of the worker pool, defaults to the number of CPUs
+
+    Attributes
+    ----------
+    rows : int
+        number of rows profiled
+
+    columns : dict
+        per-column statistics, by name
+
+    keys : dict
+        (has_nulls, DuplicateDetector) of every tracked key, by tuple of names
+    """
+    def __init__(
+        self,
+        *,
+        keys: list=None,
+        max_exact: int=100_000,
+        precision: int=14,
+        parallel: str='thread',
+        workers: int=None
+    ):
+        self.rows = 0
+        self.columns = {}
+        self.keys = {self._key(key): [False, DuplicateDetector()] for key in keys or []}
+        self.max_exact = max_exact
+        self.precision = precision
+        self.parallel = parallel
+        self.workers = workers
+
+    @staticmethod
+    def _key(column_name: Union[str, list]) -> tuple:
+        return (column_name,) if isinstance(column_name, str) else tuple(column_name)
+
+    def __repr__(self) -> str:
+        return f'<Profile of {self.rows:,} rows x {len(self.columns)} columns, {len(self.keys)} tracked keys>'
+
+    def __getstate__(self) -> dict:
+        # execution settings belong to the process, not the profile
+        return {k: v for k, v in self.__dict__.items() if k not in ('parallel', 'workers')}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state, parallel='thread', workers=None)
+
+    @instrument(name='Profile.update')
+    def update(self, df: pd.DataFrame) -> 'Profile':
+        """
+        Profile new rows, and merge them in.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            rows not yet profiled
+
+        Returns
+        -------
+        self : Profile
+        """
+        for key, state in self.keys.items():
+            missing = [name for name in key if name not in df.columns]
+            values = df[list(key)] if not missing else None
+
+            if missing or values.isna().to_numpy().any():
+                state[0] = True
+            elif not state[1].duplicated and len(values):
+                fingerprints = [_value_fingerprint(values.iloc[:, i]) for i in range(len(key))]
+                state[1].update_hashes(_combine_fingerprints(fingerprints))
+
+        compute = ft.partial(_ColumnProfile.of, max_exact=self.max_exact, precision=self.precision)
+        columns = [df.iloc[:, i] for i in range(df.shape[1])]
+        profiles = _map_columns(compute, columns, parallel=self.parallel, workers=self.workers)
+
+        for name, profile in zip(df.columns, profiles):
+            if name not in self.columns:
+                # rows seen before the column existed
+                profile.rows += self.rows
+                profile.nulls += self.rows
+                self.columns[name] = profile
+            else:
+                self.columns[name].merge(profile, max_exact=self.max_exact, precision=self.precision)
+
+        for name, profile in self.columns.items():
+            if name not in df.columns:
+                profile.rows += len(df)
+                profile.nulls += len(df)
+
+        self.rows += len(df)
+        return self
+
+    def merge(self, other: 'Profile') -> 'Profile':
+        """
+        Combine the profile of other rows of the same dataset, in place.
+
+        Parameters
+        ----------
+        other : Profile
+            built with the same keys and precision
+
+        Returns
+        -------
+        self : Profile
+        """
+        if other.precision != self.precision:
+            raise ValueError('cannot merge profiles of different precision')
+
+        for key, state in self.keys.items():
+            if key not in other.keys:
+                raise ValueError(f'the other profile does not track the key {key}')
+
+            has_nulls, detector = other.keys[key]
+            state[0] = state[0] or has_nulls
+
+            for run in detector.runs:
+                state[1].update_hashes(run)
+
+            state[1].duplicated = state[1].duplicated or detector.duplicated
+
+        for name, profile in other.columns.items():
+            if name in self.columns:
+                self.columns[name].merge(profile, max_exact=self.max_exact, precision=self.precision)
+            else:
+                # rows of ours, before the column existed
+                self.columns[name] = _ColumnProfile(profile.dtype).merge(profile, max_exact=self.max_exact, precision=self.precision)
+                self.columns[name].rows += self.rows
+                self.columns[name].nulls += self.rows
+
+        for name, profile in self.columns.items():
+            if name not in other.columns:
+                profile.rows += other.rows
+                profile.nulls += other.rows
+
+        self.rows += other.rows
+        return self
+
+    def index_statistics(self) -> pd.DataFrame:
+        """
+        Generate statistics to determine index candidacy.
+
+        See SNDF.index_statistics for the meaning of each statistic. Columns
+        past the exact budget are estimated, as with approximate=True.
+
+        fully_unique is only ever True when it is known exactly - from the
+        column's exact set of hashes, or a tracked key. A column past the
+        budget which is estimated to be unique is NA instead.
+
+        Returns
+        -------
+        sel : pd.DataFrame
+        """
+        n = self.rows
+        counts = pd.DataFrame(
+            [(p.nulls, p.distinct + bool(p.nulls), self._unique(name)) for name, p in self.columns.items()],
+            columns=['nulls', 'cardinality', 'unique'],
+            index=list(self.columns)
+        )
+
+        return pd.DataFrame({
+            'null_pct': counts.nulls / n * 100,
+            'cardinality': counts.cardinality,
+            'selectivity': counts.cardinality / n * 100,
+            'fully_unique': counts.unique.astype('boolean' if counts.unique.isna().any() else bool)
+        })
+
+    def _unique(self, name) -> Union[bool, None]:
+        """
+        Whether a column is unique, NULL counting as a value, None if unknown.
+        """
+        profile = self.columns[name]
+        cardinality = profile.distinct + bool(profile.nulls)
+
+        if profile.hashes is not None:
+            return cardinality == profile.rows
+        if profile.nulls > 1 or not _maybe_unique(cardinality, profile.rows, profile.error):
+            return False
+
+        if (name,) in self.keys and not profile.nulls:
+            return not self.keys[(name,)][1].duplicated
+
+        return None
+
+    def is_valid_pk(self, column_name: Union[str, list]) -> bool:
+        """
+        Determine whether a column, or columns, uniquely identify every row.
+
+        Tracked keys are always answered exactly. Any other single column is
+        answered from its exact set of hashes, which requires it to be within
+        the exact budget.
+
+        Parameters
+        ----------
+        column_name : str or list
+            name of the key column, or columns of a composite key
+
+        Returns
+        -------
+        is_valid : bool
+        """
+        key = self._key(column_name)
+
+        if key in self.keys:
+            has_nulls, detector = self.keys[key]
+            return not has_nulls and not detector.duplicated
+
+        if len(key) == 1 and key[0] in self.columns:
+            profile = self.columns[key[0]]
+
+            if profile.nulls:
+                return False
+            if profile.hashes is not None:
+                return len(profile.hashes) == profile.rows
+            if not _maybe_unique(profile.distinct, profile.rows, profile.error):
+                return False
+
+        raise ValueError(f'{list(key)} cannot be answered exactly, track it with keys= when profiling')
+
+    def sqla_types(self) -> dict:
+        """
+        The SQL type of every column, widened across every batch.
+
+        Returns
+        -------
+        types : dict
+            sqlalchemy type by column name, TEXT for columns never observed
+            with a value
+        """
+        return {name: Text if p.sqla_type is None else p.sqla_type for name, p in self.columns.items()}
+
+    def reflect(
+        self,
+        table_name: str='TMP_dataframe',
+        *,
+        bind: sa.engine.Engine,
+        pk: Union[str, list]=None,
+        dtypes: dict=None,
+        as_sql_stmt: bool=False
+    ) -> sa.Table:
+        """
+        Generate a SQLAlchemy Model from the types inferred for every batch.
+
+        See SNDF.reflect for the parameters, and ChunkedFrame.reflect for how
+        types are widened as batches disagree.
+
+        Returns
+        -------
+        model : sqlalchemy.Table
+        """
+        types = {**self.sqla_types(), **(dtypes or {})}
+        return _reflect_types(types, table_name, bind=bind, pk=pk, as_sql_stmt=as_sql_stmt)
+
+    def save(self, path: Union[str, pathlib.Path]) -> pathlib.Path:
+        """
+        Write the profile to disk, atomically.
+
+        Parameters
+        ----------
+        path : str or pathlib.Path
+            file to write to
+
+        Returns
+        -------
+        path : pathlib.Path
+        """
+        path = pathlib.Path(path).expanduser()
+        tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+
+        with tmp.open('wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, pathlib.Path]) -> 'Profile':
+        """
+        Read a profile written by Profile.save.
+
+        Parameters
+        ----------
+        path : str or pathlib.Path
+            file to read from
+
+        Returns
+        -------
+        profile : Profile
+        """
+        with pathlib.Path(path).expanduser().open('rb') as f:
+            profile = pickle.load(f)
+
+        if not isinstance(profile, cls):
+            raise TypeError(f'{path} does not hold a Profile')
+
+        return profile
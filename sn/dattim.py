@@ -1,12 +1,21 @@
-from typing import Union
+from __future__ import annotations
+
+from typing import Union, TYPE_CHECKING
+import functools as ft
+import collections
+import threading
 import calendar
 import datetime
 
-from pandas.tseries.holiday import (
-    get_calendar, AbstractHolidayCalendar, Holiday, nearest_workday,
-    USMartinLutherKingJr, USPresidentsDay, USMemorialDay, USLaborDay,
-    USColumbusDay, USThanksgivingDay
-)
+from ._lazy import LazyModule
+
+if TYPE_CHECKING:
+    from pandas.tseries.holiday import AbstractHolidayCalendar
+
+# pandas and numpy are only imported once something other than
+# nearest_future is used
+pd = LazyModule('pandas', globals(), 'pd')
+np = LazyModule('numpy', globals(), 'np')
 
 
 def nearest_future(weekday: Union[str, int]):
@@ -39,33 +48,480 @@ def nearest_future(weekday: Union[str, int]):
     return _wrapper
 
 
-class USBusinessHolidayCalendar(AbstractHolidayCalendar):
+Calendar = Union[str, 'AbstractHolidayCalendar', type]
+
+# (calendar, year) --> sorted datetime64[D] holidays of that year
+_HOLIDAY_CACHE = collections.OrderedDict()
+_HOLIDAY_CACHE_SIZE = 4096
+_HOLIDAY_CACHE_LOCK = threading.Lock()
+
+
+def __getattr__(name: str):
+    # the calendars subclass pandas' AbstractHolidayCalendar, define them on first use
+    if name in ('USBusinessHolidayCalendar', 'USHolidayCalendar'):
+        from . import _calendars
+        return getattr(_calendars, name)
+
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def _resolve_calendar(calendar: Calendar) -> AbstractHolidayCalendar:
+    """
+    Get a calendar instance from its registered name, class, or an instance.
+    """
+    if isinstance(calendar, str):
+        from pandas.tseries.holiday import get_calendar
+        from . import _calendars  # noqa: F401, importing sn's calendars registers them by name with pandas
+        return get_calendar(calendar)
+    if isinstance(calendar, type):
+        return calendar()
+    return calendar
+
+
+def _yearly_holidays(calendar: Calendar, years: range) -> list:
+    """
+    Fetch the holidays of each year, computing all missing years in one go.
+
+    Evaluating holiday rules once over a long range is far cheaper than once
+    per year, so every uncached year is computed by a single call and then
+    split apart by year. The least recently used years are evicted once the
+    cache is full.
+    """
+    with _HOLIDAY_CACHE_LOCK:
+        missing = [year for year in years if (calendar, year) not in _HOLIDAY_CACHE]
+
+    if missing:
+        first, last = min(missing), max(missing)
+        dates = _resolve_calendar(calendar).holidays(f'{first}-01-01', f'{last}-12-31')
+        dates = np.unique(dates.values.astype('datetime64[D]'))
+        bounds = np.arange(f'{first}', f'{last + 2}', dtype='datetime64[Y]').astype('datetime64[D]')
+        edges = np.searchsorted(dates, bounds)
+
+        with _HOLIDAY_CACHE_LOCK:
+            for year, lo, hi in zip(range(first, last + 1), edges[:-1], edges[1:]):
+                in_year = dates[lo:hi]
+                in_year.setflags(write=False)
+                _HOLIDAY_CACHE[(calendar, year)] = in_year
+
+    with _HOLIDAY_CACHE_LOCK:
+        found = []
+
+        for year in years:
+            _HOLIDAY_CACHE.move_to_end((calendar, year))
+            found.append(_HOLIDAY_CACHE[(calendar, year)])
+
+        while len(_HOLIDAY_CACHE) > max(_HOLIDAY_CACHE_SIZE, len(years)):
+            _HOLIDAY_CACHE.popitem(last=False)
+
+    return found
+
+
+def _year(day: np.datetime64) -> int:
+    return int(day.astype('datetime64[Y]').astype(np.int64)) + 1970
+
+
+def holidays_between(
+    start: Union[str, datetime.date],
+    end: Union[str, datetime.date],
+    calendar: Calendar='USBusinessHolidayCalendar'
+) -> np.ndarray:
+    """
+    Find the holidays of a calendar, between two dates inclusive.
+
+    Holidays are computed per calendar year and cached, so repeated and
+    overlapping requests are nearly free.
+
+    Parameters
+    ----------
+    start, end : str or datetime.date
+        inclusive bounds of the date range
+
+    calendar : str, AbstractHolidayCalendar = [default: 'USBusinessHolidayCalendar']
+        name of a registered pandas holiday calendar, or the calendar itself
+
+    Returns
+    -------
+    holidays : np.ndarray
+        sorted, unique, datetime64[D] values
+    """
+    start = np.datetime64(pd.Timestamp(start).date(), 'D')
+    end = np.datetime64(pd.Timestamp(end).date(), 'D')
+
+    years = _yearly_holidays(calendar, range(_year(start), _year(end) + 1))
+    dates = np.concatenate(years) if years else np.array([], dtype='datetime64[D]')
+    return dates[(dates >= start) & (dates <= end)]
+
+
+def _as_datetimes(dates) -> np.ndarray:
+    """
+    Convert array-likes of dates or datetimes to datetime64, NaT preserved.
+    """
+    values = np.asarray(dates)
+
+    if values.dtype.kind != 'M':
+        # timezone-aware datetimes are kept at their local wall time
+        converted = pd.to_datetime(values.ravel()).tz_localize(None)
+        values = np.asarray(converted).reshape(values.shape)
+
+    return values
+
+
+def _as_days(dates) -> np.ndarray:
+    """
+    Convert array-likes of dates or datetimes to datetime64[D], NaT preserved.
+    """
+    return _as_datetimes(dates).astype('datetime64[D]')
+
+
+def _as_time_of_day(time: Union[str, datetime.time]) -> np.timedelta64:
+    """
+    Convert a time such as '09:30' into the timedelta since midnight.
+    """
+    if isinstance(time, str):
+        time = datetime.time.fromisoformat(time)
+
+    seconds = (time.hour * 60 + time.minute) * 60 + time.second
+    return np.timedelta64(seconds * 10**6 + time.microsecond, 'us').astype('timedelta64[ns]')
+
+
+class HolidayIndex:
+    """
+    Holidays of a calendar over a range of years, compiled for fast lookups.
+
+    All lookups are vectorized over arrays of dates - holidays are matched by
+    direct lookup into a table of flags with one entry per day, and business
+    day arithmetic is handed to numpy's np.busday_* functions with the
+    holidays as their mask. Weekends are Saturday and Sunday.
+
+    Obtain instances through holiday_index(), which caches them.
+
+    Attributes
+    ----------
+    first_year, last_year : int
+        inclusive range of years the index covers, lookups outside of it
+        treat every weekday as a business day
+
+    holidays : np.ndarray
+        sorted, unique, datetime64[D] holidays
+
+    busdaycal : np.busdaycalendar
+        the holidays, compiled for np.busday_* functions
+
+    origin : np.datetime64
+        the first day covered, January 1st of first_year
+
+    flags : np.ndarray
+        boolean holiday flag of every day covered, indexed by days from origin
+    """
+    __slots__ = ('first_year', 'last_year', 'holidays', 'busdaycal', 'origin', 'flags')
+
+    def __init__(self, calendar: Calendar, first_year: int, last_year: int):
+        self.first_year = first_year
+        self.last_year = last_year
+        self.holidays = np.concatenate(_yearly_holidays(calendar, range(first_year, last_year + 1)))
+        self.busdaycal = np.busdaycalendar(holidays=self.holidays)
+        self.origin = np.datetime64(f'{first_year:04d}-01-01', 'D')
+
+        end = np.datetime64(f'{last_year + 1:04d}-01-01', 'D')
+        self.flags = np.zeros((end - self.origin).astype(np.int64), dtype=bool)
+        self.flags[(self.holidays - self.origin).astype(np.int64)] = True
+
+    def is_holiday(self, dates) -> np.ndarray:
+        """
+        Flag dates which are holidays, NaT is never a holiday.
+        """
+        offset = (_as_days(dates) - self.origin).astype(np.int64)
+        inside = (offset >= 0) & (offset < len(self.flags))
+        return np.take(self.flags, offset, mode='clip') & inside
+
+    def is_business_day(self, dates) -> np.ndarray:
+        """
+        Flag dates which are neither weekends nor holidays.
+        """
+        return np.is_busday(_as_days(dates), busdaycal=self.busdaycal)
+
+    def next_business_day(self, dates) -> np.ndarray:
+        """
+        Find the first business day strictly after each date.
+        """
+        return np.busday_offset(_as_days(dates), 1, roll='backward', busdaycal=self.busdaycal)
+
+    def add_business_days(self, dates, n) -> np.ndarray:
+        """
+        Shift dates by n business days, keeping their time of day.
+
+        Like pandas's CustomBusinessDay, a date which is not a business day is
+        first rolled in the direction of travel - Saturday + 1 is Monday, and
+        + 0 rolls forward to the next business day.
+        """
+        values = _as_datetimes(dates)
+        days = values.astype('datetime64[D]')
+        n = np.asarray(n, dtype=np.int64)
+
+        if n.ndim == 0:
+            roll = 'backward' if n > 0 else 'forward'
+            shifted = np.busday_offset(days, n, roll=roll, busdaycal=self.busdaycal)
+        else:
+            shifted = np.where(
+                n > 0,
+                np.busday_offset(days, n, roll='backward', busdaycal=self.busdaycal),
+                np.busday_offset(days, n, roll='forward', busdaycal=self.busdaycal)
+            )
+
+        return shifted + (values - days)
+
+    def roll(self, dates, direction: str='forward') -> np.ndarray:
+        """
+        Move dates which are not business days to the next ('forward') or
+        previous ('backward') business day, keeping their time of day.
+        """
+        values = _as_datetimes(dates)
+        days = values.astype('datetime64[D]')
+        return np.busday_offset(days, 0, roll=direction, busdaycal=self.busdaycal) + (values - days)
+
+    def business_time_between(
+        self,
+        a,
+        b,
+        *,
+        opens: Union[str, datetime.time]='09:00',
+        closes: Union[str, datetime.time]='17:00'
+    ) -> np.ndarray:
+        """
+        Measure the time elapsed from a to b, only counting business hours.
+
+        Each datetime is mapped to its position on a "business clock" - the
+        number of whole business days since the index's origin, times the
+        length of a business day, plus the part of its own day spent within
+        business hours. Elapsed business time is the difference of the two
+        positions, negative if b is before a.
+
+        Returns
+        -------
+        elapsed : np.ndarray
+            timedelta64[ns], NaT where either datetime is NaT
+        """
+        opens, closes = _as_time_of_day(opens), _as_time_of_day(closes)
+
+        if closes <= opens:
+            raise ValueError('business hours must close after they open')
+
+        a, b = np.broadcast_arrays(_as_datetimes(a), _as_datetimes(b))
+        return self._business_clock(b, opens, closes) - self._business_clock(a, opens, closes)
+
+    def _business_clock(self, values: np.ndarray, opens: np.timedelta64, closes: np.timedelta64) -> np.ndarray:
+        values = values.astype('datetime64[ns]')
+        missing = np.isnat(values)
+        days = np.where(missing, self.origin, values.astype('datetime64[D]'))
+        time_of_day = values - days
+
+        window = closes - opens
+        whole_days = np.busday_count(self.origin, days, busdaycal=self.busdaycal)
+        today = np.clip(time_of_day - opens, np.timedelta64(0, 'ns'), window)
+        today = np.where(np.is_busday(days, busdaycal=self.busdaycal), today, np.timedelta64(0, 'ns'))
+
+        clock = whole_days * window + today
+        clock[missing] = np.timedelta64('NaT')
+        return clock
+
+    def business_days_between(self, a, b) -> np.ndarray:
+        """
+        Count the business days in [a, b), negative if b is before a.
+
+        The result is int64, or float64 with NaN where either date is NaT.
+        """
+        a, b = np.broadcast_arrays(_as_days(a), _as_days(b))
+        missing = np.isnat(a) | np.isnat(b)
+
+        if not missing.any():
+            return np.busday_count(a, b, busdaycal=self.busdaycal)
+
+        counts = np.full(a.shape, np.nan)
+        counts[~missing] = np.busday_count(a[~missing], b[~missing], busdaycal=self.busdaycal)
+        return counts
+
+
+@ft.lru_cache(maxsize=32)
+def holiday_index(calendar: Calendar, first_year: int, last_year: int) -> HolidayIndex:
+    """
+    Get the, cached, HolidayIndex of a calendar over a range of years.
+
+    Parameters
+    ----------
+    calendar : str, AbstractHolidayCalendar
+        name of a registered pandas holiday calendar, or the calendar itself
+
+    first_year, last_year : int
+        inclusive range of years to cover
+
+    Returns
+    -------
+    index : HolidayIndex
+    """
+    return HolidayIndex(calendar, first_year, last_year)
+
+
+def _covering_index(calendar: Calendar, *dates: np.ndarray, pad_years: int=1) -> HolidayIndex:
+    """
+    Get a HolidayIndex which covers every date given, plus pad_years either side.
+
+    Ranges are widened to whole decades so that similar requests share an
+    index in the cache.
+    """
+    # fmin / fmax skip over NaT, like nanmin / nanmax do for floats
+    lows = [np.fmin.reduce(d, axis=None) for d in dates if d.size]
+    highs = [np.fmax.reduce(d, axis=None) for d in dates if d.size]
+    lows, highs = [d for d in lows if not np.isnat(d)], [d for d in highs if not np.isnat(d)]
+
+    if not lows:
+        first = last = datetime.date.today().year
+    else:
+        first = min(map(_year, lows))
+        last = max(map(_year, highs))
+
+    return holiday_index(calendar, (first - pad_years) // 10 * 10, (last + pad_years) // 10 * 10 + 9)
+
+
+def is_holiday(dates, calendar: Calendar='USBusinessHolidayCalendar') -> np.ndarray:
+    """
+    Flag dates which are holidays of a calendar.
+
+    Parameters
+    ----------
+    dates : array-like
+        dates or datetimes, times are ignored
+
+    calendar : str, AbstractHolidayCalendar = [default: 'USBusinessHolidayCalendar']
+        name of a registered pandas holiday calendar, or the calendar itself
+
+    Returns
+    -------
+    flags : np.ndarray
+    """
+    days = _as_days(dates)
+    return _covering_index(calendar, days).is_holiday(days)
+
+
+def next_business_day(dates, calendar: Calendar='USBusinessHolidayCalendar') -> np.ndarray:
+    """
+    Find the first business day strictly after each date.
+
+    Parameters
+    ----------
+    dates : array-like
+        dates or datetimes, times are ignored
+
+    calendar : str, AbstractHolidayCalendar = [default: 'USBusinessHolidayCalendar']
+        name of a registered pandas holiday calendar, or the calendar itself
+
+    Returns
+    -------
+    days : np.ndarray
+        datetime64[D] values
+    """
+    days = _as_days(dates)
+    return _covering_index(calendar, days).next_business_day(days)
+
+
+def business_days_between(a, b, calendar: Calendar='USBusinessHolidayCalendar') -> np.ndarray:
+    """
+    Count the business days in [a, b), pair-wise.
+
+    Parameters
+    ----------
+    a, b : array-like
+        dates or datetimes, times are ignored
+
+    calendar : str, AbstractHolidayCalendar = [default: 'USBusinessHolidayCalendar']
+        name of a registered pandas holiday calendar, or the calendar itself
+
+    Returns
+    -------
+    counts : np.ndarray
+        int64, or float64 with NaN where either date is NaT
+    """
+    a, b = _as_days(a), _as_days(b)
+    return _covering_index(calendar, a, b).business_days_between(a, b)
+
+
+def add_business_days(dates, n, calendar: Calendar='USBusinessHolidayCalendar') -> np.ndarray:
+    """
+    Shift dates by n business days, keeping their time of day.
+
+    Parameters
+    ----------
+    dates : array-like
+        dates or datetimes
+
+    n : int or array-like of int
+        number of business days to shift by, may be negative
+
+    calendar : str, AbstractHolidayCalendar = [default: 'USBusinessHolidayCalendar']
+        name of a registered pandas holiday calendar, or the calendar itself
+
+    Returns
+    -------
+    shifted : np.ndarray
     """
-    A US Holiday calendar with adjustments for Corporate-Honored Holidays.
+    values = _as_datetimes(dates)
+    n = np.asarray(n, dtype=np.int64)
+
+    # ~250 business days a year, the index must reach wherever we land
+    pad_years = int(np.abs(n).max(initial=0)) // 250 + 1
+    index = _covering_index(calendar, values.astype('datetime64[D]'), pad_years=pad_years)
+    return index.add_business_days(values, n)
+
+
+def roll_business_day(dates, direction: str='forward', calendar: Calendar='USBusinessHolidayCalendar') -> np.ndarray:
     """
-    rules = [
-        Holiday('New Years Day', month=1, day=1),
-        Holiday('New Years Day Observed', month=1, day=1, observance=nearest_workday),
-        USMartinLutherKingJr,
-        USPresidentsDay,
-        USMemorialDay,
-        Holiday('July 4th', month=7, day=4),
-        Holiday('July 4th Observed', month=7, day=4, observance=nearest_workday),
-        USLaborDay,
-        USColumbusDay,
-        Holiday('Veterans Day', month=11, day=11),
-        Holiday('Veterans Day Observed', month=11, day=11, observance=nearest_workday),
-        USThanksgivingDay,
-        Holiday('Christmas', month=12, day=25),
-        Holiday('Christmas Observed', month=12, day=25, observance=nearest_workday),
-    ]
+    Move dates which are not business days to the closest business day.
+
+    Parameters
+    ----------
+    dates : array-like
+        dates or datetimes
+
+    direction : str = [default: 'forward']
+        one of 'forward' or 'backward'
 
+    calendar : str, AbstractHolidayCalendar = [default: 'USBusinessHolidayCalendar']
+        name of a registered pandas holiday calendar, or the calendar itself
 
-class USHolidayCalendar(AbstractHolidayCalendar):
+    Returns
+    -------
+    rolled : np.ndarray
     """
-    A US Holiday calendar to denote special days that don't affect working days.
+    values = _as_datetimes(dates)
+    return _covering_index(calendar, values.astype('datetime64[D]')).roll(values, direction)
+
+
+def business_time_between(
+    a,
+    b,
+    *,
+    opens: Union[str, datetime.time]='09:00',
+    closes: Union[str, datetime.time]='17:00',
+    calendar: Calendar='USBusinessHolidayCalendar'
+) -> np.ndarray:
+    """
+    Measure the time elapsed between datetimes, only counting business hours.
+
+    Parameters
+    ----------
+    a, b : array-like
+        datetimes, pair-wise
+
+    opens, closes : str or datetime.time = [default: '09:00', '17:00']
+        the window of business hours on each business day
+
+    calendar : str, AbstractHolidayCalendar = [default: 'USBusinessHolidayCalendar']
+        name of a registered pandas holiday calendar, or the calendar itself
+
+    Returns
+    -------
+    elapsed : np.ndarray
+        timedelta64[ns], NaT where either datetime is NaT
     """
-    rules = [
-#         Holiday('Superbowl Sunday', month=2, day=1, observance=nearest_future('sunday')),
-        Holiday('New Years Eve', month=12, day=31)
-    ]
+    a, b = _as_datetimes(a), _as_datetimes(b)
+    index = _covering_index(calendar, a.astype('datetime64[D]'), b.astype('datetime64[D]'))
+    return index.business_time_between(a, b, opens=opens, closes=closes)
@@ -1,4 +1,10 @@
+import logging.handlers
+import threading
+import warnings
 import logging
+import time
+import atexit
+import queue
 
 
 _level_name  = '%(levelname)'
@@ -22,12 +28,154 @@ NOTEBOOK_LOG_FMT = f'[{_level_name}.1s] {_datetime}s | {_logger_name}s | {_file_
 FILE_LOG_FMT = f'[{_level_name}-8s] {_datetime}s - {_logger_name}s - {_module_name}s.{_func_name}s#L{_line_number}4s - {_log_message}s'
 
 
+class _BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueue LogRecords, dropping or blocking when the queue is full.
+
+    The message is formatted here, in the caller's thread, so that arguments
+    which change after the call is made are still logged as they were. The
+    final layout (the format string) is left to the listener's handlers.
+
+    Attributes
+    ----------
+    policy : str
+        one of 'drop' or 'block'
+
+    dropped : int
+        number of records discarded because the queue was full
+    """
+    def __init__(self, queue, *, policy: str='drop'):
+        if policy not in ('drop', 'block'):
+            raise ValueError(f"policy must be one of 'drop' or 'block', got {policy!r}")
+
+        super().__init__(queue)
+        self.policy = policy
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # the record never leaves the process, so unlike the stdlib it need
+        # neither be copied nor have its traceback rendered for pickling
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.policy == 'block':
+            self.queue.put(record)
+            return
+
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # enqueue is called from every logging thread
+            with self._dropped_lock:
+                self.dropped += 1
+
+
+class _BatchingQueueListener(logging.handlers.QueueListener):
+    """
+    Drain a queue of LogRecords in batches, on a background thread.
+
+    Each batch is written to a StreamHandler's stream in one write and one
+    flush, rather than one of each per record.
+    """
+    def __init__(self, queue, *handlers, queue_handler: _BoundedQueueHandler, batch_size: int=256):
+        super().__init__(queue, *handlers, respect_handler_level=True)
+        self.queue_handler = queue_handler
+        self.batch_size = batch_size
+        self._reported_drops = 0
+
+    def _monitor(self) -> None:
+        while True:
+            batch = [self.queue.get()]
+
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            # records logged after stop() may follow the sentinel, they are discarded
+            stop = next((i for i, r in enumerate(batch) if r is self._sentinel), None)
+            self._handle_batch(batch[:stop])
+
+            for _ in batch:
+                self.queue.task_done()
+
+            if stop is not None:
+                return
+
+    def _handle_batch(self, records: list) -> None:
+        dropped = self.queue_handler.dropped - self._reported_drops
+
+        if dropped:
+            self._reported_drops += dropped
+            records.append(logging.makeLogRecord({
+                'name': __name__,
+                'pathname': __file__,
+                'filename': 'log.py',
+                'module': 'log',
+                'funcName': '_handle_batch',
+                'levelno': logging.WARNING,
+                'levelname': 'WARNING',
+                'msg': f'log queue was full, {dropped} records were dropped',
+            }))
+
+        for handler in self.handlers:
+            accepted = [r for r in records if r.levelno >= handler.level and handler.filter(r)]
+
+            if not accepted:
+                continue
+
+            if isinstance(handler, logging.StreamHandler):
+                text = ''.join(handler.format(r) + handler.terminator for r in accepted)
+
+                try:
+                    with handler.lock:
+                        handler.stream.write(text)
+                        handler.flush()
+                except Exception:
+                    handler.handleError(accepted[-1])
+            else:
+                for record in accepted:
+                    handler.handle(record)
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+
+def _levelno(level: str) -> int:
+    """
+    Look up the number of a level by its name, eg. 'info'.
+    """
+    levelno = logging.getLevelName(level.upper())
+
+    # unknown names come back as the string 'Level X'
+    if not isinstance(levelno, int):
+        raise ValueError(f'unknown level {level!r}')
+
+    return levelno
+
+
+_LISTENERS = []
+
+
+def _stop_listeners() -> None:
+    while _LISTENERS:
+        _LISTENERS.pop().stop()
+
+
 def basic_setup(
     name: str='local_script',
     *,
     format: str=NOTEBOOK_LOG_FMT,
     datefmt: str='%H:%M:%S',
-    level: str='INFO'
+    level: str='INFO',
+    async_: bool=False,
+    queue_size: int=10_000,
+    policy: str='drop',
+    batch_size: int=256
 ):
     """
     Applies some recommended logging principles.
@@ -37,6 +185,15 @@ def basic_setup(
     quick understanding of how the program is performing, and if you've
     forgotten what date it is, we might have a problem. ;)
 
+    With async_=True, the StreamHandler is moved behind a queue. A log call
+    then only formats its message and enqueues it; a background thread does
+    the formatting and stream I/O, in batches. Whatever is still queued is
+    flushed when the interpreter exits.
+
+    Like logging.basicConfig, nothing is changed once the root logger has
+    handlers - as it does under pytest, Jupyter, and most frameworks. Should
+    async_=True be asked for then, a warning says logging stays synchronous.
+
     Parameters
     ----------
     name : str = [default: 'local_script']
@@ -51,17 +208,120 @@ def basic_setup(
     level : str = [default: 'INFO']
         log level name
 
+    async_ : bool = [default: False]
+        whether to write logs on a background thread
+
+    queue_size : int = [default: 10_000]
+        most records to hold in the queue, when async_
+
+    policy : str = [default: 'drop']
+        when the queue is full, either 'drop' the record (and count it), or
+        'block' the caller until there is room
+
+    batch_size : int = [default: 256]
+        most records written to the stream at once, when async_
+
     Returns
     -------
     log : logging.Logger
     """
-#     if 
-    
     log = logging.getLogger(name)
-    logging.basicConfig(format=format, datefmt=datefmt, level=level)
+
+    if async_ and logging.root.handlers:
+        if not any(isinstance(h, _BoundedQueueHandler) for h in logging.root.handlers):
+            warnings.warn(
+                'the root logger already has handlers, logging stays synchronous despite async_=True',
+                RuntimeWarning, stacklevel=2
+            )
+
+        async_ = False
+
+    if not async_:
+        logging.basicConfig(format=format, datefmt=datefmt, level=level)
+        return log
+
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(format, datefmt))
+
+    q = queue.Queue(maxsize=queue_size)
+    queue_handler = _BoundedQueueHandler(q, policy=policy)
+    listener = _BatchingQueueListener(q, handler, queue_handler=queue_handler, batch_size=batch_size)
+
+    logging.basicConfig(level=level, handlers=[queue_handler])
+    listener.start()
+
+    if not _LISTENERS:
+        atexit.register(_stop_listeners)
+
+    _LISTENERS.append(listener)
     return log
 
 
+class _LazyStrStats:
+    """
+    Opt-in accounting of how much lazy rendering costs.
+
+    Counting is off by default and costs a single attribute check per LazyStr
+    while off. Any LazyStr which was created but never rendered was skipped,
+    most likely because its log level was disabled.
+
+    Usage
+    -----
+    sn.log.lazy_stats.enable()
+    run_pipeline()
+    print(sn.log.lazy_stats.snapshot())
+    """
+    __slots__ = ('enabled', 'created', 'rendered', 'rerendered', 'cache_hits', 'truncated', 'render_seconds', '_lock')
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self.reset()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self.created = 0
+            self.rendered = 0
+            self.rerendered = 0
+            self.cache_hits = 0
+            self.truncated = 0
+            self.render_seconds = 0.0
+
+    def _count(self, attr: str, n=1) -> None:
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + n)
+
+    def snapshot(self) -> dict:
+        """
+        Current counts.
+
+        Returns
+        -------
+        stats : dict
+            created, rendered (at least once), rerendered (the same LazyStr,
+            again), cache_hits, truncated, skipped, render_seconds
+        """
+        with self._lock:
+            return {
+                'created': self.created,
+                'rendered': self.rendered,
+                'rerendered': self.rerendered,
+                'cache_hits': self.cache_hits,
+                'truncated': self.truncated,
+                'skipped': max(self.created - self.rendered, 0),
+                'render_seconds': self.render_seconds,
+            }
+
+
+lazy_stats = _LazyStrStats()
+
+
 class LazyStr:
     """
     Defer evaluation of str(some_func()).
@@ -83,12 +343,90 @@ class LazyStr:
     *args, **kwargs
         any position or keyword arguments to pass to fn
     """
-    __slots__ = ('fn', 'args', 'kwargs')
+    __slots__ = ('fn', 'args', 'kwargs', '_renders')
     
     def __init__(self, fn, *args, **kwargs):
         self.fn = fn
         self.args = args
         self.kwargs = kwargs
+        self._renders = 0
+
+        if lazy_stats.enabled:
+            lazy_stats._count('created')
+
+    def _render(self) -> str:
+        if not lazy_stats.enabled:
+            return f'{self.fn(*self.args, **self.kwargs)}'
+
+        start = time.perf_counter()
+        value = f'{self.fn(*self.args, **self.kwargs)}'
+        lazy_stats._count('render_seconds', time.perf_counter() - start)
+        lazy_stats._count('rerendered' if self._renders else 'rendered')
+        self._renders += 1
+        return value
 
     def __str__(self):
-        return f'{self.fn(*self.args, **self.kwargs)}'
+        return self._render()
+
+
+class CachedLazyStr(LazyStr):
+    """
+    Defer evaluation of str(some_func()), and then remember it.
+
+    A LogRecord is formatted once per handler it reaches, so a LazyStr sent to
+    both the console and a file is rendered twice. CachedLazyStr renders at
+    most once, even when handlers run on different threads, and may cap the
+    length of what it renders.
+
+    Usage
+    -----
+    log.debug('%s', CachedLazyStr(df.to_string).truncate(10_000))
+
+    Attributes
+    ----------
+    fn : callable
+        the callable to evaluate
+
+    *args, **kwargs
+        any position or keyword arguments to pass to fn
+
+    max_length : int
+        longest string to render, or None for no limit
+    """
+    __slots__ = ('max_length', '_value', '_lock')
+
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__(fn, *args, **kwargs)
+        self.max_length = None
+        self._value = None
+        self._lock = threading.Lock()
+
+    def truncate(self, max_length: int) -> 'CachedLazyStr':
+        """
+        Cap the rendered string at max_length characters.
+        """
+        self.max_length = max_length
+        return self
+
+    def __str__(self):
+        if self._value is not None:
+            if lazy_stats.enabled:
+                lazy_stats._count('cache_hits')
+
+            return self._value
+
+        with self._lock:
+            if self._value is None:
+                value = self._render()
+
+                if self.max_length is not None and len(value) > self.max_length:
+                    value = f'{value[:self.max_length]}... [truncated {len(value) - self.max_length:,} characters]'
+
+                    if lazy_stats.enabled:
+                        lazy_stats._count('truncated')
+
+                self._value = value
+            elif lazy_stats.enabled:
+                lazy_stats._count('cache_hits')
+
+        return self._value
@@ -0,0 +1,431 @@
+"""
+Measure where pipelines spend their time.
+
+Functions decorated with @instrument record their call counts, wall and CPU
+time histograms, and optionally their peak memory, into an in-process
+MetricsRegistry. The registry may be logged as a single line, or written as
+a Prometheus text file for node_exporter's textfile collector.
+
+Usage
+-----
+@sn.instrument
+def transform(df):
+    ...
+
+@sn.instrument(name='warehouse.load', memory=True)
+async def load(df):
+    ...
+
+sn.metrics.registry.to_log()
+sn.metrics.registry.to_prometheus('/var/lib/node_exporter/sn.prom')
+"""
+from typing import Callable, Union
+import functools as ft
+import tracemalloc
+import threading
+import inspect
+import logging
+import pathlib
+import bisect
+import types
+import time
+import json
+import math
+import os
+
+from .log import CachedLazyStr, _levelno
+
+
+log = logging.getLogger(__name__)
+
+# seconds, upper bounds of the histogram buckets, the last bucket is +Inf
+BUCKETS = (
+    0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0
+)
+
+
+class Histogram:
+    """
+    Counts of observations falling into fixed buckets.
+
+    Attributes
+    ----------
+    bounds : tuple
+        inclusive upper bound of each bucket, an implicit last bucket holds
+        everything larger
+
+    counts : list
+        observations per bucket, not cumulative
+
+    count, sum, max : int, float, float
+        number, total, and largest of the observations
+    """
+    __slots__ = ('bounds', 'counts', 'count', 'sum', 'max')
+
+    def __init__(self, bounds: tuple=BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def percentile(self, p: float) -> Union[float, None]:
+        """
+        Estimate a percentile, interpolating linearly within its bucket.
+        """
+        if not self.count:
+            return None
+
+        rank = p / 100 * self.count
+        seen = 0
+
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.bounds[i - 1] if i else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / n, self.max)
+            seen += n
+
+        return self.max
+
+    def summary(self, percentiles=(50, 90, 99)) -> dict:
+        """
+        Estimated percentiles, total, mean, and max of the observations.
+        """
+        return {
+            **{f'p{p}': self.percentile(p) for p in percentiles},
+            'total': self.sum,
+            'mean': self.sum / self.count if self.count else None,
+            'max': self.max if self.count else None,
+        }
+
+
+class _Metric:
+    __slots__ = ('calls', 'errors', 'wall', 'cpu', 'peak_memory')
+
+    def __init__(self, bounds: tuple):
+        self.calls = 0
+        self.errors = 0
+        self.wall = Histogram(bounds)
+        self.cpu = Histogram(bounds)
+        self.peak_memory = None
+
+
+class MetricsRegistry:
+    """
+    Thread-safe store of the measurements of instrumented functions.
+
+    Parameters
+    ----------
+    buckets : tuple = [default: BUCKETS]
+        upper bounds, in seconds, of the wall and CPU time histograms
+    """
+    def __init__(self, *, buckets: tuple=BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._metrics
+
+    def record(self, name: str, *, wall: float, cpu: float, peak_memory: int=None, error: bool=False) -> None:
+        """
+        Record one call.
+
+        Parameters
+        ----------
+        name : str
+            name of the instrumented function
+
+        wall, cpu : float
+            seconds spent, in real time and on the CPU
+
+        peak_memory : int = [default: None]
+            most bytes allocated at once during the call, if measured
+
+        error : bool = [default: False]
+            whether the call raised
+        """
+        with self._lock:
+            try:
+                metric = self._metrics[name]
+            except KeyError:
+                metric = self._metrics[name] = _Metric(self.buckets)
+
+            metric.calls += 1
+            metric.errors += error
+            metric.wall.observe(wall)
+            metric.cpu.observe(cpu)
+
+            if peak_memory is not None:
+                metric.peak_memory = max(metric.peak_memory or 0, peak_memory)
+
+    def reset(self) -> None:
+        """
+        Forget every measurement.
+        """
+        with self._lock:
+            self._metrics.clear()
+
+    def snapshot(self) -> dict:
+        """
+        Summarize the measurements of every instrumented function.
+
+        Returns
+        -------
+        metrics : dict
+            JSON-safe summary of calls, errors, wall and CPU time, and peak
+            memory in bytes, by name
+        """
+        with self._lock:
+            return {
+                name: {
+                    'calls': m.calls,
+                    'errors': m.errors,
+                    'wall': m.wall.summary(),
+                    'cpu': m.cpu.summary(),
+                    'peak_memory': m.peak_memory,
+                }
+                for name, m in sorted(self._metrics.items())
+            }
+
+    def to_log(self, *, log: logging.Logger=log, level: str='info') -> None:
+        """
+        Log every measurement as a single line of JSON.
+
+        Parameters
+        ----------
+        log : logging.Logger = [default: logging.getLogger('sn.metrics')]
+            logger to emit the line through
+
+        level : str = [default: 'info']
+            level of the record
+        """
+        levelno = _levelno(level)
+
+        if log.isEnabledFor(levelno):
+            log.log(levelno, 'metrics %s', CachedLazyStr(json.dumps, self.snapshot(), separators=(',', ':')))
+
+    def to_prometheus(self, fp: Union[str, pathlib.Path]=None, *, prefix: str='sn') -> str:
+        """
+        Render every measurement in the Prometheus text exposition format.
+
+        Parameters
+        ----------
+        fp : str or pathlib.Path = [default: None]
+            file to write to, atomically, so that a collector never reads a
+            partially written file
+
+        prefix : str = [default: 'sn']
+            prepended to every metric name
+
+        Returns
+        -------
+        text : str
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+            lines = []
+
+            def family(metric: str, kind: str, help_: str) -> str:
+                lines.extend([f'# HELP {prefix}_{metric} {help_}', f'# TYPE {prefix}_{metric} {kind}'])
+                return f'{prefix}_{metric}'
+
+            def label(name: str, **extra) -> str:
+                pairs = {'name': name, **extra}
+                escaped = (f'{k}="{_escape(v)}"' for k, v in pairs.items())
+                return '{' + ','.join(escaped) + '}'
+
+            metric = family('calls_total', 'counter', 'Calls of instrumented functions.')
+            lines.extend(f'{metric}{label(name)} {m.calls}' for name, m in metrics)
+
+            metric = family('errors_total', 'counter', 'Calls of instrumented functions which raised.')
+            lines.extend(f'{metric}{label(name)} {m.errors}' for name, m in metrics)
+
+            for attr, help_ in (('wall', 'Wall clock time'), ('cpu', 'CPU time')):
+                metric = family(f'{attr}_seconds', 'histogram', f'{help_} of instrumented functions.')
+
+                for name, m in metrics:
+                    histogram = getattr(m, attr)
+                    cumulative = 0
+
+                    for bound, n in zip((*histogram.bounds, math.inf), histogram.counts):
+                        cumulative += n
+                        le = '+Inf' if bound == math.inf else repr(float(bound))
+                        lines.append(f'{metric}_bucket{label(name, le=le)} {cumulative}')
+
+                    lines.append(f'{metric}_sum{label(name)} {histogram.sum!r}')
+                    lines.append(f'{metric}_count{label(name)} {histogram.count}')
+
+            if any(m.peak_memory is not None for _, m in metrics):
+                metric = family('peak_memory_bytes', 'gauge', 'Largest peak of memory traced during a call.')
+                lines.extend(f'{metric}{label(name)} {m.peak_memory}' for name, m in metrics if m.peak_memory is not None)
+
+        text = '\n'.join(lines) + '\n'
+
+        if fp is not None:
+            fp = pathlib.Path(fp)
+            tmp = fp.with_name(f'.{fp.name}.{os.getpid()}.tmp')
+            tmp.write_text(text)
+            os.replace(tmp, fp)
+
+        return text
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+registry = MetricsRegistry()
+
+
+class _MemoryTracer:
+    """
+    Start tracemalloc for the first measurement, stop it after the last.
+
+    tracemalloc keeps a single, process-wide, peak. The peak of a call that
+    overlaps another measured call - nested, or in another thread or task -
+    is therefore approximate.
+    """
+    def __init__(self):
+        self.active = 0
+        self.started = False
+        self.lock = threading.Lock()
+
+    def start(self) -> int:
+        with self.lock:
+            if not self.active and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.started = True
+
+            self.active += 1
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            return current
+
+    def stop(self, baseline: int) -> int:
+        with self.lock:
+            _, peak = tracemalloc.get_traced_memory()
+            self.active -= 1
+
+            if not self.active and self.started:
+                tracemalloc.stop()
+                self.started = False
+
+            return max(peak - baseline, 0)
+
+
+_TRACER = _MemoryTracer()
+
+
+@types.coroutine
+def _cpu_timed(coro, cpu: list):
+    """
+    Drive a coroutine, adding the CPU time of its steps to cpu[0].
+
+    Time spent suspended, while other tasks run, is not counted.
+    """
+    value, error = None, None
+
+    while True:
+        start = time.thread_time()
+
+        try:
+            yielded = coro.send(value) if error is None else coro.throw(error)
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            cpu[0] += time.thread_time() - start
+
+        try:
+            value, error = (yield yielded), None
+        except GeneratorExit:
+            coro.close()
+            raise
+        except BaseException as e:
+            value, error = None, e
+
+
+def instrument(
+    func: Callable=None,
+    *,
+    name: str=None,
+    memory: bool=False,
+    registry: MetricsRegistry=None
+) -> Callable:
+    """
+    Record the calls, wall and CPU time, and peak memory of a function.
+
+    May be used bare, @instrument, or with arguments, @instrument(name=...).
+    CPU time is that of the calling thread, work handed to a pool of threads
+    or processes is not included. Coroutine functions are supported; their
+    CPU time only counts the time the coroutine itself is running, not the
+    time it spends suspended.
+
+    Parameters
+    ----------
+    func : callable
+        function or coroutine function to instrument
+
+    name : str = [default: func.__qualname__]
+        name to record the measurements under
+
+    memory : bool = [default: False]
+        also measure peak memory with tracemalloc, which slows down every
+        allocation while any measured call is running
+
+    registry : MetricsRegistry = [default: sn.metrics.registry]
+        where measurements are recorded
+
+    Returns
+    -------
+    wrapper : callable
+    """
+    if func is None:
+        return ft.partial(instrument, name=name, memory=memory, registry=registry)
+
+    name = name or func.__qualname__
+    # the argument shadows the module's default registry
+    sink = registry if registry is not None else globals()['registry']
+
+    if inspect.iscoroutinefunction(func):
+        @ft.wraps(func)
+        async def wrapper(*args, **kwargs):
+            baseline = _TRACER.start() if memory else None
+            cpu, error = [0.0], True
+            start = time.perf_counter()
+
+            try:
+                result = await _cpu_timed(func(*args, **kwargs), cpu)
+                error = False
+                return result
+            finally:
+                wall = time.perf_counter() - start
+                peak = _TRACER.stop(baseline) if memory else None
+                sink.record(name, wall=wall, cpu=cpu[0], peak_memory=peak, error=error)
+
+        return wrapper
+
+    @ft.wraps(func)
+    def wrapper(*args, **kwargs):
+        baseline = _TRACER.start() if memory else None
+        error = True
+        start, start_cpu = time.perf_counter(), time.thread_time()
+
+        try:
+            result = func(*args, **kwargs)
+            error = False
+            return result
+        finally:
+            wall, cpu = time.perf_counter() - start, time.thread_time() - start_cpu
+            peak = _TRACER.stop(baseline) if memory else None
+            sink.record(name, wall=wall, cpu=cpu, peak_memory=peak, error=error)
+
+    return wrapper
@@ -1,4 +1,6 @@
 from typing import Optional
+import functools as ft
+import calendar
 
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import (
@@ -7,6 +9,15 @@ from sqlalchemy import (
 )
 import sqlalchemy as sa
 import pandas as pd
+import numpy as np
+
+from .database import bulk_insert, abulk_insert
+from .dattim import holidays_between
+from .metrics import instrument
+
+
+_WEEKDAY_NAMES = np.array(list(calendar.day_name), dtype=object)
+_MONTH_NAMES = np.array(list(calendar.month_name), dtype=object)
 
 
 Base = declarative_base()
@@ -49,14 +60,22 @@ class BusinessCalendar(Base):
     is_us_holiday = Column(Boolean)
 
     @staticmethod
+    @instrument(name='BusinessCalendar.populate')
     def populate(
         start_date: str,
         end_date: str,
         engine: sa.engine.Engine=None,
+        *,
+        calendar_name: str='USBusinessHolidayCalendar',
+        chunksize: int=10_000
     ) -> Optional[pd.DataFrame]:
         """
         Fills the database with data.
-        
+
+        Every column is computed directly on arrays of datetime64[D] values,
+        and holidays are cached per calendar and year. The table is created if
+        it does not exist yet, and rows are inserted in chunks.
+
         Parameters
         ----------
         start_date : str
@@ -64,75 +83,193 @@ class BusinessCalendar(Base):
 
         end_date : str
             ending DATE for the table in the format YYYY-MM-DD
-        
+
         engine : sqlalchemy.engine.Engine
             engine instance for INSERT of data into a database
 
+        calendar_name : str = [default: 'USBusinessHolidayCalendar']
+            name of the holiday calendar which decides is_us_holiday
+
+        chunksize : int = [default: 10_000]
+            number of rows sent to the database per round trip
+
         Returns
         -------
         df : pandas.DataFrame
         """
-        df = pd.date_range(start_date, end_date)\
-               .to_frame(index=False, name='calendar_date')\
-               .assign(
-                   day_of_month=BusinessCalendar._from_calendar_date('day', attr=True),
-                   day_of_year=BusinessCalendar._from_calendar_date('dayofyear', attr=True),
-                   weekday=BusinessCalendar._from_calendar_date('day_name'),
-                   weekday_number=BusinessCalendar._from_calendar_date('weekday', attr=True),
-                   weekday_in_month=lambda df: ((df.day_of_month - 1) // 7) + 1,
-                   week_begin=lambda df: df.calendar_date - (df.weekday_number * np.timedelta64(1, 'D')),
-                   week_end=lambda df: df.week_begin + np.timedelta64(6, 'D'),
-                   week_of_month=lambda df: round(df.day_of_month // 7) + 1,
-                   week_of_year=lambda df: round(df.day_of_year // 7) + 1,
-                   month_begin=lambda df: df.calendar_date - MonthBegin(1),
-                   month_end=lambda df: df.month_begin + MonthEnd(1),
-                   month_of_quarter=lambda df: df.calendar_date.dt.month // df.calendar_date.dt.quarter,
-                   month_of_year=BusinessCalendar._from_calendar_date('month', attr=True),
-                   month_name=BusinessCalendar._from_calendar_date('strftime', date_format='%B'),
-                   quarter_begin=lambda df: df.calendar_date + QuarterBegin(0, startingMonth=1),
-                   quarter_end=lambda df: df.quarter_begin + MonthEnd(3),
-                   quarter_of_year=BusinessCalendar._from_calendar_date('quarter', attr=True),
-                   is_weekday=lambda df: df.weekday_number < 5,
-                   is_weekend=lambda df: ~df.is_weekday
-               )\
-               .pipe(BusinessCalendar._set_holidays)\
-               .assign(is_business_day=lambda df: ~df.is_us_holiday & df.is_weekday)\
-               .sort_values('calendar_date')
-        
-        try:
-            # TODO: currently this assumes the table has been created already
-            with engine.connect() as conn:
-                stmt = BusinessCalendar.__table__.insert()
-                data = df.to_dict(orient='records')
-                conn.execute(stmt, data)
-
-        except AttributeError:
-            pass
-        else:
-            return
-        return df
+        df = BusinessCalendar._generate(start_date, end_date, calendar_name)
+
+        if engine is None:
+            return df
+
+        BusinessCalendar.__table__.create(engine, checkfirst=True)
+        bulk_insert(BusinessCalendar.__table__, df, bind=engine, chunksize=chunksize)
 
     @staticmethod
-    def _from_calendar_date(name, *args, attr=False, **kwargs):
-        def _wrapper(df):
-            r = getattr(df.calendar_date.dt, name)
+    @instrument(name='BusinessCalendar.apopulate')
+    async def apopulate(
+        start_date: str,
+        end_date: str,
+        engine,
+        *,
+        calendar_name: str='USBusinessHolidayCalendar',
+        chunksize: int=10_000
+    ) -> int:
+        """
+        Fills the database with data, without blocking the event loop.
+
+        The asynchronous counterpart to BusinessCalendar.populate, built on
+        SQLAlchemy's AsyncEngine. The calendar is generated on a worker thread
+        and inserted with sn.database.abulk_insert.
+
+        Usage
+        -----
+        engine = sn.database.async_engine('sqlite+aiosqlite:///warehouse.db')
+        await BusinessCalendar.apopulate('2000-01-01', '2049-12-31', engine)
+
+        Parameters
+        ----------
+        start_date : str
+            beginning DATE for the table in the format YYYY-MM-DD
+
+        end_date : str
+            ending DATE for the table in the format YYYY-MM-DD
+
+        engine : sqlalchemy.ext.asyncio.AsyncEngine
+            engine instance for INSERT of data into a database
+
+        calendar_name : str = [default: 'USBusinessHolidayCalendar']
+            name of the holiday calendar which decides is_us_holiday
 
-            if attr:
-                return r
-            return r(*args, **kwargs)
-        return _wrapper
+        chunksize : int = [default: 10_000]
+            number of rows sent to the database per round trip
+
+        Returns
+        -------
+        rows : int
+            number of dates inserted
+        """
+        from .async_ import run_blocking
+
+        df = await run_blocking(BusinessCalendar._generate, start_date, end_date, calendar_name)
+
+        async with engine.begin() as conn:
+            await conn.run_sync(BusinessCalendar.__table__.create, checkfirst=True)
+            return await abulk_insert(BusinessCalendar.__table__, df, bind=conn, chunksize=chunksize)
 
     @staticmethod
-    def _set_holidays(df, calendar_name='USBusinessHolidayCalendar'):
-        min_ = df.calendar_date.min()
-        max_ = df.calendar_date.max()
-        cf = get_calendar(calendar_name).holidays(min_, max_, return_name=True)\
-                                        .to_frame()\
-                                        .reset_index()\
-                                        .rename(columns={'index': 'calendar_date', 0: 'day_name'})\
-                                        .drop_duplicates('calendar_date')
-
-        df = df.merge(cf, how='left', on='calendar_date')\
-               .assign(is_us_holiday=lambda df: df.day_name.notna())
-
-        return df
+    def extend(
+        end_date: str,
+        engine: sa.engine.Engine,
+        *,
+        start_date: str=None,
+        calendar_name: str='USBusinessHolidayCalendar',
+        chunksize: int=10_000
+    ) -> int:
+        """
+        Extend the table up to a date, only generating the dates it's missing.
+
+        Parameters
+        ----------
+        end_date : str
+            ending DATE for the table in the format YYYY-MM-DD
+
+        engine : sqlalchemy.engine.Engine
+            engine instance for INSERT of data into a database
+
+        start_date : str = [default: None]
+            beginning DATE, should the table be empty
+
+        calendar_name : str = [default: 'USBusinessHolidayCalendar']
+            name of the holiday calendar which decides is_us_holiday
+
+        chunksize : int = [default: 10_000]
+            number of rows sent to the database per round trip
+
+        Returns
+        -------
+        rows : int
+            number of dates inserted
+        """
+        table = BusinessCalendar.__table__
+        table.create(engine, checkfirst=True)
+
+        with engine.connect() as conn:
+            latest = conn.execute(sa.select(sa.func.max(table.c.calendar_date))).scalar()
+
+        if latest is not None:
+            start_date = pd.Timestamp(latest) + pd.Timedelta(days=1)
+        elif start_date is None:
+            raise ValueError('start_date is required when the table is empty')
+
+        if pd.Timestamp(start_date) > pd.Timestamp(end_date):
+            return 0
+
+        df = BusinessCalendar._generate(start_date, end_date, calendar_name)
+        return bulk_insert(table, df, bind=engine, chunksize=chunksize)
+
+    @staticmethod
+    def _generate(start_date: str, end_date: str, calendar_name: str) -> pd.DataFrame:
+        """
+        Compute every column of the calendar, in a single pass over the dates.
+        """
+        start = np.datetime64(pd.Timestamp(start_date).date(), 'D')
+        end = np.datetime64(pd.Timestamp(end_date).date(), 'D')
+
+        dates = np.arange(start, end + 1, dtype='datetime64[D]')
+        months = dates.astype('datetime64[M]')
+        years = dates.astype('datetime64[Y]')
+        first_month = years.astype('datetime64[M]')
+
+        # 1970-01-01, day zero, was a Thursday
+        weekday = ((dates.astype(np.int64) + 3) % 7).astype(np.int16)
+        day_of_month = ((dates - months.astype('datetime64[D]')).astype(np.int64) + 1).astype(np.int16)
+        day_of_year = ((dates - years.astype('datetime64[D]')).astype(np.int64) + 1).astype(np.int16)
+        month_of_year = ((months - first_month).astype(np.int64) + 1).astype(np.int16)
+        quarter = (month_of_year - 1) // 3 + 1
+
+        week_begin = dates - weekday
+        quarter_begin = first_month + (quarter - 1) * 3
+        is_weekday = weekday < 5
+        is_holiday = np.isin(dates, holidays_between(start, end, calendar_name))
+
+        return pd.DataFrame({
+            'calendar_date': dates,
+            'day_of_week': weekday,
+            'day_of_month': day_of_month,
+            'day_of_year': day_of_year,
+            'weekday': _WEEKDAY_NAMES[weekday],
+            'weekday_in_month': (day_of_month - 1) // 7 + 1,
+            'weekday_number': weekday,
+            'week_begin': week_begin,
+            'week_end': week_begin + 6,
+            'week_of_month': day_of_month // 7 + 1,
+            'week_of_year': day_of_year // 7 + 1,
+            'month_begin': months.astype('datetime64[D]'),
+            'month_end': (months + 1).astype('datetime64[D]') - 1,
+            'month_of_quarter': (month_of_year - 1) % 3 + 1,
+            'month_of_year': month_of_year,
+            'month_name': _MONTH_NAMES[month_of_year],
+            'quarter_begin': quarter_begin.astype('datetime64[D]'),
+            'quarter_end': (quarter_begin + 3).astype('datetime64[D]') - 1,
+            'quarter_of_year': quarter,
+            'is_business_day': is_weekday & ~is_holiday,
+            'is_weekday': is_weekday,
+            'is_weekend': ~is_weekday,
+            'is_us_holiday': is_holiday,
+        })
+
+
+@ft.lru_cache(maxsize=8)
+def _dimension(calendar_name: str, first_year: int, last_year: int, *, nullable: bool=False) -> pd.DataFrame:
+    """
+    Get the, cached, calendar of whole years - to gather attributes from by day offset.
+
+    With nullable, integer and boolean columns have nullable dtypes, so that
+    gathering with missing offsets keeps their type. Callers must not modify
+    the frame.
+    """
+    if nullable:
+        return _dimension(calendar_name, first_year, last_year).convert_dtypes(convert_string=False)
+
+    return BusinessCalendar._generate(f'{first_year}-01-01', f'{last_year}-12-31', calendar_name)
@@ -0,0 +1,212 @@
+from typing import Union
+
+import pandas as pd
+import numpy as np
+
+
+class HyperLogLog:
+    """
+    Approximate the number of distinct values in a stream of data.
+
+    A HyperLogLog sketch keeps a fixed-size array of registers no matter how
+    much data is fed through it, and two sketches built over different pieces
+    of the same data may be merged into one. The relative standard error of
+    the estimate is roughly 1.04 / sqrt(2 ** precision), or ~0.8% at the
+    default precision of 14.
+
+    Further Reading:
+        1) Flajolet et al. (2007), "HyperLogLog: the analysis of a near-optimal
+           cardinality estimation algorithm"
+
+    Attributes
+    ----------
+    precision : int
+        number of hash bits used to choose a register
+
+    registers : np.ndarray
+        the largest observed run of leading zeros, per register
+    """
+    __slots__ = ('precision', 'registers')
+
+    def __init__(self, precision: int=14):
+        if not 4 <= precision <= 18:
+            raise ValueError(f'precision must be between 4 and 18, got {precision}')
+
+        self.precision = precision
+        self.registers = np.zeros(2 ** precision, dtype=np.uint8)
+
+    @property
+    def error(self) -> float:
+        """
+        Relative standard error of the estimate.
+        """
+        return 1.04 / np.sqrt(len(self.registers))
+
+    def update(self, values: pd.Series) -> 'HyperLogLog':
+        """
+        Add the non-null values of a Series to the sketch.
+
+        Parameters
+        ----------
+        values : pd.Series
+            data to observe
+
+        Returns
+        -------
+        self : HyperLogLog
+        """
+        values = values[values.notna()]
+
+        if values.empty:
+            return self
+
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+        self.update_hashes(hashes)
+        return self
+
+    def update_hashes(self, hashes: np.ndarray) -> 'HyperLogLog':
+        """
+        Add pre-computed uint64 hashes to the sketch.
+
+        Parameters
+        ----------
+        hashes : np.ndarray
+            64-bit hashes of the observed values
+
+        Returns
+        -------
+        self : HyperLogLog
+        """
+        p = self.precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.intp)
+
+        # the next 32 bits are exactly representable as a float, so frexp
+        # yields their bit length --> rank of the first set bit
+        word = ((hashes >> np.uint64(32 - p)) & np.uint64(0xFFFFFFFF)).astype(np.float64)
+        _, bit_length = np.frexp(word)
+        rank = (33 - bit_length).astype(np.uint8)
+
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        """
+        Combine another sketch into this one.
+
+        Parameters
+        ----------
+        other : HyperLogLog
+            sketch built with the same precision
+
+        Returns
+        -------
+        self : HyperLogLog
+        """
+        if other.precision != self.precision:
+            raise ValueError('cannot merge sketches of different precision')
+
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self) -> float:
+        """
+        Estimate the number of distinct values observed.
+
+        Returns
+        -------
+        cardinality : float
+        """
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m ** 2 / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+
+        # small range correction, linear counting
+        if raw <= 2.5 * m and zeros:
+            return m * np.log(m / zeros)
+        return float(raw)
+
+
+class DuplicateDetector:
+    """
+    Detect whether any value in a stream of data repeats.
+
+    Values are reduced to 64-bit hashes, which are kept in sorted runs. A new
+    run is checked against every existing run by binary search, and runs are
+    merged whenever the newest is at least as large as the one before it -
+    so there are only ever O(log n) runs to search. Memory is 8 bytes per
+    distinct value, a fraction of the values themselves.
+
+    The answer is exact, save for 64-bit hash collisions, which would report a
+    duplicate where there is none.
+
+    Attributes
+    ----------
+    runs : list
+        sorted, disjoint, uint64 arrays of the hashes seen so far
+
+    duplicated : bool
+        whether a repeated value has been observed
+    """
+    __slots__ = ('runs', 'duplicated')
+
+    def __init__(self):
+        self.runs = []
+        self.duplicated = False
+
+    def __len__(self) -> int:
+        return sum(map(len, self.runs))
+
+    def update(self, values: Union[pd.Series, pd.DataFrame]) -> bool:
+        """
+        Add rows of data to the detector.
+
+        Parameters
+        ----------
+        values : pd.Series or pd.DataFrame
+            data to observe, each row of a DataFrame is one value
+
+        Returns
+        -------
+        duplicated : bool
+        """
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+        return self.update_hashes(hashes)
+
+    def update_hashes(self, hashes: np.ndarray) -> bool:
+        """
+        Add pre-computed uint64 hashes to the detector.
+
+        Parameters
+        ----------
+        hashes : np.ndarray
+            64-bit hashes of the observed values
+
+        Returns
+        -------
+        duplicated : bool
+        """
+        if self.duplicated or not len(hashes):
+            return self.duplicated
+
+        run = np.sort(hashes)
+
+        if (run[1:] == run[:-1]).any():
+            self.duplicated = True
+            return True
+
+        for other in self.runs:
+            positions = np.searchsorted(other, run).clip(max=len(other) - 1)
+
+            if (other[positions] == run).any():
+                self.duplicated = True
+                return True
+
+        self.runs.append(run)
+
+        while len(self.runs) > 1 and len(self.runs[-2]) <= len(self.runs[-1]):
+            newer, older = self.runs.pop(), self.runs.pop()
+            # stable sort is a timsort, it merges two sorted runs in linear time
+            self.runs.append(np.sort(np.concatenate([older, newer]), kind='stable'))
+
+        return False
@@ -0,0 +1,321 @@
+from unittest import mock
+import tempfile
+import pathlib
+
+from ward import test, fixture, each
+import sqlalchemy as sa
+import pandas as pd
+
+from sn.database import apply_schema, schema_diff, SchemaCache
+from sn.models import BusinessCalendar
+import sn
+
+
+@fixture
+def engine():
+    with tempfile.TemporaryDirectory() as directory:
+        engine = sa.create_engine(f'sqlite:///{pathlib.Path(directory) / "warehouse.db"}')
+        yield engine
+        engine.dispose()
+
+
+@fixture
+def metadata():
+    metadata = sa.MetaData()
+    sa.Table('customer', metadata, sa.Column('id', sa.Integer, primary_key=True))
+    sa.Table('product', metadata, sa.Column('id', sa.Integer, primary_key=True))
+    sa.Table(
+        'orders', metadata,
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('customer_id', sa.ForeignKey('customer.id'), index=True),
+        sa.Column('product_id', sa.ForeignKey('product.id'))
+    )
+    sa.Table(
+        'shipment', metadata,
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('order_id', sa.ForeignKey('orders.id'))
+    )
+    return metadata
+
+
+@test('apply_schema creates every table, in foreign key order')
+def _(engine=engine, metadata=metadata):
+    timings = apply_schema(metadata, engine, workers=4)
+
+    assert list(timings.index) == ['customer', 'product', 'orders', 'shipment']
+    assert (timings['status'] == 'created').all()
+    assert set(sa.inspect(engine).get_table_names()) == set(metadata.tables)
+    assert sa.inspect(engine).get_indexes('orders')[0]['column_names'] == ['customer_id']
+
+
+@test('apply_schema skips tables which already exist')
+def _(engine=engine, metadata=metadata):
+    metadata.tables['customer'].create(engine)
+    timings = apply_schema(metadata, engine, workers=4)
+
+    assert timings.loc['customer', 'status'] == 'skipped'
+    assert (timings.drop('customer')['status'] == 'created').all()
+    assert (apply_schema(metadata, engine)['status'] == 'skipped').all()
+
+
+@test('apply_schema creates the tables of an in-memory SQLite database, or with one worker, on the calling thread')
+def _(engine=engine, metadata=metadata):
+    memory = sa.create_engine('sqlite://')
+    timings = apply_schema(metadata, memory)
+
+    assert (timings['status'] == 'created').all()
+    assert set(sa.inspect(memory).get_table_names()) == set(metadata.tables)
+
+    apply_schema(sn.models.Base.metadata, memory)
+
+    assert 'business_calendar' in sa.inspect(memory).get_table_names()
+
+    apply_schema(metadata, engine, workers=1)
+
+    assert set(sa.inspect(engine).get_table_names()) == set(metadata.tables)
+
+
+@test('apply_schema compiles a table as it is now, after a column changes type')
+def _(metadata=metadata):
+    before, after = sa.create_engine('sqlite://'), sa.create_engine('sqlite://')
+    apply_schema(metadata, before)
+
+    metadata.tables['customer'].c.id.type = sa.String(10)
+    apply_schema(metadata, after)
+
+    assert isinstance(sa.inspect(before).get_columns('customer')[0]['type'], sa.INTEGER)
+    assert isinstance(sa.inspect(after).get_columns('customer')[0]['type'], sa.VARCHAR)
+
+
+@test('apply_schema refuses foreign keys which form a cycle')
+def _(engine=engine, metadata=metadata):
+    sa.Table('a', metadata, sa.Column('id', sa.Integer, primary_key=True), sa.Column('b_id', sa.ForeignKey('b.id')))
+    sa.Table('b', metadata, sa.Column('id', sa.Integer, primary_key=True), sa.Column('a_id', sa.ForeignKey('a.id')))
+
+    try:
+        apply_schema(metadata, engine)
+    except ValueError as e:
+        assert 'cycle' in str(e)
+    else:
+        raise AssertionError('expected a ValueError')
+
+
+@fixture
+def cache():
+    with tempfile.TemporaryDirectory() as directory:
+        yield SchemaCache(directory, max_memory_entries=4)
+
+
+@test('SNDF.reflect with a SchemaCache infers a schema once, then reads it back from memory or disk')
+def _(engine=engine, cache=cache):
+    df = pd.DataFrame({'id': [1, 2], 'name': ['a', 'b']})
+
+    with mock.patch('sn.dataframe.to_sqla', wraps=sn.dataframe.to_sqla) as to_sqla:
+        first = df.sn.reflect('t', bind=engine, pk='id', cache=cache)
+        again = df.sn.reflect('t', bind=engine, pk='id', cache=cache)
+        assert to_sqla.call_count == 2
+
+        reloaded = df.sn.reflect('t', bind=engine, pk='id', cache=SchemaCache(cache.directory))
+        assert to_sqla.call_count == 2
+
+        df.sn.reflect('t', bind=engine, pk='name', cache=cache)
+        df.sn.reflect('u', bind=engine, pk='id', cache=cache)
+        assert to_sqla.call_count == 6
+
+    assert again is first
+    assert repr(reloaded) == repr(first)
+    assert df.sn.reflect('t', bind=engine, pk='id', cache=cache, as_sql_stmt=True) == str(sa.schema.CreateTable(first).compile(engine))
+    assert len(list(cache.directory.glob('*.pkl'))) == 3
+    assert len(list(cache.directory.glob('*.sql'))) == 1
+
+    cache.clear()
+
+    assert not list(cache.directory.iterdir())
+    assert cache.get(cache.key(df, 't', pk=['id'])) is None
+
+
+@test('SNDF.reflect with a SchemaCache is recorded once per call by instrument')
+def _(engine=engine, cache=cache):
+    df = pd.DataFrame({'id': [1, 2], 'name': ['a', 'b']})
+    before = sn.metrics.registry.snapshot().get('SNDF.reflect', {'calls': 0})['calls']
+
+    df.sn.reflect('t', bind=engine, cache=cache)
+    df.sn.reflect('t', bind=engine, cache=cache)
+
+    assert sn.metrics.registry.snapshot()['SNDF.reflect']['calls'] == before + 2
+
+
+@test('SchemaCache keys a datetime column on whether it is all midnights, DATE or DATETIME')
+def _(engine=engine, cache=cache):
+    dates = pd.DataFrame({'at': pd.to_datetime(['2024-01-01', '2024-01-02'])})
+    times = pd.DataFrame({'at': pd.to_datetime(['2024-01-01 00:00', '2024-01-02 12:30'])})
+
+    assert cache.key(dates, 't') != cache.key(times, 't')
+    assert cache.key(dates, 't', dtypes={'at': sa.DateTime}) == cache.key(times, 't', dtypes={'at': sa.DateTime})
+    assert isinstance(dates.sn.reflect('t', bind=engine, cache=cache).c.at.type, sa.Date)
+    assert isinstance(times.sn.reflect('t', bind=engine, cache=cache).c.at.type, sa.DateTime)
+
+
+@test('SchemaCache keeps only the most recently used entries in memory')
+def _(cache=cache):
+    tables = {f'k{i}': sa.Table(f't{i}', sa.MetaData(), sa.Column('id', sa.Integer)) for i in range(5)}
+
+    for key in ['k0', 'k1', 'k2', 'k3']:
+        cache.put(key, tables[key])
+
+    cache.get('k0')
+    cache.put('k4', tables['k4'])
+
+    for path in cache.directory.glob('*.pkl'):
+        path.unlink()
+
+    # k0 was used again, so k1 was the least recently used and evicted
+    assert cache.get('k1') is None
+    assert all(cache.get(key) is tables[key] for key in ['k0', 'k2', 'k3', 'k4'])
+
+
+@test('schema_diff creates a missing table, adds and drops columns, and never narrows one')
+def _(engine=engine):
+    live = sa.Table(
+        't', sa.MetaData(),
+        sa.Column('id', sa.BigInteger, primary_key=True), sa.Column('note', sa.Text), sa.Column('old', sa.Integer)
+    )
+    model = sa.Table(
+        't', sa.MetaData(),
+        sa.Column('id', sa.Integer, primary_key=True), sa.Column('note', sa.Float), sa.Column('amount', sa.Float)
+    )
+
+    assert schema_diff(model, engine) == [str(sa.schema.CreateTable(model).compile(engine)).strip()]
+
+    live.create(engine)
+
+    assert schema_diff(model, engine) == ['ALTER TABLE t ADD COLUMN amount FLOAT']
+    assert schema_diff(model, engine, drop_columns=True, execute=True) == [
+        'ALTER TABLE t ADD COLUMN amount FLOAT',
+        'ALTER TABLE t DROP COLUMN old',
+    ]
+    assert [c['name'] for c in sa.inspect(engine).get_columns('t')] == ['id', 'note', 'amount']
+    assert schema_diff(model, engine) == []
+
+
+@test('schema_diff widens columns which can no longer hold the model\'s type, in the dialect\'s syntax')
+def _(engine=engine):
+    sa.Table(
+        't', sa.MetaData(),
+        sa.Column('id', sa.Integer), sa.Column('day', sa.Date), sa.Column('ratio', sa.Float)
+    ).create(engine)
+    model = sa.Table(
+        't', sa.MetaData(),
+        sa.Column('id', sa.BigInteger), sa.Column('day', sa.DateTime), sa.Column('ratio', sa.Integer)
+    )
+
+    assert schema_diff(model, engine) == []
+
+    for name, alter in [
+        ('postgresql', 'ALTER TABLE t ALTER COLUMN {} TYPE {}'),
+        ('mysql', 'ALTER TABLE t MODIFY COLUMN {} {}'),
+        ('mssql', 'ALTER TABLE t ALTER COLUMN {} {}'),
+    ]:
+        with mock.patch.object(engine.dialect, 'name', name):
+            assert schema_diff(model, engine) == [alter.format('id', 'BIGINT'), alter.format('day', 'DATETIME')]
+
+
+@test('BusinessCalendar.extend needs a start_date for an empty table')
+def _(engine=engine):
+    try:
+        BusinessCalendar.extend('2020-12-31', engine)
+    except ValueError as e:
+        assert 'start_date' in str(e)
+    else:
+        raise AssertionError('expected a ValueError')
+
+
+@test('BusinessCalendar.extend only inserts the dates the table is missing, and counts them')
+def _(engine=engine):
+    def dates() -> list:
+        with engine.connect() as conn:
+            return conn.execute(sa.text('SELECT calendar_date FROM business_calendar ORDER BY 1')).scalars().all()
+
+    assert BusinessCalendar.extend('2020-01-31', engine, start_date='2020-01-01') == 31
+    assert BusinessCalendar.extend('2020-02-29', engine, start_date='1999-01-01') == 29
+    assert BusinessCalendar.extend('2020-02-10', engine) == 0
+    assert BusinessCalendar.extend('2020-02-29', engine) == 0
+
+    assert dates() == [str(day.date()) for day in pd.date_range('2020-01-01', '2020-02-29')]
+
+
+@test('SNDF.load round trips NULLs, datetimes, and strings through an in-memory SQLite database, with method={method}')
+def _(method=each('executemany', 'multirow')):
+    engine = sa.create_engine('sqlite://')
+    df = pd.DataFrame({
+        'id': range(25),
+        'name': [None if i % 7 == 0 else f'caf\xe9 {i}' for i in range(25)],
+        'score': [float('nan') if i % 5 == 0 else i / 4 for i in range(25)],
+        'seen_at': pd.date_range('2024-02-28 22:30', periods=25, freq='h'),
+    })
+
+    table = df.sn.load('scores', bind=engine, chunksize=10, method=method, pk='id')
+
+    with engine.connect() as conn:
+        loaded = pd.read_sql_table('scores', conn)
+
+    assert table.name == 'scores'
+    assert len(loaded) == 25
+    assert loaded['name'].isna().tolist() == df['name'].isna().tolist()
+    assert loaded['name'].iloc[1] == 'caf\xe9 1'
+    pd.testing.assert_series_equal(loaded['score'], df['score'])
+    assert loaded['seen_at'].tolist() == df['seen_at'].tolist()
+
+    df.assign(id=df['id'] + 25).sn.load(table, bind=engine, method=method)
+
+    with engine.connect() as conn:
+        assert conn.scalar(sa.text('SELECT COUNT(*) FROM scores')) == 50
+
+
+@fixture
+async def async_engine():
+    with tempfile.TemporaryDirectory() as directory:
+        engine = sn.database.async_engine(f'sqlite+aiosqlite:///{pathlib.Path(directory) / "warehouse.db"}')
+        yield engine
+        await engine.dispose()
+
+
+@test('SNDF.aload streams a frame into a new table, over aiosqlite')
+async def _(engine=async_engine):
+    df = pd.DataFrame({'id': range(25_000), 'name': [f'n{i}' for i in range(25_000)], 'score': 0.5})
+    df.loc[3, 'score'] = None
+
+    table = await df.sn.aload('scores', bind=engine, chunksize=10_000, pk='id')
+
+    async with engine.connect() as conn:
+        loaded = await conn.run_sync(lambda c: pd.read_sql_table('scores', c))
+
+    assert table.name == 'scores'
+    assert len(loaded) == 25_000
+    assert loaded['score'].isna().sum() == 1
+    assert loaded['name'].iloc[-1] == 'n24999'
+
+
+@test('SNDF.aload appends to an existing table, with either insert method')
+async def _(engine=async_engine):
+    df = pd.DataFrame({'id': range(100), 'name': 'x'})
+
+    await df.sn.aload('scores', bind=engine, method='executemany')
+    await df.sn.aload('scores', bind=engine, method='multirow', chunksize=30)
+
+    async with engine.connect() as conn:
+        rows = await conn.scalar(sa.text('SELECT COUNT(*) FROM scores'))
+
+    assert rows == 200
+
+
+@test('BusinessCalendar.apopulate inserts every date, over aiosqlite')
+async def _(engine=async_engine):
+    rows = await BusinessCalendar.apopulate('2020-01-01', '2020-12-31', engine, chunksize=100)
+
+    async with engine.connect() as conn:
+        count = await conn.scalar(sa.text('SELECT COUNT(*) FROM business_calendar'))
+        holidays = await conn.scalar(sa.text('SELECT COUNT(*) FROM business_calendar WHERE is_us_holiday'))
+
+    assert rows == count == 366
+    assert holidays == len(BusinessCalendar.populate('2020-01-01', '2020-12-31').query('is_us_holiday'))
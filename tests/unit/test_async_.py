@@ -0,0 +1,234 @@
+import concurrent.futures as cf
+import threading
+import logging
+import asyncio
+import time
+
+from ward import test, raises
+
+from sn.async_ import LoopSmokeTester, TokenBucket, amap, run_blocking, get_executor, _activity, _SlowCallbackFilter
+
+
+@test('LoopSmokeTester samples lag, counts tasks, and hands a snapshot to its handler every interval')
+async def _():
+    snapshots = []
+    loop = asyncio.get_running_loop()
+    factory = loop.get_task_factory()
+
+    async with LoopSmokeTester(handler=snapshots.append, interval=0.1, sample_interval=0.01) as tester:
+        await asyncio.gather(*[asyncio.sleep(0.01) for _ in range(5)])
+        # block the loop, so that a lag sample comes due while it is blocked
+        time.sleep(0.05)
+        await asyncio.sleep(0.25)
+        # the test itself is the one task still running
+        assert await tester.count_active_tasks() == 1
+
+    final = snapshots[-1]
+
+    assert len(snapshots) >= 3
+    assert loop.get_task_factory() is factory
+    assert not tester.running
+    assert sum(s['tasks']['created'] for s in snapshots) == final['tasks']['completed_total'] == 5
+    assert final['tasks']['created_total'] == 6
+    assert final['lag']['samples'] > 10
+    assert 0.03 < final['lag']['max'] < 0.2
+    assert final['overhead']['fraction'] < 0.5
+
+
+@test('LoopSmokeTester captures slow callbacks along with their stacks, and leaves debug mode after')
+async def _():
+    loop = asyncio.get_running_loop()
+
+    async def hog():
+        time.sleep(0.03)
+
+    tester = LoopSmokeTester(handler=lambda data: None, slow_callback_duration=0.01).start()
+
+    assert loop.get_debug()
+
+    await asyncio.create_task(hog())
+    slow = tester.stop()['slow_callbacks']
+
+    assert not loop.get_debug()
+    assert len(slow) == 1
+    assert slow[0]['duration'] >= 0.03
+    assert 'hog' in slow[0]['callback']
+    assert any('hog' in frame for frame in slow[0]['stack'])
+
+
+@test('the slow callback filter passes records whose message is not a string')
+async def _():
+    tester = LoopSmokeTester(handler=lambda data: None)
+    slow = _SlowCallbackFilter(tester)
+
+    for msg in (KeyError('x'), 42, 'Executing %s took %.3f seconds'):
+        record = logging.LogRecord('asyncio', logging.WARNING, __file__, 1, msg, None, None)
+        assert slow.filter(record)
+
+
+@test('LoopSmokeTester.monitor runs until cancelled, then restores the loop')
+async def _():
+    snapshots = []
+    tester = LoopSmokeTester(handler=snapshots.append, interval=0.05)
+    monitor = asyncio.create_task(tester.monitor())
+
+    await asyncio.sleep(0.12)
+    assert tester.running
+
+    monitor.cancel()
+    await asyncio.gather(monitor, return_exceptions=True)
+
+    assert not tester.running
+    assert len(snapshots) >= 2
+    assert await tester.measure_lag(0.01) >= 0
+
+
+async def collect(results) -> list:
+    return [r async for r in results]
+
+
+@test('amap yields results as calls finish, never running more than limit at once')
+async def _():
+    running, most = 0, 0
+
+    async def call(delay):
+        nonlocal running, most
+        running += 1
+        most = max(most, running)
+        await asyncio.sleep(delay)
+        running -= 1
+        return delay
+
+    # 0.02 starts once 0.01 finishes, and 0.0 once 0.02 does
+    delays = [0.09, 0.01, 0.05, 0.02, 0.0]
+
+    assert await collect(amap(call, delays, limit=3)) == [0.01, 0.02, 0.0, 0.05, 0.09]
+    assert most == 3
+    assert await collect(amap(call, delays, limit=len(delays))) == sorted(delays)
+
+
+@test('amap only pulls the next item as a call finishes, from an iterable or an async iterable')
+async def _():
+    pulled, finished = 0, 0
+
+    def items():
+        nonlocal pulled
+
+        for i in range(20):
+            assert pulled - finished <= 4
+            pulled += 1
+            yield i
+
+    async def aitems():
+        for i in items():
+            yield i
+
+    async def call(i):
+        nonlocal finished
+        await asyncio.sleep(0.001)
+        finished += 1
+        return i
+
+    assert sorted(await collect(amap(call, items(), limit=4))) == list(range(20))
+
+    pulled, finished = 0, 0
+    assert sorted(await collect(amap(call, aitems(), limit=4))) == list(range(20))
+
+    with raises(ValueError):
+        await collect(amap(call, items(), limit=0))
+
+
+@test('amap cancels the calls in flight when one raises, or when it is closed early')
+async def _():
+    cancelled = []
+
+    async def call(i):
+        try:
+            await asyncio.sleep(0 if i == 0 else 1)
+        except asyncio.CancelledError:
+            cancelled.append(i)
+            raise
+
+        if i == 0:
+            raise KeyError(i)
+
+    with raises(KeyError):
+        await collect(amap(call, range(10), limit=4))
+
+    assert sorted(cancelled) == [1, 2, 3]
+
+    async def fast_then_slow(i):
+        return await call(i + 1) if i else i
+
+    cancelled.clear()
+    results = amap(fast_then_slow, range(10), limit=4)
+
+    assert await results.__anext__() == 0
+    await results.aclose()
+
+    assert sorted(cancelled) == [2, 3, 4]
+    assert _activity(asyncio.get_running_loop())['amap_in_flight'] == 0
+
+
+@test('TokenBucket allows a burst of capacity, then holds acquisitions to its rate')
+async def _():
+    bucket = TokenBucket(rate=100, capacity=5)
+    start = time.monotonic()
+
+    for _ in range(5):
+        await bucket.acquire()
+
+    burst = time.monotonic() - start
+
+    for _ in range(10):
+        async with bucket:
+            pass
+
+    elapsed = time.monotonic() - start
+
+    assert burst < 0.01
+    assert 0.09 <= elapsed < 0.3
+
+    with raises(ValueError):
+        await bucket.acquire(6)
+
+    with raises(ValueError):
+        TokenBucket(rate=0)
+
+
+@test('amap, TokenBucket, and run_blocking report their fan-out to LoopSmokeTester')
+async def _():
+    bucket = TokenBucket(rate=20, capacity=1)
+    release = threading.Event()
+    loop = asyncio.get_running_loop()
+
+    async def call(i):
+        await asyncio.sleep(0.05)
+        return i
+
+    async with LoopSmokeTester(handler=lambda data: None) as tester:
+        blocked = asyncio.ensure_future(run_blocking(release.wait))
+        mapped = asyncio.ensure_future(collect(amap(call, range(4), limit=2, limiter=bucket)))
+        await asyncio.sleep(0.02)
+        fanout = tester.snapshot()['fanout']
+        release.set()
+        await asyncio.gather(blocked, mapped)
+
+    assert fanout == {'amap_in_flight': 2, 'blocking_in_flight': 1, 'rate_limited': 1}
+    assert _activity(loop) == {'amap_in_flight': 0, 'blocking_in_flight': 0, 'rate_limited': 0}
+
+
+@test('run_blocking runs a function on a shared pool, or an executor of your own')
+async def _():
+    main = threading.get_ident()
+
+    assert await run_blocking(threading.get_ident) != main
+    assert await run_blocking(pow, 2, exp=10) == 1024
+    assert get_executor('thread') is get_executor('thread')
+    assert get_executor('thread', workers=2) is not get_executor('thread')
+
+    with cf.ThreadPoolExecutor(1, thread_name_prefix='own') as executor:
+        assert (await run_blocking(lambda: threading.current_thread().name, executor=executor)).startswith('own')
+
+    with raises(ValueError):
+        get_executor('fiber')
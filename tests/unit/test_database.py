@@ -0,0 +1,60 @@
+from ward import test
+import sqlalchemy as sa
+import pandas as pd
+import numpy as np
+
+from sn.database import _copy_statement, _dialect
+
+
+def parse_copy_csv(text: str) -> list:
+    """
+    Read a COPY payload the way PostgreSQL does, with NULL '\\N'.
+
+    Only unquoted fields equal to the NULL marker are NULL.
+    """
+    rows = []
+
+    for line in text.splitlines():
+        fields, value, quoted, in_quotes, i = [], '', False, False, 0
+
+        while i < len(line):
+            char = line[i]
+
+            if in_quotes and char == '"' and line[i + 1:i + 2] == '"':
+                value += '"'
+                i += 1
+            elif char == '"':
+                in_quotes, quoted = not in_quotes, True
+            elif char == ',' and not in_quotes:
+                fields.append(None if value == '\\N' and not quoted else value)
+                value, quoted = '', False
+            else:
+                value += char
+
+            i += 1
+
+        fields.append(None if value == '\\N' and not quoted else value)
+        rows.append(fields)
+
+    return rows
+
+
+@test('COPY payloads keep empty strings apart from NULL')
+def _():
+    table = sa.Table('t', sa.MetaData(), sa.Column('name', sa.Text), sa.Column('note', sa.Text))
+    df = pd.DataFrame({'name': ['', None, 'a,b'], 'note': ['x', '', None]}, dtype=object)
+
+    sql, buffer = _copy_statement(_dialect('postgresql'), table, df)
+
+    assert "NULL '\\N'" in sql
+    assert parse_copy_csv(buffer.getvalue()) == [['', 'x'], [None, ''], ['a,b', None]]
+
+
+@test('COPY payloads write integer columns promoted to float as integers')
+def _():
+    table = sa.Table('t', sa.MetaData(), sa.Column('id', sa.BigInteger), sa.Column('ratio', sa.Float))
+    df = pd.DataFrame({'id': [1.0, np.nan, 3.0], 'ratio': [1.0, 0.5, np.nan]})
+
+    _, buffer = _copy_statement(_dialect('postgresql'), table, df)
+
+    assert parse_copy_csv(buffer.getvalue()) == [['1', '1.0'], [None, '0.5'], ['3', None]]
@@ -0,0 +1,612 @@
+from unittest import mock
+import itertools
+import tempfile
+import pathlib
+import logging
+
+from ward import test, raises, fixture
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+import pandas as pd
+import numpy as np
+
+from sn.dataframe import reduce_mem_usage, reduce_mem_usage_chunked, ChunkedFrame, Profile
+from sn.models import BusinessCalendar
+import sn
+
+
+def make_frame(rows: int=1_000, *, seed: int=0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+
+    return pd.DataFrame({
+        'id': np.arange(rows),
+        'small': rng.integers(0, 100, rows),
+        'negative': rng.integers(-1_000, 1_000, rows),
+        'ratio': rng.random(rows),
+        'nullable': pd.array(np.where(np.arange(rows) % 5 == 0, None, np.arange(rows)), dtype='Int64'),
+        'category': pd.Series(rng.integers(0, 10, rows)).astype(str),
+        'day': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 365, rows), unit='D'),
+    })
+
+
+def ddl(sa_type) -> str:
+    return str(sa.types.to_instance(sa_type).compile(dialect=postgresql.dialect()))
+
+
+@test('to_sqla decides numeric, nullable, and categorical columns from their dtype alone')
+def _():
+    cases = {
+        'BIGINT': [pd.Series([1, None, 3], dtype='Int64'), pd.Series([1], dtype='uint32'), pd.Series([1, 2])],
+        'INTEGER': [pd.Series([1, None], dtype='Int16'), pd.Series([1], dtype='int32')],
+        'FLOAT(23)': [pd.Series([0.5], dtype='float32')],
+        'FLOAT(53)': [pd.Series([0.5, None], dtype='Float64')],
+        'BOOLEAN': [pd.Series([True, None], dtype='boolean')],
+        'TEXT': [pd.Series(['a', 'b'], dtype='category'), pd.Series(['a', None], dtype='string')],
+    }
+
+    for expected, columns in cases.items():
+        for column in columns:
+            assert ddl(sn.dataframe.to_sqla(column)) == expected
+
+
+@test('to_sqla matches a full scan on object and datetime columns, even where the sample misses the widest value')
+def _():
+    n = 20_000
+    ints = pd.Series(np.arange(n), dtype=object)
+    strings = pd.Series([f's{i}' for i in range(n)], dtype=object)
+    days = pd.Series(pd.date_range('2020-01-01', periods=n, freq='D'))
+    text_at_end, time_at_end = ints.copy(), days.copy()
+    text_at_end.iloc[-1] = 'widest'
+    time_at_end.iloc[-1] += pd.Timedelta(seconds=1)
+    nulls_then_ints = pd.Series([None] * (n - 1) + [1], dtype=object)
+
+    cases = {
+        'BIGINT': [ints, nulls_then_ints],
+        'TEXT': [strings, text_at_end],
+        'DATE': [days],
+        'TIMESTAMP WITHOUT TIME ZONE': [time_at_end],
+        'TIMESTAMP WITH TIME ZONE': [days.dt.tz_localize('UTC')],
+    }
+
+    for expected, columns in cases.items():
+        for column in columns:
+            for seed in range(3):
+                assert ddl(sn.dataframe.to_sqla(column, sample=100, random_state=seed)) == expected
+
+            assert ddl(sn.dataframe.to_sqla(column, full_scan=True)) == expected
+
+
+@test('SNDF.index_statistics counts NULL as a value, the same whether approximate or not, in every backend')
+def _():
+    n = 2_000
+    df = pd.DataFrame({
+        'id': np.arange(n),
+        'one_null': pd.array([None, *range(1, n)], dtype='Int64'),
+        'one_repeat': np.r_[np.arange(n - 1), 0],
+        'group': np.arange(n) % 10,
+        'label': pd.Series(np.where(np.arange(n) % 4, np.arange(n) % 30, -1)).astype(str).replace('-1', None),
+    })
+
+    expected = df.sn.index_statistics(parallel='serial')
+
+    assert expected['cardinality'].tolist() == df.nunique(dropna=False).tolist()
+    assert expected['null_pct'].tolist() == [0, 100 / n, 0, 0, 25]
+    assert expected['fully_unique'].tolist() == [True, True, False, False, False]
+
+    for parallel in ('serial', 'thread', 'process'):
+        exact = df.sn.index_statistics(parallel=parallel, workers=2)
+        approximate = df.sn.index_statistics(approximate=True, parallel=parallel, workers=2)
+
+        pd.testing.assert_frame_equal(exact, expected)
+        pd.testing.assert_series_equal(approximate['null_pct'], expected['null_pct'])
+        pd.testing.assert_series_equal(approximate['fully_unique'], expected['fully_unique'])
+        assert ((approximate['cardinality'] - expected['cardinality']).abs() <= expected['cardinality'] * 0.03).all()
+
+
+@test('reduce_mem_usage keeps entirely NULL nullable columns as they are')
+def _():
+    df = pd.DataFrame({
+        'int': pd.array([None, None], dtype='Int64'),
+        'float': pd.array([None, None], dtype='Float64'),
+    })
+
+    reduced = df.sn.reduce_mem_usage()
+
+    assert reduced.dtypes.tolist() == df.dtypes.tolist()
+    assert reduced.isna().all().all()
+
+
+@test('reduce_mem_usage downcasts each column by position when labels repeat')
+def _():
+    df = pd.DataFrame([[1, 2.5], [3, 4.0]], columns=['a', 'a'])
+
+    for parallel in ('serial', 'thread'):
+        reduced = df.sn.reduce_mem_usage(parallel=parallel, workers=2)
+
+        assert reduced.columns.tolist() == ['a', 'a']
+        assert reduced.dtypes.tolist() == [np.dtype('int8'), np.dtype('float32')]
+        assert (reduced.to_numpy() == df.to_numpy()).all()
+
+
+@test('reduce_mem_usage downcasts to the smallest dtype holding each column')
+def _():
+    reduced = reduce_mem_usage(make_frame())
+
+    assert reduced['id'].dtype == 'int16'
+    assert reduced['small'].dtype == 'int8'
+    assert reduced['negative'].dtype == 'int16'
+    assert reduced['ratio'].dtype == 'float32'
+    assert reduced['nullable'].dtype == 'Int16'
+    assert isinstance(reduced['category'].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(reduced.astype(make_frame().dtypes), make_frame(), check_exact=False)
+
+
+@test('reduce_mem_usage_chunked matches reduce_mem_usage of the concatenated chunks')
+def _():
+    chunks = [make_frame(500, seed=seed) for seed in range(4)]
+    chunks[2]['id'] += 100_000
+
+    expected = reduce_mem_usage(pd.concat(chunks))
+    actual = reduce_mem_usage_chunked(iter(chunks))
+
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+@test('reduce_mem_usage_chunked keeps the precision of floats, when a later chunk needs float64')
+def _():
+    chunks = [pd.DataFrame({'ratio': [0.1, 1 / 3]}), pd.DataFrame({'ratio': [1e300]})]
+
+    expected = reduce_mem_usage(pd.concat(chunks))
+    actual = reduce_mem_usage_chunked(iter(chunks))
+
+    assert actual['ratio'].dtype == 'float64'
+    assert actual['ratio'].tolist() == [0.1, 1 / 3, 1e300]
+    pd.testing.assert_frame_equal(actual, expected, check_exact=True)
+
+
+@test('reduce_mem_usage_chunked categorizes a string column whose early chunks are all distinct')
+def _():
+    chunks = [pd.DataFrame({'code': [f'c{i}' for i in range(start, start + 100)]}) for start in (0, 100)]
+    chunks += [pd.DataFrame({'code': ['c0'] * 100})] * 8
+
+    expected = reduce_mem_usage(pd.concat(chunks))
+    actual = reduce_mem_usage_chunked(iter(chunks))
+
+    assert isinstance(actual['code'].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+@test('reduce_mem_usage_chunked leaves a string column uncategorized past the distinct values it tracks')
+def _():
+    chunks = [pd.DataFrame({'code': [f'c{i}' for i in range(start, start + 100)]}) for start in (0, 100)]
+    chunks += [pd.DataFrame({'code': ['c0'] * 100})] * 8
+
+    with mock.patch('sn.dataframe._MAX_DISTINCT', 150):
+        actual = reduce_mem_usage_chunked(iter(chunks))
+
+    assert isinstance(reduce_mem_usage(pd.concat(chunks))['code'].dtype, pd.CategoricalDtype)
+    assert not isinstance(actual['code'].dtype, pd.CategoricalDtype)
+    assert actual['code'].tolist() == pd.concat(chunks)['code'].tolist()
+
+
+def make_chunks(count: int=4, rows: int=500) -> list:
+    chunks = [make_frame(rows, seed=seed) for seed in range(count)]
+
+    for i, chunk in enumerate(chunks):
+        chunk['id'] += i * rows
+
+    return chunks
+
+
+@test('Series.sn business day arithmetic matches CustomBusinessDay, time of day kept')
+def _():
+    holidays = sn.dattim.USBusinessHolidayCalendar().holidays('2023-01-01', '2025-12-31')
+    bday = pd.offsets.CustomBusinessDay(holidays=holidays)
+    s = pd.Series(pd.to_datetime(['2024-07-03 10:30', '2024-07-06 08:00', '2024-12-24 00:00', None]), index=[5, 6, 7, 8])
+
+    for n in (-3, 0, 1, 10):
+        expected = pd.Series([ts + n * bday if pd.notna(ts) else pd.NaT for ts in s], index=s.index)
+        pd.testing.assert_series_equal(s.sn.add_business_days(n), expected, check_dtype=False)
+
+    assert s.sn.add_business_days([1, 1, 1, 1]).iloc[0] == pd.Timestamp('2024-07-05 10:30')
+    assert s.sn.sub_business_days(1).iloc[1] == pd.Timestamp('2024-07-05 08:00')
+    assert s.sn.is_business_day().tolist() == [True, False, True, False]
+    assert s.sn.roll_forward().iloc[1] == pd.Timestamp('2024-07-08 08:00')
+    assert s.sn.roll_backward().iloc[1] == pd.Timestamp('2024-07-05 08:00')
+
+
+@test('Series.sn business day arithmetic keeps a timezone-aware Series at its local wall time')
+def _():
+    s = pd.Series(pd.to_datetime(['2024-07-03 23:30']).tz_localize('US/Eastern'))
+
+    shifted = s.sn.add_business_days(1)
+
+    assert shifted.dt.tz == s.dt.tz
+    assert shifted.iloc[0] == pd.Timestamp('2024-07-05 23:30', tz='US/Eastern')
+
+
+@test('Series.sn business_days_until and business_hours_until pair values by position, not index label')
+def _():
+    start = pd.Series(pd.to_datetime(['2024-07-01 09:00', '2024-07-03 16:00', None]), index=[10, 11, 12])
+    end = pd.Series(pd.to_datetime(['2024-07-08 09:00', '2024-07-05 10:00', '2024-07-05 00:00']), index=[0, 1, 2])
+
+    for other in (end, end.tolist(), end.to_numpy()):
+        days = start.sn.business_days_until(other)
+        hours = start.sn.business_hours_until(other)
+
+        assert days.index.tolist() == hours.index.tolist() == [10, 11, 12]
+        assert days.tolist()[:2] == [4, 1] and days.iloc[2] is pd.NA
+        assert hours.tolist()[:2] == [pd.Timedelta(hours=32), pd.Timedelta(hours=2)] and pd.isna(hours.iloc[2])
+
+    assert start.sn.business_days_until(pd.Timestamp('2024-07-08')).tolist()[:2] == [4, 2]
+
+    with raises(ValueError):
+        start.sn.business_hours_until(end, opens='17:00', closes='09:00')
+
+
+class CountingMessage(str):
+    """
+    A message which counts how often it is formatted.
+    """
+    def format(self, *args, **kwargs):
+        self.formatted = getattr(self, 'formatted', 0) + 1
+        return super().format(*args, **kwargs)
+
+
+class ListHandler(logging.Handler):
+    def __init__(self, level: int=logging.NOTSET):
+        super().__init__(level)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+@fixture
+def comment_log():
+    log = logging.getLogger('sn.tests.comment')
+    log.propagate = False
+    log.setLevel('INFO')
+    handler = ListHandler()
+    log.addHandler(handler)
+    yield log, handler
+    log.removeHandler(handler)
+
+
+@test('SNDF.comment does nothing for a level the logger is not enabled for, nor one no handler emits')
+def _(comment_log=comment_log):
+    log, handler = comment_log
+    df = pd.DataFrame({'a': [1, 2]})
+    msg = CountingMessage('{df.shape}')
+
+    with mock.patch.object(pd.DataFrame, 'info', autospec=True) as info:
+        assert df.sn.comment(msg, log=log, level='debug', info=True) is df
+
+        handler.setLevel('ERROR')
+        df.sn.comment(msg, log=log, level='warning', info=True)
+
+    assert not hasattr(msg, 'formatted')
+    assert not info.called
+    assert handler.messages == []
+
+
+@test('SNDF.comment formats an emitted message once, and caches the summary of a frame while its structure holds')
+def _(comment_log=comment_log):
+    log, handler = comment_log
+    df = pd.DataFrame({'a': [1, 2]})
+    msg = CountingMessage('{FINAL} {df.shape}')
+
+    with mock.patch.object(pd.DataFrame, 'info', autospec=True, side_effect=pd.DataFrame.info) as info:
+        df.sn.comment(msg, log=log, info=True)
+        df.sn.comment(msg, log=log, info=True)
+        assert info.call_count == 1
+
+        df['b'] = 'x'
+        df.sn.comment(msg, log=log, info=True)
+        assert info.call_count == 2
+
+    assert msg.formatted == 3
+    assert handler.messages[0].startswith('└─ (2, 1)\n\n')
+    assert 'RangeIndex' in handler.messages[0]
+    assert 'total 1 columns' in handler.messages[1]
+    assert handler.messages[2].startswith('└─ (2, 2)') and 'total 2 columns' in handler.messages[2]
+
+
+@test('SNDF.comment with info=\'shallow\' summarizes the frame from its metadata alone')
+def _(comment_log=comment_log):
+    log, handler = comment_log
+    df = pd.DataFrame({'a': [1, 2], 'b': [0.5, None], 'c': ['x', 'y']})
+
+    with mock.patch.object(pd.DataFrame, 'info', autospec=True) as info:
+        df.sn.comment('summary', log=log, info='shallow')
+
+    assert not info.called
+    assert handler.messages[0].split('\n')[2:4] == [
+        'DataFrame: 2 rows x 3 columns',
+        f'dtypes: float64(1), int64(1), {df.dtypes["c"]}(1)',
+    ]
+    assert handler.messages[0].endswith('MB (shallow)')
+
+
+@test('SNDF.comment rejects unknown levels and summaries, and passes other callables the formatted message')
+def _(comment_log=comment_log):
+    log, _ = comment_log
+    df = pd.DataFrame({'a': [1, 2]})
+    received = []
+
+    with raises(ValueError):
+        df.sn.comment('x', log=log, level='loud')
+
+    with raises(ValueError):
+        df.sn.comment('x', log=log, info='wide')
+
+    df.sn.comment('{BRANCH} rows: {df.shape[0]}', log=received.append)
+
+    assert received == ['├─ rows: 2']
+
+
+@test('ChunkedFrame.index_statistics matches SNDF.index_statistics, within the sketch error')
+def _():
+    chunks = make_chunks()
+    expected = pd.concat(chunks).sn.index_statistics()
+    actual = ChunkedFrame(lambda: iter(chunks)).index_statistics()
+
+    pd.testing.assert_series_equal(actual['null_pct'], expected['null_pct'])
+    assert ((actual['cardinality'] - expected['cardinality']).abs() <= expected['cardinality'] * 0.03).all()
+    assert actual['fully_unique'].tolist() == expected['fully_unique'].tolist()
+
+
+@test('ChunkedFrame built from an iterator reports unconfirmed uniqueness as NA, and refuses a second pass')
+def _():
+    chunks = ChunkedFrame(iter(make_chunks()))
+    statistics = chunks.index_statistics()
+
+    assert statistics.loc['id', 'fully_unique'] is pd.NA
+    assert not statistics.loc['small', 'fully_unique']
+
+    with raises(RuntimeError):
+        chunks.is_valid_pk('id')
+
+
+@test('ChunkedFrame counts an int chunk and a NaN-promoted float chunk of a column alike')
+def _():
+    chunks = [
+        pd.DataFrame({'id': [1, 2, 3, 4], 'group': [1, 2, 3, 4]}),
+        pd.DataFrame({'id': [4.0, 5.0, 6.0, 7.0], 'group': [5.0, 6.0, 7.0, np.nan]}),
+    ]
+    chunked = ChunkedFrame(lambda: iter(chunks))
+    statistics = chunked.index_statistics()
+
+    assert statistics['cardinality'].tolist() == [7, 8]
+    assert statistics['fully_unique'].tolist() == [False, True]
+    assert not chunked.is_valid_pk('id')
+    assert not chunked.is_valid_pk(['id', 'id'])
+    assert ChunkedFrame(lambda: iter([chunks[0], chunks[1].iloc[1:3]])).is_valid_pk(['id', 'group'])
+
+
+@test('ChunkedFrame.is_valid_pk matches SNDF.is_valid_pk')
+def _():
+    chunks = make_chunks()
+    df = pd.concat(chunks)
+
+    for key in ('id', 'small', 'nullable', ['small', 'negative'], ['id', 'small']):
+        assert ChunkedFrame(lambda: iter(chunks)).is_valid_pk(key) == df.sn.is_valid_pk(key)
+
+
+@test('ChunkedFrame.reflect widens types as chunks disagree, like SNDF.reflect of every chunk')
+def _():
+    engine = sa.create_engine('sqlite://')
+    chunks = make_chunks()
+    chunks[1]['day'] += pd.Timedelta(hours=1)
+    chunks[2]['small'] = chunks[2]['small'].astype(float)
+
+    expected = pd.concat(chunks).sn.reflect('t', bind=engine, pk='id', as_sql_stmt=True)
+    actual = ChunkedFrame(lambda: iter(chunks)).reflect('t', bind=engine, pk='id', as_sql_stmt=True)
+
+    assert str(actual) == str(expected)
+
+
+@test('ChunkedFrame.reduce_mem_usage applies one plan to every chunk, that of the concatenated chunks')
+def _():
+    chunks = make_chunks()
+    expected = reduce_mem_usage(pd.concat(chunks))
+    actual = ChunkedFrame(lambda: iter(chunks)).reduce_mem_usage().to_frame()
+
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+def make_keyed_frame(rows: int=240) -> pd.DataFrame:
+    """
+    A frame with a surrogate key, a composite natural key, and dependencies.
+    """
+    store = np.arange(rows) % 12
+    day = np.arange(rows) // 12
+
+    return pd.DataFrame({
+        # a shuffle of 0..rows, while rows is not a multiple of 7
+        'id': np.arange(rows) * 7 % rows,
+        'store': store,
+        'region': store // 4,
+        'day': day,
+        'week': day // 7,
+        'amount': np.arange(rows) * 3 % 5,
+        'note': pd.array(np.where(np.arange(rows) % 3, np.arange(rows), None), dtype='Int64'),
+    })
+
+
+def brute_force_keys(df: pd.DataFrame, max_width: int) -> set:
+    names = [name for name in df.columns if not df[name].isna().any()]
+    keys = set()
+
+    for width in range(1, max_width + 1):
+        for combo in itertools.combinations(names, width):
+            if not df.duplicated(list(combo)).any() and not any(set(key) <= set(combo) for key in keys):
+                keys.add(combo)
+
+    return keys
+
+
+@test('SNDF.discover_keys finds exactly the minimal keys a brute-force search does')
+def _():
+    df = make_keyed_frame()
+
+    for parallel in ('serial', 'thread'):
+        keys = df.sn.discover_keys(max_width=3, parallel=parallel, workers=2)
+
+        assert set(keys) == brute_force_keys(df, 3)
+        assert keys[0] == ('id',)
+        assert ('store', 'day') in keys
+
+
+@test('SNDF.discover_dependencies finds exactly the dependencies a groupby does')
+def _():
+    df = make_keyed_frame()
+    names = [name for name in df.columns if df[name].nunique(dropna=False) < len(df)]
+    expected = {
+        (a, b) for a, b in itertools.permutations(names, 2)
+        if (df.groupby(a, dropna=False)[b].nunique(dropna=False) == 1).all()
+    }
+
+    actual = df.sn.discover_dependencies()
+
+    assert set(actual.itertuples(index=False, name=None)) == expected
+    assert {('store', 'region'), ('day', 'week')} <= expected
+
+
+@test('Profile counts an int chunk and a NaN-promoted float chunk of a column alike')
+def _():
+    ints = pd.DataFrame({'id': np.arange(100), 'group': np.arange(100) % 7})
+    floats = pd.DataFrame({'id': np.arange(50, 150, dtype=float), 'group': np.where(np.arange(100) % 10, np.arange(100) % 7, np.nan)})
+    full = pd.concat([ints, floats], ignore_index=True)
+
+    profile = ints.sn.profile(keys=['group']).update(floats)
+    statistics = profile.index_statistics()
+
+    assert statistics['cardinality'].tolist() == [full['id'].nunique(), full['group'].nunique(dropna=False)]
+    assert not statistics['fully_unique'].any()
+    assert not profile.is_valid_pk('id')
+
+
+@test('Profile.index_statistics matches SNDF.index_statistics and df.nunique while within the exact budget')
+def _():
+    df = pd.concat(make_chunks(), ignore_index=True)
+    statistics = df.sn.profile().index_statistics()
+
+    pd.testing.assert_frame_equal(statistics, df.sn.index_statistics())
+    assert statistics['cardinality'].tolist() == df.nunique(dropna=False).tolist()
+
+
+@test('Profile updated chunk by chunk, or merged, gives the same answers as profiling everything')
+def _():
+    chunks = make_chunks()
+    df = pd.concat(chunks, ignore_index=True)
+    options = {'keys': ['id', ['small', 'negative']], 'max_exact': 800}
+
+    expected = df.sn.profile(**options)
+    updated = chunks[0].sn.profile(**options)
+    merged = chunks[0].sn.profile(**options)
+
+    for chunk in chunks[1:]:
+        updated.update(chunk)
+        merged.merge(chunk.sn.profile(**options))
+
+    for profile in (updated, merged):
+        assert profile.rows == len(df)
+        pd.testing.assert_frame_equal(profile.index_statistics(), expected.index_statistics())
+
+        for key in options['keys']:
+            assert profile.is_valid_pk(key) == df.sn.is_valid_pk(key)
+
+
+@test('Profile survives a save and load, and keeps updating')
+def _():
+    chunks = make_chunks()
+    engine = sa.create_engine('sqlite://')
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = chunks[0].sn.profile(keys=['id']).save(pathlib.Path(directory) / 'chunks.profile')
+        profile = Profile.load(path)
+
+    for chunk in chunks[1:]:
+        profile.update(chunk)
+
+    df = pd.concat(chunks, ignore_index=True)
+
+    pd.testing.assert_frame_equal(profile.index_statistics(), df.sn.index_statistics())
+    assert profile.is_valid_pk('id')
+    assert str(profile.reflect('t', bind=engine, as_sql_stmt=True)) == str(df.sn.reflect('t', bind=engine, as_sql_stmt=True))
+
+
+@test('Profile counts a column as NULL in the rows of batches without it')
+def _():
+    first = pd.DataFrame({'a': [1, 2, 3]})
+    second = pd.DataFrame({'b': ['x', 'y']})
+
+    statistics = first.sn.profile().update(second).index_statistics()
+
+    assert statistics['null_pct'].round(2).tolist() == [40.0, 60.0]
+    assert statistics['cardinality'].tolist() == [4, 3]
+
+    with raises(ValueError):
+        first.sn.profile().is_valid_pk(['a', 'b'])
+
+
+def make_facts(rows: int=2_000) -> pd.DataFrame:
+    """
+    Timestamps spanning a decade boundary, with times of day.
+    """
+    i = np.arange(rows)
+    days = np.datetime64('2018-06-01', 'D') + i * 7_919 % 1_500
+    seconds = i * 104_729 % 86_400
+
+    return pd.DataFrame({
+        'sold_at': (days.astype('datetime64[s]') + seconds).astype('datetime64[ns]'),
+        'amount': i / rows,
+    })
+
+
+@test('SNDF.enrich_calendar matches a left merge against BusinessCalendar.populate')
+def _():
+    facts = make_facts()
+    dimension = BusinessCalendar.populate('2018-01-01', '2022-12-31')
+    columns = [name for name in dimension.columns if name != 'calendar_date']
+
+    expected = (
+        facts
+        .assign(calendar_date=facts['sold_at'].dt.floor('D').astype(dimension['calendar_date'].dtype))
+        .merge(dimension, on='calendar_date', how='left')
+        .drop(columns='calendar_date')
+    )
+
+    assert expected.columns.tolist() == ['sold_at', 'amount', *columns]
+    pd.testing.assert_frame_equal(facts.sn.enrich_calendar('sold_at'), expected)
+    pd.testing.assert_frame_equal(
+        facts.sn.enrich_calendar('sold_at', columns=['is_business_day', 'quarter_of_year'], prefix='cal_'),
+        expected[['sold_at', 'amount', 'is_business_day', 'quarter_of_year']].rename(columns=lambda c: c if c in facts else f'cal_{c}')
+    )
+
+
+@test('SNDF.enrich_calendar leaves attributes missing where the date is, with nullable dtypes')
+def _():
+    facts = make_facts(10)
+    facts.loc[[2, 5], 'sold_at'] = pd.NaT
+
+    enriched = facts.sn.enrich_calendar('sold_at', columns=['is_business_day', 'week_of_year', 'week_begin'])
+    complete = facts.dropna().sn.enrich_calendar('sold_at', columns=['is_business_day', 'week_of_year', 'week_begin'])
+
+    assert enriched['is_business_day'].dtype == 'boolean'
+    assert enriched['week_of_year'].dtype == 'Int16'
+    assert enriched.loc[[2, 5]].drop(columns=['sold_at', 'amount']).isna().all().all()
+    pd.testing.assert_frame_equal(enriched.dropna(subset=['sold_at']), complete, check_dtype=False)
+
+
+@test('SNDF.enrich_calendar takes timezone-aware dates at their local wall time, and rejects unknown columns')
+def _():
+    facts = pd.DataFrame({'sold_at': pd.to_datetime(['2024-07-04 23:30', '2024-07-05 00:30']).tz_localize('US/Eastern')})
+
+    enriched = facts.sn.enrich_calendar('sold_at', columns=['is_us_holiday'])
+
+    assert enriched['is_us_holiday'].tolist() == [True, False]
+
+    with raises(ValueError):
+        facts.sn.enrich_calendar('sold_at', columns=['fiscal_year'])
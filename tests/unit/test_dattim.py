@@ -0,0 +1,66 @@
+from ward import test
+import pandas as pd
+import numpy as np
+
+from sn import dattim
+
+
+@test('holidays_between matches the pandas calendar, across years and from its cache')
+def _():
+    # observed holidays may fall on the holiday itself, pandas lists them twice
+    expected = dattim.USBusinessHolidayCalendar().holidays('2019-06-01', '2024-02-01').unique()
+
+    for _ in range(2):
+        holidays = dattim.holidays_between('2019-06-01', '2024-02-01')
+        assert holidays.tolist() == expected.to_numpy().astype('datetime64[D]').tolist()
+
+
+@test('is_holiday flags holidays of the calendar in any year, never NaT, and ignores the time of day')
+def _():
+    dates = np.array(['2024-07-04T13:00', '2024-07-05', '2024-11-28', 'NaT', '1850-07-04'], dtype='datetime64[m]')
+
+    assert dattim.is_holiday(dates).tolist() == [True, False, True, False, True]
+    assert dattim.is_holiday(['2024-12-31'], calendar='USHolidayCalendar').tolist() == [True]
+
+
+@test('next_business_day and business_days_between match CustomBusinessDay')
+def _():
+    holidays = dattim.USBusinessHolidayCalendar().holidays('2023-01-01', '2025-12-31')
+    bday = pd.offsets.CustomBusinessDay(holidays=holidays)
+    days = pd.date_range('2024-06-25', '2024-07-10')
+
+    expected = [(day + bday).to_datetime64().astype('datetime64[D]') for day in days]
+
+    assert dattim.next_business_day(days).tolist() == [day.astype(object) for day in expected]
+    assert dattim.business_days_between(days[:-1], days[-1]).tolist() == [
+        len(pd.bdate_range(day, days[-1] - pd.Timedelta(days=1), freq=bday)) for day in days[:-1]
+    ]
+
+
+@test('business_days_between is negative backwards in time, and NaN where either date is NaT')
+def _():
+    counts = dattim.business_days_between(['2024-07-08', '2024-07-01', None], ['2024-07-01', '2024-07-08', '2024-07-08'])
+
+    assert counts[:2].tolist() == [-4, 4]
+    assert np.isnan(counts[2])
+
+
+@test('add_business_days reaches past the years of its inputs, and roll_business_day keeps the time of day')
+def _():
+    shifted = dattim.add_business_days(['2024-07-03'], 2_600)
+    holidays = dattim.USBusinessHolidayCalendar().holidays('2024-01-01', '2036-12-31')
+
+    assert shifted[0] == (pd.Timestamp('2024-07-03') + 2_600 * pd.offsets.CustomBusinessDay(holidays=holidays)).to_datetime64()
+    assert dattim.roll_business_day(['2024-07-04T08:30'])[0] == np.datetime64('2024-07-05T08:30')
+    assert dattim.roll_business_day(['2024-07-04T08:30'], 'backward')[0] == np.datetime64('2024-07-03T08:30')
+
+
+@test('business_time_between only counts business hours')
+def _():
+    elapsed = dattim.business_time_between(
+        ['2024-07-03 16:00', '2024-07-05 08:00', '2024-07-05 12:00', None],
+        ['2024-07-05 10:00', '2024-07-05 20:00', '2024-07-03 16:00', '2024-07-05 00:00']
+    )
+
+    assert pd.to_timedelta(elapsed[:3]).tolist() == [pd.Timedelta(hours=h) for h in (2, 8, -4)]
+    assert np.isnat(elapsed[3])
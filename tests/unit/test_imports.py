@@ -0,0 +1,69 @@
+import subprocess
+import pathlib
+import sys
+import os
+
+from ward import test
+
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+
+# seconds, generous - importing pandas alone is several times this
+IMPORT_BUDGET = 0.15
+
+
+def python(code: str, *flags: str) -> subprocess.CompletedProcess:
+    env = {**os.environ, 'PYTHONPATH': str(ROOT)}
+    return subprocess.run([sys.executable, *flags, '-c', code], capture_output=True, text=True, cwd=ROOT, env=env)
+
+
+def import_seconds(stderr: str) -> float:
+    """
+    Total cumulative time of the top-level sn imports, from -X importtime.
+    """
+    total = 0
+
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+
+        _, cumulative, name = line.split('|')
+
+        if name[1:].split('.')[0] == 'sn':
+            total += int(cumulative)
+
+    return total / 1_000_000
+
+
+@test('light submodules import without pandas, numpy, or sqlalchemy')
+def _():
+    proc = python(
+        'import sys, sn, sn.log, sn.dattim\n'
+        'sn.dattim.nearest_future("sunday")\n'
+        'print(sorted({"pandas", "numpy", "sqlalchemy"} & set(sys.modules)))'
+    )
+
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.strip() == '[]'
+
+
+@test(f'importing sn, sn.log, and sn.dattim takes less than {IMPORT_BUDGET}s')
+def _():
+    proc = python('import sn, sn.log, sn.dattim', '-X', 'importtime')
+
+    assert proc.returncode == 0, proc.stderr
+    assert import_seconds(proc.stderr) < IMPORT_BUDGET
+
+
+@test('the .sn accessor is registered on first pandas use, and loads sn.dataframe lazily')
+def _():
+    proc = python(
+        'import sys, sn\n'
+        'import pandas as pd\n'
+        'assert "sn.dataframe" not in sys.modules\n'
+        's = pd.Series(pd.to_datetime(["2024-07-03"]))\n'
+        'print(pd.DataFrame({"a": [1, 2]}).sn.is_valid_pk("a"), s.sn.add_business_days(1).iloc[0].date())'
+    )
+
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.split() == ['True', '2024-07-05']
@@ -0,0 +1,121 @@
+import tempfile
+import pathlib
+import time
+
+from ward import test, raises, each, fixture
+import pandas as pd
+import numpy as np
+
+from sn.dataframe import reduce_mem_usage
+from sn.io import spss_convert, load
+
+
+class FakeSavReader:
+    """
+    Just enough of savReaderWriter.SavReader, which counts reads after close.
+    """
+    def __init__(self, rows: list, *, delay: float=0):
+        self.rows = rows
+        self.delay = delay
+        self.closed = False
+        self.reads_after_close = 0
+        self.varNames = [b'id', b'name']
+        self.varTypes = {b'id': 0, b'name': 8}
+        self.header = self.varNames
+        self.shape = type('shape', (), {'nrows': len(rows), 'ncols': 2})
+
+    def __call__(self, fp):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.closed = True
+
+    def __iter__(self):
+        for row in self.rows:
+            time.sleep(self.delay)
+            self.reads_after_close += self.closed
+            yield row
+
+
+def make_rows(n: int) -> list:
+    return [[float(i), f'caf\xe9 {i}'.encode('CP1252')] for i in range(n)]
+
+
+@test('spss_convert writes every case, decoding strings, to {to} with threads={threads}')
+def _(to=each('csv', 'parquet', 'csv', 'parquet'), threads=each(True, True, False, False)):
+    reader = FakeSavReader(make_rows(1_005))
+
+    with tempfile.TemporaryDirectory() as directory:
+        dest = spss_convert(pathlib.Path(directory) / 'survey.sav', to=to, blocksize=100, threads=threads, reader=reader)
+        df = pd.read_csv(dest) if to == 'csv' else pd.read_parquet(dest)
+
+    assert dest.name == f'survey.{to}'
+    assert df.columns.tolist() == ['id', 'name']
+    assert df['id'].tolist() == list(range(1_005))
+    assert df['name'].iloc[-1] == 'caf\xe9 1004'
+
+
+@test('spss_convert stops reading before the file is closed, when writing fails')
+def _():
+    # a string among numeric values cannot be written to a float64 parquet column
+    rows = make_rows(2_000)
+    rows[250][0] = b'oops'
+    reader = FakeSavReader(rows, delay=0.0005)
+
+    with tempfile.TemporaryDirectory() as directory:
+        with raises(ValueError):
+            spss_convert(pathlib.Path(directory) / 'survey.sav', blocksize=50, reader=reader)
+
+        time.sleep(0.05)
+
+    assert reader.closed
+    assert reader.reads_after_close == 0
+
+
+@fixture
+def staged():
+    df = reduce_mem_usage(pd.DataFrame({
+        'id': np.arange(10),
+        'flag': pd.array([1, None, 3, 4, 5, 6, 7, 8, 9, 10], dtype='Int64'),
+        'kind': ['a', 'b'] * 5,
+        'day': pd.to_datetime(['2020-01-01'] * 10) + pd.to_timedelta(np.arange(10), 'D'),
+        'amount': np.arange(10) / 4,
+    }, index=pd.RangeIndex(100, 120, 2)))
+
+    with tempfile.TemporaryDirectory() as directory:
+        yield df, df.sn.save(pathlib.Path(directory) / 'stage.arrow', chunksize=3)
+
+
+@test('save and load round trip the dtypes reduce_mem_usage produces, and the index, with mmap={mmap}')
+def _(staged=staged, mmap=each(True, False)):
+    df, fp = staged
+
+    assert df.dtypes.astype(str).tolist() == ['int8', 'Int8', 'category', 'date32[day][pyarrow]', 'float32']
+    pd.testing.assert_frame_equal(load(fp, mmap=mmap), df)
+
+
+@test('load reads only the columns asked for, and rows across record batches, with their index')
+def _(staged=staged):
+    df, fp = staged
+
+    pd.testing.assert_frame_equal(load(fp, columns=['kind', 'id']), df[['kind', 'id']])
+    pd.testing.assert_frame_equal(load(fp, rows=slice(2, 8)), df.iloc[2:8])
+    pd.testing.assert_frame_equal(load(fp, rows=slice(-2, None), columns=['amount']), df[['amount']].iloc[-2:])
+    assert load(fp, rows=slice(4, 4)).empty
+
+    with raises(ValueError):
+        load(fp, rows=slice(0, 10, 2))
+
+
+@test("save infers each column's type from the whole frame, not the first chunk")
+def _():
+    df = pd.DataFrame({'e': [None] * 4 + ['x'] * 6}, dtype=object)
+
+    with tempfile.TemporaryDirectory() as directory:
+        loaded = load(df.sn.save(pathlib.Path(directory) / 'stage.arrow', chunksize=3))
+
+    assert loaded['e'].isna().tolist() == [True] * 4 + [False] * 6
+    assert loaded['e'].iloc[-1] == 'x'
@@ -0,0 +1,197 @@
+import concurrent.futures as cf
+import subprocess
+import threading
+import pathlib
+import logging
+import queue
+import sys
+import io
+import os
+
+from ward import test, raises, fixture
+
+from sn.log import _BoundedQueueHandler, _BatchingQueueListener, LazyStr, CachedLazyStr, lazy_stats
+
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+
+
+def pipeline(maxsize: int, *, policy: str='drop', batch_size: int=256) -> tuple:
+    """
+    A logger behind a bounded queue, whose listener writes to a StringIO.
+    """
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter('%(levelname)s %(message)s'))
+
+    q = queue.Queue(maxsize=maxsize)
+    queue_handler = _BoundedQueueHandler(q, policy=policy)
+    listener = _BatchingQueueListener(q, handler, queue_handler=queue_handler, batch_size=batch_size)
+
+    log = logging.getLogger(f'sn.tests.log.{id(q)}')
+    log.propagate = False
+    log.setLevel('INFO')
+    log.addHandler(queue_handler)
+    return log, queue_handler, listener, stream
+
+
+@test('the log queue formats messages in the caller, and writes them in order on the listener')
+def _():
+    log, _, listener, stream = pipeline(100, batch_size=8)
+    values = ['before']
+
+    listener.start()
+
+    for i in range(50):
+        log.info('record %d of %s', i, values)
+
+    values[0] = 'after'
+    listener.stop()
+
+    lines = stream.getvalue().splitlines()
+
+    assert lines == [f"INFO record {i} of ['before']" for i in range(50)]
+
+
+@test('a full log queue drops records under the drop policy, counts them, and reports the count once')
+def _():
+    log, queue_handler, listener, stream = pipeline(3)
+
+    for i in range(10):
+        log.warning('record %d', i)
+
+    assert queue_handler.dropped == 7
+
+    listener.start()
+    listener.stop()
+
+    assert stream.getvalue().splitlines() == [
+        'WARNING record 0', 'WARNING record 1', 'WARNING record 2',
+        'WARNING log queue was full, 7 records were dropped',
+    ]
+
+
+@test('records logged after the listener is stopped are discarded, not written')
+def _():
+    log, _, listener, stream = pipeline(100)
+
+    log.info('kept')
+    listener.enqueue_sentinel()
+    log.info('discarded')
+
+    # run on this thread, the sentinel and the record after it are drained in one batch
+    listener._monitor()
+
+    assert stream.getvalue().splitlines() == ['INFO kept']
+
+    with raises(ValueError):
+        _BoundedQueueHandler(queue.Queue(), policy='wait')
+
+
+@test('basic_setup(async_=True) flushes every queued record, in order, when the interpreter exits')
+def _():
+    code = (
+        'import sn.log\n'
+        'log = sn.log.basic_setup("script", format="%(message)s", async_=True, policy="block", queue_size=10)\n'
+        'for i in range(1_000):\n'
+        '    log.info("record %d", i)\n'
+    )
+    proc = subprocess.run(
+        [sys.executable, '-c', code], capture_output=True, text=True, cwd=ROOT, env={**os.environ, 'PYTHONPATH': str(ROOT)}
+    )
+
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stderr.splitlines() == [f'record {i}' for i in range(1_000)]
+
+
+@test('basic_setup(async_=True) warns that logging stays synchronous when the root logger has handlers')
+def _():
+    code = (
+        'import warnings, logging, sn.log\n'
+        'logging.basicConfig(format="root %(message)s")\n'
+        'with warnings.catch_warnings(record=True) as caught:\n'
+        '    warnings.simplefilter("always")\n'
+        '    log = sn.log.basic_setup("script", async_=True)\n'
+        'log.warning("record")\n'
+        'print(len(caught), caught[0].category.__name__, type(logging.root.handlers[0]).__name__)\n'
+    )
+    proc = subprocess.run(
+        [sys.executable, '-c', code], capture_output=True, text=True, cwd=ROOT, env={**os.environ, 'PYTHONPATH': str(ROOT)}
+    )
+
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.split() == ['1', 'RuntimeWarning', 'StreamHandler']
+    assert proc.stderr.splitlines() == ['root record']
+
+
+class Counter:
+    """
+    A callable which counts its calls, and returns text of a given length.
+    """
+    def __init__(self, length: int=5):
+        self.length = length
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self) -> str:
+        with self.lock:
+            self.calls += 1
+
+        return 'x' * self.length
+
+
+@fixture
+def stats():
+    lazy_stats.reset()
+    lazy_stats.enable()
+    yield lazy_stats
+    lazy_stats.disable()
+    lazy_stats.reset()
+
+
+@test('LazyStr renders every time, CachedLazyStr at most once, even across threads')
+def _():
+    plain, cached = Counter(), Counter()
+    lazy, once = LazyStr(plain), CachedLazyStr(cached)
+
+    with cf.ThreadPoolExecutor(8) as pool:
+        assert set(pool.map(lambda _: str(lazy), range(50))) == {'xxxxx'}
+        assert set(pool.map(lambda _: str(once), range(50))) == {'xxxxx'}
+
+    assert plain.calls == 50
+    assert cached.calls == 1
+
+
+@test('CachedLazyStr.truncate caps the rendered string, and says by how much')
+def _():
+    assert str(CachedLazyStr(Counter(12_345)).truncate(10)) == 'xxxxxxxxxx... [truncated 12,335 characters]'
+    assert str(CachedLazyStr(Counter(10)).truncate(10)) == 'xxxxxxxxxx'
+
+
+@test('lazy_stats counts creations, renders, cache hits, truncations, and skipped renders, only while enabled')
+def _(stats=stats):
+    log = logging.getLogger('sn.tests.lazy')
+    log.setLevel('INFO')
+    log.propagate = False
+    log.addHandler(logging.NullHandler())
+
+    lazy = LazyStr(Counter())
+    cached = CachedLazyStr(Counter(100)).truncate(10)
+
+    for _ in range(2):
+        str(lazy)
+
+    for _ in range(3):
+        str(cached)
+
+    log.debug('%s', CachedLazyStr(Counter()))
+
+    snapshot = stats.snapshot()
+    stats.disable()
+    str(LazyStr(Counter()))
+
+    assert {k: v for k, v in snapshot.items() if k != 'render_seconds'} == {
+        'created': 3, 'rendered': 2, 'rerendered': 1, 'cache_hits': 2, 'truncated': 1, 'skipped': 1,
+    }
+    assert snapshot['render_seconds'] > 0
+    assert stats.snapshot()['created'] == 3
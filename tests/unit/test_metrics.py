@@ -0,0 +1,172 @@
+import tempfile
+import pathlib
+import asyncio
+import logging
+import json
+import time
+
+from ward import test, raises, fixture
+
+from sn.metrics import instrument, MetricsRegistry, Histogram
+import sn
+
+
+class RecordList(logging.Handler):
+    def __init__(self, records: list):
+        super().__init__()
+        self.records = records
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@fixture
+def registry():
+    return MetricsRegistry(buckets=(0.01, 0.1, 1.0))
+
+
+@test('instrument records calls, errors, and wall and CPU time of a function, bare or named')
+def _(registry=registry):
+    @instrument(registry=registry)
+    def spin(seconds):
+        end = time.thread_time() + seconds
+
+        while time.thread_time() < end:
+            pass
+
+    @instrument(name='etl.fail', registry=registry)
+    def fail():
+        raise KeyError('x')
+
+    spin(0.02)
+    spin(0.0)
+
+    with raises(KeyError):
+        fail()
+
+    snapshot = registry.snapshot()
+    spun = snapshot[spin.__qualname__]
+
+    assert spin.__name__ == 'spin'
+    assert 'etl.fail' in registry
+    assert (spun['calls'], spun['errors']) == (2, 0)
+    assert (snapshot['etl.fail']['calls'], snapshot['etl.fail']['errors']) == (1, 1)
+    assert spun['cpu']['max'] >= 0.02
+    assert spun['wall']['total'] >= spun['cpu']['total'] * 0.9
+
+
+@test('instrument on a coroutine function counts its wall time, but only its CPU time while running')
+async def _(registry=registry):
+    @instrument(name='fetch', registry=registry)
+    async def fetch(seconds):
+        await asyncio.sleep(seconds)
+        return seconds
+
+    @instrument(name='fetch.fail', registry=registry)
+    async def fail():
+        await asyncio.sleep(0)
+        raise KeyError('x')
+
+    assert await asyncio.gather(fetch(0.05), fetch(0.05)) == [0.05, 0.05]
+
+    with raises(KeyError):
+        await fail()
+
+    snapshot = registry.snapshot()
+
+    assert snapshot['fetch']['calls'] == 2
+    assert snapshot['fetch']['wall']['max'] >= 0.05
+    assert snapshot['fetch']['cpu']['max'] < 0.01
+    assert snapshot['fetch.fail']['errors'] == 1
+
+
+@test('instrument(memory=True) records the peak memory of a call')
+def _(registry=registry):
+    @instrument(name='allocate', memory=True, registry=registry)
+    def allocate():
+        return len(bytearray(10_000_000))
+
+    allocate()
+
+    assert 10_000_000 <= registry.snapshot()['allocate']['peak_memory'] < 11_000_000
+
+
+@test('Histogram estimates percentiles within the bucket they fall in')
+def _():
+    histogram = Histogram((0.01, 0.1, 1.0))
+
+    assert histogram.percentile(50) is None
+
+    for value in [0.005] * 50 + [0.05] * 40 + [0.5] * 9 + [3.0]:
+        histogram.observe(value)
+
+    assert histogram.counts == [50, 40, 9, 1]
+    assert 0 < histogram.percentile(50) <= 0.01
+    assert 0.01 < histogram.percentile(90) <= 0.1
+    assert 0.1 < histogram.percentile(99) <= 1.0
+    assert histogram.percentile(100) == 3.0
+    assert histogram.summary()['total'] == 0.25 + 2.0 + 4.5 + 3.0
+
+
+@test('MetricsRegistry.to_prometheus writes counters and cumulative histograms, with labels escaped')
+def _(registry=registry):
+    for wall in (0.005, 0.05, 5.0):
+        registry.record('load "daily"', wall=wall, cpu=0.001, error=wall > 1)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = pathlib.Path(directory) / 'sn.prom'
+        text = registry.to_prometheus(path, prefix='etl')
+
+        assert path.read_text() == text
+        assert [p.name for p in path.parent.iterdir()] == ['sn.prom']
+
+    label = 'name="load \\"daily\\""'
+    lines = text.splitlines()
+
+    assert lines[:2] == ['# HELP etl_calls_total Calls of instrumented functions.', '# TYPE etl_calls_total counter']
+    assert f'etl_calls_total{{{label}}} 3' in lines
+    assert f'etl_errors_total{{{label}}} 1' in lines
+    assert '# TYPE etl_wall_seconds histogram' in lines
+    assert [line for line in lines if line.startswith('etl_wall_seconds_bucket')] == [
+        f'etl_wall_seconds_bucket{{{label},le="{le}"}} {n}' for le, n in [('0.01', 1), ('0.1', 2), ('1.0', 2), ('+Inf', 3)]
+    ]
+    assert f'etl_wall_seconds_sum{{{label}}} 5.055' in lines
+    assert f'etl_wall_seconds_count{{{label}}} 3' in lines
+    assert not any('peak_memory' in line for line in lines)
+
+
+@test('MetricsRegistry.to_log writes the snapshot as one line of JSON, and rejects unknown levels')
+def _(registry=registry):
+    records = []
+    log = logging.getLogger('sn.tests.metrics')
+    log.propagate = False
+    log.setLevel('INFO')
+    log.handlers = [RecordList(records)]
+
+    registry.record('transform', wall=0.5, cpu=0.25)
+    registry.to_log(log=log)
+    registry.to_log(log=log, level='debug')
+
+    message = records[0].getMessage()
+
+    assert len(records) == 1
+    assert '\n' not in message
+    assert json.loads(message.removeprefix('metrics ')) == registry.snapshot()
+
+    with raises(ValueError):
+        registry.to_log(log=log, level='loud')
+
+    registry.reset()
+
+    assert registry.snapshot() == {}
+
+
+@test('sn.instrument records into the module registry by default')
+def _():
+    @sn.instrument
+    def noop():
+        pass
+
+    noop()
+
+    assert sn.metrics.registry.snapshot()[noop.__qualname__]['calls'] >= 1
@@ -0,0 +1,34 @@
+from ward import test
+import pandas as pd
+
+from sn.models import BusinessCalendar
+
+
+@test('BusinessCalendar._generate computes the attributes of known dates')
+def _():
+    df = BusinessCalendar._generate('2019-12-30', '2020-12-31', 'USBusinessHolidayCalendar').set_index('calendar_date')
+    day = {date: df.loc[date] for date in ['2020-02-29', '2020-03-31', '2020-04-01', '2020-07-03', '2020-11-26']}
+
+    assert len(df) == 368
+    assert df.index[0] == pd.Timestamp('2019-12-30')
+
+    # a leap day, on a Saturday
+    assert day['2020-02-29'][['day_of_week', 'day_of_year', 'weekday', 'month_of_quarter']].tolist() == [5, 60, 'Saturday', 2]
+    assert day['2020-02-29']['month_end'] == pd.Timestamp('2020-02-29')
+    assert day['2020-02-29'][['is_weekend', 'is_business_day']].tolist() == [True, False]
+
+    # either side of a quarter boundary
+    assert day['2020-03-31'][['quarter_of_year', 'month_of_quarter', 'weekday']].tolist() == [1, 3, 'Tuesday']
+    assert day['2020-03-31'][['quarter_begin', 'quarter_end']].tolist() == [pd.Timestamp('2020-01-01'), pd.Timestamp('2020-03-31')]
+    assert day['2020-04-01'][['quarter_of_year', 'month_of_quarter', 'month_name']].tolist() == [2, 1, 'April']
+    assert day['2020-04-01'][['month_begin', 'quarter_begin', 'quarter_end']].tolist() == [
+        pd.Timestamp('2020-04-01'), pd.Timestamp('2020-04-01'), pd.Timestamp('2020-06-30')
+    ]
+    assert day['2020-04-01'][['week_begin', 'week_end']].tolist() == [pd.Timestamp('2020-03-30'), pd.Timestamp('2020-04-05')]
+
+    # Independence Day observed on a Friday, and Thanksgiving
+    assert day['2020-07-03'][['is_us_holiday', 'is_weekday', 'is_business_day']].tolist() == [True, True, False]
+    assert day['2020-11-26'][['is_us_holiday', 'weekday', 'weekday_in_month']].tolist() == [True, 'Thursday', 4]
+
+    assert df['weekday'].iloc[:7].tolist() == ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+    assert (df['day_of_week'] == df.index.dayofweek).all()